@@ -0,0 +1,223 @@
+"""
+This module provides a persistent cache of compiled networks to Gridsim.
+Compiling a network, i.e. building its admittance matrix and the matrices of
+the load flow calculator and factorizing them, is done again by each process
+simulating it. A :class:`CompiledNetworkCache` stores the arrays computed by
+:func:`.AbstractElectricalLoadFlowCalculator.update` in a directory, under a
+hash of the network topology, of the two-port parameters and of the calculator
+class and settings. Processes simulating the same network then read the
+arrays back instead of computing them again.
+
+Each entry of the cache is a sub-directory holding one ``.npy`` file per
+array, which is memory-mapped when it is read: the pages of the arrays are
+shared by the processes reading them and are only copied by a process
+modifying them.
+
+*Example*::
+
+    from gridsim.simulation import Simulator
+    from gridsim.electrical.cache import CompiledNetworkCache
+
+    sim = Simulator()
+    sim.electrical.compile_cache = CompiledNetworkCache('/tmp/networks')
+"""
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from gridsim.decorators import accepts, returns
+
+from .loadflow import AbstractElectricalLoadFlowCalculator
+
+# version of the format of the cache entries, part of their keys
+_FORMAT_VERSION = 1
+
+
+class CompiledNetworkCache(object):
+
+    @accepts((1, str))
+    def __init__(self, directory):
+        """
+        __init__(self, directory)
+
+        Caches compiled networks in the given directory, which is created if
+        it does not exist. Several processes can use the same directory at
+        the same time: entries are written in a temporary directory and
+        renamed at once, they are never read partially written.
+
+        :param directory: the directory of the cache
+        :type directory: str
+        """
+        super(CompiledNetworkCache, self).__init__()
+
+        try:
+            os.makedirs(directory)
+        except OSError as error:
+            if error.errno != errno.EEXIST or not os.path.isdir(directory):
+                raise
+        self._directory = directory
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def directory(self):
+        """
+        The directory of the cache.
+        """
+        return self._directory
+
+    @property
+    def hits(self):
+        """
+        The number of calculators updated from an entry of the cache.
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        The number of calculators updated without entry in the cache, whose
+        compiled state has been stored.
+        """
+        return self._misses
+
+    @accepts((1, AbstractElectricalLoadFlowCalculator))
+    @returns(str)
+    def key(self, calculator, s_base, v_base, is_PV, b, Yb):
+        """
+        key(self, calculator, s_base, v_base, is_PV, b, Yb)
+
+        Returns the key of the compiled state of the given calculator updated
+        with the given values, see
+        :func:`.AbstractElectricalLoadFlowCalculator.update`.
+
+        :param calculator: the load flow calculator
+        :type calculator: :class:`.AbstractElectricalLoadFlowCalculator`
+        :param s_base: reference power value
+        :type s_base: float
+        :param v_base: reference voltage value
+        :type v_base: float
+        :param is_PV: N-long vector specifying which bus is of type
+            :class:`.ElectricalPVBus`
+        :type is_PV: 1-dimensional numpy array of boolean
+        :param b: Mx2 table containing for each branch the ids of start and end
+            buses.
+        :type b: 2-dimensional numpy array of int
+        :param Yb: Mx4 table containing the admittances `Yii`, `Yij`, `Yjj`,
+            and `Yji` of each branch.
+        :type Yb: 2-dimensional numpy array of complex
+        :return: the hexadecimal SHA-1 digest of the arguments
+        :rtype: str
+        """
+        digest = hashlib.sha1()
+        calculator_class = type(calculator)
+        digest.update(repr((_FORMAT_VERSION, calculator_class.__module__,
+                            calculator_class.__name__,
+                            calculator._compile_settings(),
+                            float(s_base), float(v_base))))
+        for array in (is_PV, b, Yb):
+            array = np.ascontiguousarray(array)
+            digest.update(repr((array.dtype.str, array.shape)))
+            digest.update(array.tostring())
+        return digest.hexdigest()
+
+    def load(self, key):
+        """
+        load(self, key)
+
+        Reads the compiled state stored under the given key, its arrays are
+        memory-mapped copy-on-write.
+
+        :param key: the key of the compiled state
+        :type key: str
+        :return: the arrays by name, None if there is no entry with this key
+        :rtype: dict of numpy arrays
+        """
+        path = os.path.join(self._directory, key)
+        if not os.path.isdir(path):
+            return None
+        state = {}
+        for file_name in os.listdir(path):
+            if not file_name.endswith('.npy'):
+                continue
+            file_path = os.path.join(path, file_name)
+            try:
+                array = np.load(file_path, mmap_mode='c')
+            except ValueError:
+                # empty arrays cannot be memory-mapped
+                array = np.load(file_path)
+            state[file_name[:-len('.npy')]] = array
+        return state
+
+    def store(self, key, state):
+        """
+        store(self, key, state)
+
+        Stores the given compiled state under the given key, unless there is
+        already an entry with this key.
+
+        :param key: the key of the compiled state
+        :type key: str
+        :param state: the arrays by name
+        :type state: dict of numpy arrays
+        """
+        path = os.path.join(self._directory, key)
+        if os.path.isdir(path):
+            return
+        temporary_path = tempfile.mkdtemp(prefix='.' + key,
+                                          dir=self._directory)
+        try:
+            for name, array in state.iteritems():
+                np.save(os.path.join(temporary_path, name + '.npy'),
+                        np.asarray(array))
+            try:
+                os.rename(temporary_path, path)
+            except OSError:
+                # another process has stored the same entry in the meantime
+                if not os.path.isdir(path):
+                    raise
+        finally:
+            if os.path.isdir(temporary_path):
+                shutil.rmtree(temporary_path, ignore_errors=True)
+
+    @accepts((1, AbstractElectricalLoadFlowCalculator))
+    def update(self, calculator, s_base, v_base, is_PV, b, Yb):
+        """
+        update(self, calculator, s_base, v_base, is_PV, b, Yb)
+
+        Updates the given calculator with the given values, with
+        :func:`.AbstractElectricalLoadFlowCalculator.load_compiled_state` if
+        the cache has an entry for them, otherwise with
+        :func:`.AbstractElectricalLoadFlowCalculator.update`, the compiled
+        state of the calculator being then stored.
+
+        :param calculator: the load flow calculator
+        :type calculator: :class:`.AbstractElectricalLoadFlowCalculator`
+        :param s_base: reference power value
+        :type s_base: float
+        :param v_base: reference voltage value
+        :type v_base: float
+        :param is_PV: N-long vector specifying which bus is of type
+            :class:`.ElectricalPVBus`
+        :type is_PV: 1-dimensional numpy array of boolean
+        :param b: Mx2 table containing for each branch the ids of start and end
+            buses.
+        :type b: 2-dimensional numpy array of int
+        :param Yb: Mx4 table containing the admittances `Yii`, `Yij`, `Yjj`,
+            and `Yji` of each branch.
+        :type Yb: 2-dimensional numpy array of complex
+        """
+        key = self.key(calculator, s_base, v_base, is_PV, b, Yb)
+        state = self.load(key)
+        if state is not None:
+            calculator.load_compiled_state(s_base, v_base, is_PV, b, Yb,
+                                           state)
+            self._hits += 1
+            return
+        calculator.update(s_base, v_base, is_PV, b, Yb)
+        self.store(key, calculator.get_compiled_state())
+        self._misses += 1
@@ -0,0 +1,303 @@
+"""
+This module provides readers of the usual exchange formats of power system
+cases, to build large networks in an :class:`.ElectricalSimulator`:
+
+- MATPOWER case files (``.m``), see :func:`read_matpower`,
+
+- IEEE Common Data Format files, see :func:`read_ieee_cdf`.
+
+Both readers return an :class:`ElectricalCase`, which adds its buses, branches
+and elements to an electrical simulator with the bulk construction methods
+:func:`.ElectricalSimulator.add_buses`,
+:func:`.ElectricalSimulator.connect_many` and
+:func:`.ElectricalSimulator.attach_many`.
+
+*Example*::
+
+    from gridsim.simulation import Simulator
+    from gridsim.electrical.case import read_matpower
+
+    sim = Simulator()
+    read_matpower('case14.m').build(sim.electrical)
+
+.. seealso:: R. D. Zimmerman, C. E. Murillo-Sanchez, MATPOWER User's Manual,
+             appendix B, and W. W. Price et al., Common Format for Exchange of
+             Solved Load Flow Data, IEEE Transactions on Power Apparatus and
+             Systems, 1973
+"""
+import re
+
+import numpy as np
+
+from gridsim.decorators import accepts
+from gridsim.unit import units
+
+from .core import ElectricalBus
+from .element import ConstantElectricalCPSElement
+from .simulation import ElectricalSimulator
+
+
+def _bus_indices(bus_numbers, numbers):
+    # positions in `bus_numbers` of the buses with the given numbers
+    order = np.argsort(bus_numbers)
+    positions = np.searchsorted(bus_numbers[order], numbers)
+    positions = np.minimum(positions, len(order) - 1)
+    if np.any(bus_numbers[order][positions] != numbers):
+        raise RuntimeError('The case refers to an unknown bus.')
+    return order[positions]
+
+
+class ElectricalCase(object):
+
+    def __init__(self, base_mva, bus_numbers, bus_types, Pd, Pg, from_buses,
+                 to_buses, R, X, B, k_factor):
+        """
+        __init__(self, base_mva, bus_numbers, bus_types, Pd, Pg, from_buses, to_buses, R, X, B, k_factor)
+
+        Column arrays describing a power system case, as read from a case
+        file. Powers are given in MW, impedances and admittances per unit of
+        the case base power `base_mva` and of the base voltages of the buses.
+
+        Transformers are given with the tap on the from-bus side, as in
+        MATPOWER and IEEE Common Data Format files.
+
+        :param base_mva: the base power of the case, in MVA
+        :type base_mva: float
+        :param bus_numbers: the N bus numbers of the case
+        :type bus_numbers: 1-dimensional numpy array of int
+        :param bus_types: the N bus types
+        :type bus_types: list of :class:`.ElectricalBus.Type`
+        :param Pd: the N bus active power demands
+        :type Pd: 1-dimensional numpy array of float
+        :param Pg: the N bus active power generations, i.e. the sum of the
+            generations of the in-service generators of each bus
+        :type Pg: 1-dimensional numpy array of float
+        :param from_buses: the M bus numbers the in-service branches start
+            from
+        :type from_buses: 1-dimensional numpy array of int
+        :param to_buses: the M bus numbers the in-service branches go to
+        :type to_buses: 1-dimensional numpy array of int
+        :param R: the M branch resistances
+        :type R: 1-dimensional numpy array of float
+        :param X: the M branch reactances
+        :type X: 1-dimensional numpy array of float
+        :param B: the M branch line chargings
+        :type B: 1-dimensional numpy array of float
+        :param k_factor: the M transformer K-factors, 1 for lines
+        :type k_factor: 1-dimensional numpy array of complex
+        """
+        super(ElectricalCase, self).__init__()
+
+        self.base_mva = base_mva
+        self.bus_numbers = bus_numbers
+        self.bus_types = bus_types
+        self.Pd = Pd
+        self.Pg = Pg
+        self.from_buses = from_buses
+        self.to_buses = to_buses
+        self.R = R
+        self.X = X
+        self.B = B
+        self.k_factor = k_factor
+
+    @accepts((1, ElectricalSimulator))
+    def build(self, simulator):
+        """
+        build(self, simulator)
+
+        Adds the buses, branches and elements of the case to the given
+        electrical simulator. The reference bus of the case is the slack bus of
+        the simulator, the other buses are named ``'Bus <number>'`` and
+        branches ``'Branch <row>'``, where ``<row>`` is the position of the
+        branch in the case, starting from 1. Each bus with a power demand gets
+        a :class:`.ConstantElectricalCPSElement` named ``'Load <number>'``
+        and each bus with generators a :class:`.ConstantElectricalCPSElement`
+        named ``'Generation <number>'``.
+
+        Values are per unit: impedances are given in ohm and powers in watt,
+        the base power and voltage of the simulator have to stay 1. Only
+        active powers are modelled by the simulator elements, and the powers
+        of the reference bus are not attached since the slack bus balances
+        the network. Line chargings of transformers are neglected.
+
+        :param simulator: the electrical simulator
+        :type simulator: :class:`.ElectricalSimulator`
+        :return: the ids in the simulator of the N buses of the case
+        :rtype: 1-dimensional numpy array of int
+
+        :raise RuntimeError: if the case has not exactly one reference bus
+        """
+        is_slack = np.array([bus_type == ElectricalBus.Type.SLACK_BUS
+                             for bus_type in self.bus_types], dtype=bool)
+        if is_slack.sum() != 1:
+            raise RuntimeError('The case has to have exactly one reference '
+                               'bus.')
+        others = np.flatnonzero(~is_slack)
+
+        # buses
+        buses = simulator.add_buses(
+            ['Bus %d' % number for number in self.bus_numbers[others]],
+            [self.bus_types[i_bus] for i_bus in others])
+        bus_ids = np.zeros(len(self.bus_numbers), dtype=int)
+        bus_ids[others] = [bus.id for bus in buses]
+
+        # branches, the K-factor of gridsim transformers is on the to-bus side
+        from_ids = bus_ids[_bus_indices(self.bus_numbers, self.from_buses)]
+        to_ids = bus_ids[_bus_indices(self.bus_numbers, self.to_buses)]
+        is_transformer = self.k_factor != 1
+        from_ids, to_ids = np.where(is_transformer, to_ids, from_ids), \
+            np.where(is_transformer, from_ids, to_ids)
+        simulator.connect_many(
+            ['Branch %d' % (i_branch + 1)
+             for i_branch in range(len(self.from_buses))],
+            from_ids, to_ids, self.X, self.R, self.B, self.k_factor)
+
+        # elements
+        elements = []
+        element_bus_ids = []
+        scale_factor = 1. / self.base_mva
+        for i_bus in others:
+            if self.Pd[i_bus] != 0:
+                elements.append(ConstantElectricalCPSElement(
+                    'Load %d' % self.bus_numbers[i_bus],
+                    scale_factor * self.Pd[i_bus] * units.watt))
+                element_bus_ids.append(bus_ids[i_bus])
+            if self.Pg[i_bus] != 0:
+                elements.append(ConstantElectricalCPSElement(
+                    'Generation %d' % self.bus_numbers[i_bus],
+                    -scale_factor * self.Pg[i_bus] * units.watt))
+                element_bus_ids.append(bus_ids[i_bus])
+        simulator.attach_many(np.array(element_bus_ids, dtype=int), elements)
+
+        return bus_ids
+
+
+_MATPOWER_BUS_TYPES = {1: ElectricalBus.Type.PQ_BUS,
+                       2: ElectricalBus.Type.PV_BUS,
+                       3: ElectricalBus.Type.SLACK_BUS,
+                       4: ElectricalBus.Type.PQ_BUS}
+
+_CDF_BUS_TYPES = {0: ElectricalBus.Type.PQ_BUS,
+                  1: ElectricalBus.Type.PQ_BUS,
+                  2: ElectricalBus.Type.PV_BUS,
+                  3: ElectricalBus.Type.SLACK_BUS}
+
+
+def _k_factor(ratio, shift):
+    # transformer K-factor from the off-nominal turns ratio (0 for lines) and
+    # the phase shift angle in degree
+    ratio = np.where(ratio == 0, 1., ratio)
+    k_factor = ratio * np.exp(1j * np.deg2rad(shift))
+    # lines and transformers without phase shift have a real K-factor
+    return np.where(shift == 0, ratio, k_factor).astype(complex)
+
+
+def _matpower_matrix(text, name):
+    # numeric matrix assigned to field `name` of the MATPOWER case struct
+    match = re.search(r'\.' + name + r'\s*=\s*\[(.*?)\]', text, re.S)
+    if match is None:
+        raise RuntimeError('The MATPOWER case has no ' + name + ' matrix.')
+    rows = [row.replace(',', ' ').split()
+            for row in re.split(r'[;\n]', match.group(1))]
+    return np.array([[float(value) for value in row] for row in rows if row])
+
+
+@accepts((0, str))
+def read_matpower(file_name):
+    """
+    read_matpower(file_name)
+
+    Reads a MATPOWER case file (version 2), i.e. the ``baseMVA``, ``bus``,
+    ``gen`` and ``branch`` fields of the case struct. Out-of-service
+    generators and branches are ignored.
+
+    :param file_name: the name of the ``.m`` file
+    :type file_name: str
+    :return: the case
+    :rtype: :class:`ElectricalCase`
+
+    :raise RuntimeError: if a field is missing
+    """
+    with open(file_name, 'r') as case_file:
+        # remove comments
+        text = re.sub(r'%[^\n]*', '', case_file.read())
+
+    match = re.search(r'\.baseMVA\s*=\s*([-+.0-9eE]+)', text)
+    if match is None:
+        raise RuntimeError('The MATPOWER case has no baseMVA.')
+    base_mva = float(match.group(1))
+    bus = _matpower_matrix(text, 'bus')
+    gen = _matpower_matrix(text, 'gen')
+    branch = _matpower_matrix(text, 'branch')
+
+    bus_numbers = bus[:, 0].astype(int)
+    bus_types = [_MATPOWER_BUS_TYPES[int(bus_type)] for bus_type in bus[:, 1]]
+
+    # generations of in-service generators, summed by bus
+    gen = gen[gen[:, 7] > 0]
+    Pg = np.bincount(_bus_indices(bus_numbers, gen[:, 0].astype(int)),
+                     gen[:, 1], len(bus_numbers))
+
+    if branch.shape[1] > 10:
+        branch = branch[branch[:, 10] > 0]
+    return ElectricalCase(
+        base_mva, bus_numbers, bus_types, bus[:, 2], Pg,
+        branch[:, 0].astype(int), branch[:, 1].astype(int),
+        branch[:, 2], branch[:, 3], branch[:, 4],
+        _k_factor(branch[:, 8], branch[:, 9]))
+
+
+@accepts((0, str))
+def read_ieee_cdf(file_name):
+    """
+    read_ieee_cdf(file_name)
+
+    Reads an IEEE Common Data Format file, i.e. its title card and its bus
+    and branch data sections. All branches are in service.
+
+    :param file_name: the name of the file
+    :type file_name: str
+    :return: the case
+    :rtype: :class:`ElectricalCase`
+
+    :raise RuntimeError: if a section is missing
+    """
+    bus = []
+    branch = []
+    section = None
+    with open(file_name, 'r') as case_file:
+        title = case_file.readline()
+        for line in case_file:
+            if line.startswith('BUS DATA FOLLOW'):
+                section = bus
+            elif line.startswith('BRANCH DATA FOLLOW'):
+                section = branch
+            elif line.startswith('-999'):
+                section = None
+            elif section is bus and line.strip():
+                # the bus name, in columns 6 to 17, may contain spaces
+                fields = line[18:].split()
+                bus.append((int(line[0:4]), int(fields[2]), float(fields[5]),
+                            float(fields[7])))
+            elif section is branch and line.strip():
+                fields = line.split()
+                branch.append((int(fields[0]), int(fields[1]),
+                               float(fields[6]), float(fields[7]),
+                               float(fields[8]), float(fields[14]),
+                               float(fields[15])))
+    if len(bus) == 0 or len(branch) == 0:
+        raise RuntimeError('The IEEE Common Data Format file has no bus or '
+                           'no branch data.')
+
+    # base power in columns 32 to 37 of the title card
+    base_mva = float(title[31:37])
+    bus_numbers = np.array([values[0] for values in bus])
+    branch = np.array(branch)
+    return ElectricalCase(
+        base_mva, bus_numbers,
+        [_CDF_BUS_TYPES[values[1]] for values in bus],
+        np.array([values[2] for values in bus]),
+        np.array([values[3] for values in bus]),
+        branch[:, 0].astype(int), branch[:, 1].astype(int),
+        branch[:, 2], branch[:, 3], branch[:, 4],
+        _k_factor(branch[:, 5], branch[:, 6]))
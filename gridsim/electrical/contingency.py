@@ -0,0 +1,174 @@
+"""
+This module provides a toolbox to Gridsim to screen the single-branch outages
+(N-1 contingencies) of an electrical network with linear sensitivity factors
+of the direct load flow:
+
+- the Power Transfer Distribution Factors (PTDF), giving the change of the
+  active power flow of each branch when one unit of active power is injected
+  at a bus and withdrawn at the slack bus,
+
+- the Line Outage Distribution Factors (LODF), giving the change of the
+  active power flow of each branch when another branch is taken out of
+  service, relatively to the flow of this branch before the outage.
+
+Both matrices only depend on the network topology, they are computed once from
+the data of a :class:`.DirectLoadFlowCalculator`. The flows of all N-1
+contingencies of a simulation step are then obtained by one matrix product.
+
+.. seealso:: A. J. Wood, B. F. Wollenberg, Power Generation, Operation and
+             Control, 2nd edition, chapter 11
+"""
+import numpy as np
+
+from gridsim.decorators import accepts
+
+from .loadflow import DirectLoadFlowCalculator
+
+
+class ContingencyAnalyzer(object):
+
+    @accepts((1, DirectLoadFlowCalculator))
+    def __init__(self, calculator):
+        """
+        __init__(self, calculator)
+
+        Screens all single-branch outages of the network of the given
+        calculator. The PTDF and LODF matrices are computed at first use, and
+        again each time the network of the calculator has been changed by
+        :func:`.DirectLoadFlowCalculator.update` or
+        :func:`.DirectLoadFlowCalculator.add_branches`.
+
+        The PTDF and LODF matrices are full matrices, of size MxN and MxM,
+        where N is the number of buses including slack and M the number of
+        branches.
+
+        :param calculator: the calculator whose network is analyzed
+        :type calculator: :class:`.DirectLoadFlowCalculator`
+        """
+        super(ContingencyAnalyzer, self).__init__()
+
+        self._calculator = calculator
+        # network change of the calculator the sensitivity factors have been
+        # computed for
+        self._nChanges = None
+        self._ptdf = None
+        self._lodf = None
+        self._is_radial = None
+
+    def _update(self):
+        calc = self._calculator
+        if calc._Bvq_lu is None:
+            # update has not been called
+            raise RuntimeError('The update method of the calculator has to '
+                               'be called first!')
+        if calc._nChanges == self._nChanges:
+            return
+
+        # PTDF: branch flows are bA*Th with Th = [0, B'^-1 P[1:]], hence
+        # PTDF[:, 1:] = bA[:, 1:] B'^-1, computed by solving with transposed
+        # B' for the rows of bA
+        self._ptdf = np.zeros((calc._nBr, calc._nBu))
+        if calc._nBu > 1 and calc._nBr > 0:
+            self._ptdf[:, 1:] = calc._solve(calc._bA[:, 1:].T.toarray(),
+                                            trans=True).T
+
+        # flows due to a unit transfer between the terminations of each branch
+        phi = self._ptdf[:, calc._b[:, 0]] - self._ptdf[:, calc._b[:, 1]]
+        # a branch carrying the whole transfer between its terminations is the
+        # only path between them, its outage splits the network
+        denominator = 1. - np.diagonal(phi)
+        self._is_radial = np.abs(denominator) < 1e-10
+        denominator[self._is_radial] = np.nan
+
+        # LODF: column l gives the flow changes due to the outage of branch l
+        self._lodf = phi / denominator
+        np.fill_diagonal(self._lodf, -1.)
+
+        self._nChanges = calc._nChanges
+
+    @property
+    def ptdf(self):
+        """
+        The MxN matrix of power transfer distribution factors: element
+        ``[m, n]`` is the active power flow on branch `m` due to one unit of
+        active power injected at bus `n` and withdrawn at the slack bus.
+        """
+        self._update()
+        return self._ptdf
+
+    @property
+    def lodf(self):
+        """
+        The MxM matrix of line outage distribution factors: element ``[m, l]``
+        is the change of active power flow on branch `m` due to the outage of
+        branch `l`, per unit of flow on `l` before the outage. Columns of
+        outages splitting the network (see :attr:`radial_branches`) are NaN.
+        """
+        self._update()
+        return self._lodf
+
+    @property
+    def radial_branches(self):
+        """
+        The ids of the branches whose outage splits the network into islands,
+        for which no post-contingency flows can be computed.
+        """
+        self._update()
+        return np.flatnonzero(self._is_radial)
+
+    def post_contingency_flows(self, Pij):
+        """
+        post_contingency_flows(self, Pij)
+
+        Computes the active power flows of all branches after each single
+        branch outage, from the flows before the outage.
+
+        :param Pij: M-long vector of active powers entering the branches from
+            the from-bus termination, e.g. as returned by
+            :func:`.DirectLoadFlowCalculator.get_branch_power_flows`
+        :type Pij: 1-dimensional numpy array of float
+        :return: MxM table whose column `l` gives the flows after the outage
+            of branch `l`; the flow of the outaged branch itself is 0 and
+            columns of outages splitting the network are NaN.
+        :rtype: 2-dimensional numpy array of float
+        """
+        self._update()
+        Pij = np.asarray(Pij, dtype=float)
+        if Pij.shape != (self._lodf.shape[0],):
+            raise RuntimeError('Pij has to be a one-dimensional array with '
+                               'one element per branch.')
+
+        post_flows = Pij[:, np.newaxis] + self._lodf * Pij[np.newaxis, :]
+        # the outaged branch does not carry any power
+        np.fill_diagonal(post_flows, 0.)
+        post_flows[:, self._is_radial] = np.nan
+        return post_flows
+
+    def violations(self, Pij, ratings):
+        """
+        violations(self, Pij, ratings)
+
+        Screens all single branch outages and reports the branches whose
+        active power flow exceeds their rating after an outage. Outages
+        splitting the network are not reported, see :attr:`radial_branches`.
+
+        :param Pij: M-long vector of active powers entering the branches from
+            the from-bus termination, before any outage
+        :type Pij: 1-dimensional numpy array of float
+        :param ratings: M-long vector of maximal active powers of the branches,
+            in the same unit as `Pij`
+        :type ratings: 1-dimensional numpy array of float
+        :return: Kx2 table of the K violations, each row containing the id of
+            the overloaded branch and the id of the outaged branch
+        :rtype: 2-dimensional numpy array of int
+        """
+        post_flows = self.post_contingency_flows(Pij)
+        ratings = np.asarray(ratings, dtype=float)
+        if ratings.shape != (post_flows.shape[0],):
+            raise RuntimeError('ratings has to be a one-dimensional array '
+                               'with one element per branch.')
+
+        # NaN columns are never greater than the ratings
+        with np.errstate(invalid='ignore'):
+            overloaded = np.abs(post_flows) > ratings[:, np.newaxis]
+        return np.transpose(np.nonzero(overloaded))
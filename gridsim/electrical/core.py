@@ -4,12 +4,41 @@
 """
 from enum import Enum
 
+import numpy as np
+
 from gridsim.decorators import accepts
 from gridsim.core import AbstractSimulationElement
 from gridsim.unit import units
 from gridsim.util import Position
 
 
+def _network_value(name, doc):
+    # property reading the value of the element from the arrays of the
+    # electrical simulator the element is bound to, i.e. from attribute `name`
+    # of its `_values` at index `id`, or from the element itself when not
+    # bound or not yet computed
+    local_name = '_' + name
+
+    def fget(self):
+        values = self._values
+        if values is not None:
+            array = getattr(values, name)
+            if array is not None and self.id < len(array):
+                return array[self.id]
+        return getattr(self, local_name)
+
+    def fset(self, value):
+        values = self._values
+        if values is not None:
+            array = getattr(values, name)
+            if array is not None and self.id < len(array):
+                array[self.id] = value
+                return
+        setattr(self, local_name, value)
+
+    return property(fget, fset, doc=doc)
+
+
 class AbstractElectricalElement(AbstractSimulationElement):
 
     @accepts((1, str))
@@ -98,33 +127,41 @@ class ElectricalBus(AbstractElectricalElement):
         """
         The bus geographical position.
         """
-        self.P = None
-        """
+        # arrays of the electrical simulator holding the bus values
+        self._values = None
+        self._P = None
+        self._Q = None
+        self._V = None
+        self._Th = None
+
+    P = _network_value('P', """
         The bus active power.
-        """
-        self.Q = None
-        """
+        """)
+
+    Q = _network_value('Q', """
         The bus reactive power.
-        """
-        self.V = None
-        """
+        """)
+
+    V = _network_value('V', """
         The bus voltage amplitude.
-        """
-        self.Th = None
-        """
+        """)
+
+    Th = _network_value('Th', """
         The bus voltage angle.
-        """
+        """)
 
     def reset(self):
         """
         reset(self)
 
-        Reset bus electrical values to their default values: None
+        Reset bus electrical values to their default values: None. The bus
+        is not bound to the arrays of an electrical simulator any more.
         """
-        self.P = None
-        self.Q = None
-        self.V = None
-        self.Th = None
+        self._values = None
+        self._P = None
+        self._Q = None
+        self._V = None
+        self._Th = None
 
 
 class AbstractElectricalTwoPort(AbstractElectricalElement):
@@ -218,25 +255,60 @@ class ElectricalNetworkBranch(AbstractElectricalElement):
             raise RuntimeError('To_bus bus has not been added to simulator.')
 
         super(ElectricalNetworkBranch, self).__init__(friendly_name)
-        self._from_bus_id = from_bus.id
-        self._to_bus_id = to_bus.id
+        self._initialize(from_bus.id, to_bus.id, two_port, None)
+
+    def _initialize(self, from_bus_id, to_bus_id, two_port, parameters):
+        # sets the attributes of a branch whose base class is initialized,
+        # parameters are the resistance, reactance, line charging and K-factor
+        # of the two-port in SI units, or None if the two-port is given
+        self._from_bus_id = from_bus_id
+        self._to_bus_id = to_bus_id
         self._two_port = two_port
-        self.Pij = None
-        """
+        self._parameters = parameters
+        # arrays of the electrical simulator holding the branch values
+        self._values = None
+        self._Pij = None
+        self._Qij = None
+        self._Pji = None
+        self._Qji = None
+        self._I = None
+        self._Ploss = None
+
+    @classmethod
+    def _from_parameters(cls, friendly_name, from_bus_id, to_bus_id, R, X, B,
+                         k_factor):
+        # creates a branch from parameters already checked, e.g. by
+        # ElectricalSimulator.connect_many, its two-port is only created when
+        # asked for
+        branch = cls.__new__(cls)
+        super(ElectricalNetworkBranch, branch).__init__(friendly_name)
+        branch._initialize(from_bus_id, to_bus_id, None, (R, X, B, k_factor))
+        return branch
+
+    Pij = _network_value('Pij', """
         Active power flowing into the branch from the from-bus terminal.
-        """
-        self.Qij = None
-        """
+        """)
+
+    Qij = _network_value('Qij', """
         Reactive power flowing into the branch from the from-bus terminal.
-        """
-        self.Pji = None
-        """
+        """)
+
+    Pji = _network_value('Pji', """
         Active power flowing into the branch from the to-bus terminal.
-        """
-        self.Qji = None
-        """
+        """)
+
+    Qji = _network_value('Qji', """
         Reactive power flowing into the branch from the to-bus terminal.
-        """
+        """)
+
+    I = _network_value('I', """
+        Current amplitude of the branch, i.e. the largest amplitude of the
+        currents flowing into the branch at its two terminals.
+        """)
+
+    Ploss = _network_value('Ploss', """
+        Active power lost in the branch, i.e. ``Pij + Pji``.
+        """)
 
     @property
     def from_bus_id(self):
@@ -262,20 +334,52 @@ class ElectricalNetworkBranch(AbstractElectricalElement):
         """
         return self._to_bus_id
 
+    @property
+    def two_port(self):
+        """
+        two_port(self)
+
+        Gets the two-port the branch is made of.
+
+        :returns: the two-port on the branch.
+        :rtype: :class:`AbstractElectricalTwoPort`
+        """
+        if self._two_port is None:
+            # imported here, since the network module depends on this one
+            from .network import ElectricalTransmissionLine, \
+                ElectricalGenTransformer
+            R, X, B, k_factor = self._parameters
+            if k_factor == 1:
+                self._two_port = ElectricalTransmissionLine(
+                    self.friendly_name, 1.0*units.metre, X*units.ohm,
+                    R*units.ohm, B*units.siemens)
+            else:
+                self._two_port = ElectricalGenTransformer(
+                    self.friendly_name, k_factor, X*units.ohm, R*units.ohm)
+        return self._two_port
+
     def reset(self):
         """
         reset(self)
 
-        Reset branch electrical values to their default : None
+        Reset branch electrical values to their default : None. The branch
+        is not bound to the arrays of an electrical simulator any more.
         """
-        self.Pij = None
-        self.Qij = None
-        self.Pji = None
-        self.Qji = None
+        self._values = None
+        self._Pij = None
+        self._Qij = None
+        self._Pji = None
+        self._Qji = None
+        self._I = None
+        self._Ploss = None
 
 
 class AbstractElectricalCPSElement(AbstractElectricalElement):
 
+    # stochastic elements draw their random numbers from their `random_state`
+    # generator, which is seeded by the electrical simulator
+    _STOCHASTIC = False
+
     @accepts((1, str))
     def __init__(self, friendly_name):
         """
@@ -302,6 +406,10 @@ class AbstractElectricalCPSElement(AbstractElectricalElement):
         super(AbstractElectricalCPSElement, self).__init__(friendly_name)
         self._delta_energy = 0
         self._internal_delta_energy = 0
+        # group computing the element energies, see
+        # AbstractElectricalCPSElementGroup
+        self._group = None
+        self._group_index = None
 
     @property
     def delta_energy(self):
@@ -314,6 +422,8 @@ class AbstractElectricalCPSElement(AbstractElectricalElement):
         :returns: energy consumed by element during last simulation step.
         :rtype: time, see :mod:`gridsim.unit`
         """
+        if self._group is not None:
+            return self._group.delta_energy[self._group_index]
         return self._delta_energy
 
     @delta_energy.setter
@@ -341,3 +451,98 @@ class AbstractElectricalCPSElement(AbstractElectricalElement):
         :type delta_time: time, see :mod:`gridsim.unit`
         """
         self._delta_energy = self._internal_delta_energy
+
+
+class AbstractElectricalCPSElementGroup(object):
+
+    # see AbstractElectricalCPSElement
+    _STOCHASTIC = False
+
+    def __init__(self, elements):
+        """
+        __init__(self, elements)
+
+        This class is the base for groups of
+        :class:`AbstractElectricalCPSElement` of the same kind, whose energies
+        are computed all at once with array operations instead of one
+        :func:`calculate` and one :func:`update` call per element. The
+        parameters of the elements are held by the group in arrays.
+
+        The elements of the group stay individual elements of the simulation,
+        e.g. for :func:`gridsim.simulation.Simulator.find` and recorders, and
+        their ``delta_energy`` property reads the energy computed by the
+        group. The group is added to the electrical simulator with
+        :func:`.ElectricalSimulator.add_group`.
+
+        :param elements: the elements of the group, not yet part of a group
+        :type elements: list of :class:`AbstractElectricalCPSElement`
+        """
+        super(AbstractElectricalCPSElementGroup, self).__init__()
+
+        self._elements = list(elements)
+        for index, element in enumerate(self._elements):
+            if element._group is not None:
+                raise RuntimeError('The element ' + element.friendly_name +
+                                   ' is already part of a group.')
+            element._group = self
+            element._group_index = index
+        self._delta_energy = np.zeros(len(self._elements))
+        self._internal_delta_energy = np.zeros(len(self._elements))
+
+    @property
+    def elements(self):
+        """
+        The elements of the group, in the order of the group arrays.
+        """
+        return self._elements
+
+    @property
+    def delta_energy(self):
+        """
+        The energy consumed by each element of the group during the last
+        simulation step.
+
+        :rtype: 1-dimensional numpy array of float
+        """
+        return self._delta_energy
+
+    def reset(self):
+        """
+        reset(self)
+
+        Resets the energies of all elements of the group to 0.
+        """
+        self._delta_energy = np.zeros(len(self._elements))
+        self._internal_delta_energy = np.zeros(len(self._elements))
+
+    @accepts(((1, 2), (int, float)))
+    def calculate(self, time, delta_time):
+        """
+        calculate(self, time, delta_time)
+
+        Calculates the energy consumed or produced by each element of the
+        group during the simulation step, see
+        :func:`gridsim.core.AbstractSimulationElement.calculate`.
+
+        :param time: The actual time of the simulator in seconds.
+        :type time: int or float
+        :param delta_time: The delta time for which the calculation has to be
+            done in seconds.
+        :type delta_time: int or float
+        """
+        raise NotImplementedError('Pure abstract method!')
+
+    def update(self, time, delta_time):
+        """
+        update(self, time, delta_time)
+
+        Updates the ``delta_energy`` of all elements of the group to their
+        current value.
+
+        :param time: The actual time of the simulator in seconds.
+        :type time: int or float
+        :param delta_time: The delta time for which the update has to be done
+            in seconds.
+        :type delta_time: int or float
+        """
+        self._delta_energy = self._internal_delta_energy
@@ -3,6 +3,7 @@
 .. codeauthor:: Gilbert Maitre <gilbert.maitre@hevs.ch>
 """
 import csv
+import os
 
 import numpy as np
 
@@ -10,7 +11,8 @@ from gridsim.decorators import accepts, returns
 from gridsim.unit import units
 from gridsim.timeseries import TimeSeries
 
-from .core import AbstractElectricalCPSElement
+from .core import AbstractElectricalCPSElement, \
+    AbstractElectricalCPSElementGroup
 
 
 class ConstantElectricalCPSElement(AbstractElectricalCPSElement):
@@ -43,7 +45,26 @@ class ConstantElectricalCPSElement(AbstractElectricalCPSElement):
         if not isinstance(power, (int, float)):
             power = units.value(units.to_si(power))
         super(ConstantElectricalCPSElement, self).__init__(friendly_name)
-        self.power = power
+        self._power = power
+
+    @property
+    def power(self):
+        """
+        Gets or sets the constant consumed (if positive) or produced (if
+        negative) power, in watt.
+
+        :rtype: float
+        """
+        if self._group is not None:
+            return self._group.power[self._group_index]
+        return self._power
+
+    @power.setter
+    def power(self, value):
+        if self._group is not None:
+            self._group.power[self._group_index] = value
+        else:
+            self._power = value
 
     @accepts(((1, 2), (int, float)))
     def calculate(self, time, delta_time):
@@ -62,6 +83,67 @@ class ConstantElectricalCPSElement(AbstractElectricalCPSElement):
         self._internal_delta_energy = self.power * delta_time
 
 
+class ConstantElectricalCPSElementGroup(AbstractElectricalCPSElementGroup):
+
+    @accepts((1, list))
+    @units.wraps(None, (None, None, units.watt))
+    def __init__(self, friendly_names, powers):
+        """
+        __init__(self, friendly_names, powers)
+
+        This class provides a group of :class:`ConstantElectricalCPSElement`
+        whose powers are held in one array, so that the energies of all
+        elements are computed by a single array operation.
+
+        The elements are created by the group and are added to the electrical
+        simulator with :func:`.ElectricalSimulator.add_group`. Setting the
+        ``power`` of an element changes the array of the group.
+
+        :param friendly_names: Friendly names of the elements. Should be unique
+            within the simulation module.
+        :type friendly_names: list of str
+
+        :param powers: The constant consumed (if positive) or produced
+            (if negative) power of each element.
+        :type powers: 1-D numpy array of power
+
+        """
+        powers = np.array(units.value(powers), dtype=float)
+        if powers.shape != (len(friendly_names),):
+            raise RuntimeError(
+                "'powers' has to be a one-dimensional array with one value by "
+                "element")
+        self._power = powers
+        super(ConstantElectricalCPSElementGroup, self).__init__(
+            [ConstantElectricalCPSElement(friendly_name, 0. * units.watt)
+             for friendly_name in friendly_names])
+
+    @property
+    def power(self):
+        """
+        Gets the array of the powers of the elements.
+
+        :rtype: 1-dimensional numpy array of float
+        """
+        return self._power
+
+    @accepts(((1, 2), (int, float)))
+    def calculate(self, time, delta_time):
+        """
+        calculate(self, time, delta_time)
+
+        Calculates the energy consumed or produced by each element during the
+        simulation step.
+
+        :param time: The actual time of the simulator in seconds.
+        :type time: time, see :mod:`gridsim.unit`
+        :param delta_time: The delta time for which the calculation has to be
+            done in seconds.
+        :type delta_time: time, see :mod:`gridsim.unit`
+        """
+        self._internal_delta_energy = self._power * delta_time
+
+
 class CyclicElectricalCPSElement(AbstractElectricalCPSElement):
 
     @accepts((1, str), ((2, 4), int))
@@ -104,11 +186,26 @@ class CyclicElectricalCPSElement(AbstractElectricalCPSElement):
             raise RuntimeError(
                 "'power_values' has to be a one-dimensional array")
 
+        self._initialize(cycle_delta_time, power_values, cycle_start_time)
+
+    def _initialize(self, cycle_delta_time, power_values, cycle_start_time):
+        # sets the attributes of an element whose base class is initialized,
+        # from values already converted and checked
         self._cycle_delta_time = cycle_delta_time
         self._power_values = power_values
         self._cycle_length = len(power_values)
         self._cycle_start_time = cycle_start_time
 
+    @classmethod
+    def _from_cycle(cls, friendly_name, cycle_delta_time, power_values,
+                    cycle_start_time):
+        # creates an element with a cycle already converted and checked, e.g.
+        # a row of the array of a group
+        element = cls.__new__(cls)
+        super(CyclicElectricalCPSElement, element).__init__(friendly_name)
+        element._initialize(cycle_delta_time, power_values, cycle_start_time)
+        return element
+
     @property
     @returns(int)
     def cycle_delta_time(self):
@@ -189,6 +286,110 @@ class CyclicElectricalCPSElement(AbstractElectricalCPSElement):
         # TODO: verify results
 
 
+class CyclicElectricalCPSElementGroup(AbstractElectricalCPSElementGroup):
+
+    @accepts((1, list), (2, int))
+    @units.wraps(None, (None, None, None, units.watt, None))
+    def __init__(self, friendly_names, cycle_delta_time, power_values,
+                 cycle_start_times=None):
+        """
+        __init__(self, friendly_names, cycle_delta_time, power_values, cycle_start_times=None)
+
+        This class provides a group of :class:`CyclicElectricalCPSElement`
+        sharing the same cycle time resolution and cycle length, whose cycle
+        tables are held in one 2-D array, so that the energies of all elements
+        are computed by a few array operations.
+
+        The elements are created by the group and are added to the electrical
+        simulator with :func:`.ElectricalSimulator.add_group`. The
+        ``power_values`` of an element are a row of the array of the group.
+
+        :param friendly_names: Friendly names of the elements. Should be unique
+            within the simulation module.
+        :type friendly_names: list of str
+
+        :param cycle_delta_time: cycle time resolution value in seconds.
+        :type cycle_delta_time: int
+
+        :param power_values: power values consumed or produced during a cycle,
+            one row by element.
+        :type power_values: 2-D numpy array of power
+
+        :param cycle_start_times: cycle start time of each element in seconds.
+            Defaults to 0 for all elements.
+        :type cycle_start_times: 1-D numpy array of int
+
+        """
+        power_values = np.array(units.value(power_values), dtype=float)
+        if len(power_values.shape) != 2 or \
+                power_values.shape[0] != len(friendly_names):
+            raise RuntimeError(
+                "'power_values' has to be a two-dimensional array with one row "
+                "by element")
+        if cycle_start_times is None:
+            cycle_start_times = np.zeros(len(friendly_names), dtype=int)
+        cycle_start_times = np.asarray(cycle_start_times)
+        if cycle_start_times.shape != (len(friendly_names),):
+            raise RuntimeError(
+                "'cycle_start_times' has to be a one-dimensional array with "
+                "one value by element")
+
+        self._cycle_delta_time = cycle_delta_time
+        self._power_values = power_values
+        self._cycle_length = power_values.shape[1]
+        self._cycle_start_times = cycle_start_times
+
+        elements = []
+        for i_element, friendly_name in enumerate(friendly_names):
+            # the values are already converted, the element reads its cycle
+            # in a row of the array of the group
+            elements.append(CyclicElectricalCPSElement._from_cycle(
+                friendly_name, cycle_delta_time, power_values[i_element],
+                int(cycle_start_times[i_element])))
+        super(CyclicElectricalCPSElementGroup, self).__init__(elements)
+
+    @property
+    def power_values(self):
+        """
+        Gets the cycle power values array, one row by element.
+
+        :rtype: 2-dimensional numpy array of float
+        """
+        return self._power_values
+
+    @accepts(((1, 2), (int, float)))
+    def calculate(self, time, delta_time):
+        """
+        calculate(self, time, delta_time)
+
+        Calculates the energy consumed or produced by each element during the
+        simulation step, as :func:`CyclicElectricalCPSElement.calculate` does.
+
+        :param time: The actual time of the simulator in seconds.
+        :type time: time, see :mod:`gridsim.unit`
+        :param delta_time: The delta time for which the calculation has to be
+            done in seconds.
+        :type delta_time: time, see :mod:`gridsim.unit`
+        """
+        # cycle position of each element at the beginning of the step
+        cycle_pos = np.fix((time - self._cycle_start_times) /
+                           self._cycle_delta_time).astype(int) \
+            % self._cycle_length
+
+        # the step is split into the cycle intervals it overlaps, the last one
+        # may be partial
+        n_intervals = int(np.ceil(float(delta_time) / self._cycle_delta_time))
+        starts = np.arange(n_intervals) * self._cycle_delta_time
+        ends = np.minimum(starts + self._cycle_delta_time, delta_time)
+        weights = (ends - starts) / self._cycle_delta_time
+
+        positions = (cycle_pos[:, np.newaxis] + np.arange(n_intervals)) \
+            % self._cycle_length
+        rows = np.arange(len(self._elements))[:, np.newaxis]
+        self._internal_delta_energy = \
+            self._power_values[rows, positions].dot(weights)
+
+
 class UpdatableCyclicElectricalCPSElement(CyclicElectricalCPSElement):
 
     @accepts((1, str),
@@ -281,6 +482,8 @@ class UpdatableCyclicElectricalCPSElement(CyclicElectricalCPSElement):
 
 class GaussianRandomElectricalCPSElement(AbstractElectricalCPSElement):
 
+    _STOCHASTIC = True
+
     @accepts((1, str))
     @units.wraps(None, (None, None, units.watt, units.watt))
     def __init__(self, friendly_name, mean_power, standard_deviation):
@@ -318,6 +521,7 @@ class GaussianRandomElectricalCPSElement(AbstractElectricalCPSElement):
         super(GaussianRandomElectricalCPSElement, self).__init__(friendly_name)
         self._mean_power = mean_power
         self._standard_deviation = standard_deviation
+        self._random_state = np.random
 
     @property
     @returns((int, float))
@@ -328,6 +532,8 @@ class GaussianRandomElectricalCPSElement(AbstractElectricalCPSElement):
         :returns: mean power value.
         :rtype: power, see :mod:`gridsim.unit`
         """
+        if self._group is not None:
+            return self._group.mean_power[self._group_index]
         return self._mean_power
 
     @property
@@ -338,8 +544,26 @@ class GaussianRandomElectricalCPSElement(AbstractElectricalCPSElement):
         :returns: standard deviation value.
         :rtype: float
         """
+        if self._group is not None:
+            return self._group.standard_deviation[self._group_index]
         return self._standard_deviation
 
+    @property
+    def random_state(self):
+        """
+        Gets or sets the random number generator of the element. Defaults to
+        the global generator :mod:`numpy.random`, the electrical simulator
+        sets an independent stream of its
+        :attr:`.ElectricalSimulator.random_streams`.
+
+        :rtype: :class:`numpy.random.RandomState`
+        """
+        return self._random_state
+
+    @random_state.setter
+    def random_state(self, value):
+        self._random_state = value
+
     @accepts(((1, 2), (int, float)))
     def calculate(self, time, delta_time):
         """
@@ -354,7 +578,108 @@ class GaussianRandomElectricalCPSElement(AbstractElectricalCPSElement):
             done in seconds.
         :type delta_time: time, see :mod:`gridsim.unit`
         """
-        normal = np.random.normal(self._mean_power, self._standard_deviation)
+        normal = self._random_state.normal(self.mean_power,
+                                           self.standard_deviation)
+
+        self._internal_delta_energy = normal * delta_time
+
+
+class GaussianRandomElectricalCPSElementGroup(
+        AbstractElectricalCPSElementGroup):
+
+    _STOCHASTIC = True
+
+    @accepts((1, list))
+    @units.wraps(None, (None, None, units.watt, units.watt))
+    def __init__(self, friendly_names, mean_powers, standard_deviations):
+        """
+        __init__(self, friendly_names, mean_powers, standard_deviations)
+
+        This class provides a group of
+        :class:`GaussianRandomElectricalCPSElement` whose powers are drawn at
+        each step by a single call to the random number generator of the
+        group.
+
+        The elements are created by the group and are added to the electrical
+        simulator with :func:`.ElectricalSimulator.add_group`.
+
+        :param friendly_names: Friendly names of the elements. Should be unique
+            within the simulation module.
+        :type friendly_names: list of str
+
+        :param mean_powers: The mean value of the Gaussian distributed power
+            of each element.
+        :type mean_powers: 1-D numpy array of power
+
+        :param standard_deviations: The standard deviation of the Gaussian
+            distributed power of each element.
+        :type standard_deviations: 1-D numpy array of power
+
+        """
+        mean_powers = np.array(units.value(mean_powers), dtype=float)
+        standard_deviations = np.array(units.value(standard_deviations),
+                                       dtype=float)
+        if mean_powers.shape != (len(friendly_names),) or \
+                standard_deviations.shape != (len(friendly_names),):
+            raise RuntimeError(
+                "'mean_powers' and 'standard_deviations' have to be "
+                "one-dimensional arrays with one value by element")
+        self._mean_power = mean_powers
+        self._standard_deviation = standard_deviations
+        self._random_state = np.random
+        super(GaussianRandomElectricalCPSElementGroup, self).__init__(
+            [GaussianRandomElectricalCPSElement(
+                friendly_name, 0. * units.watt, 0. * units.watt)
+             for friendly_name in friendly_names])
+
+    @property
+    def mean_power(self):
+        """
+        Gets the array of the mean powers of the elements.
+
+        :rtype: 1-dimensional numpy array of float
+        """
+        return self._mean_power
+
+    @property
+    def standard_deviation(self):
+        """
+        Gets the array of the standard deviations of the elements.
+
+        :rtype: 1-dimensional numpy array of float
+        """
+        return self._standard_deviation
+
+    @property
+    def random_state(self):
+        """
+        Gets or sets the random number generator of the group, see
+        :attr:`GaussianRandomElectricalCPSElement.random_state`.
+
+        :rtype: :class:`numpy.random.RandomState`
+        """
+        return self._random_state
+
+    @random_state.setter
+    def random_state(self, value):
+        self._random_state = value
+
+    @accepts(((1, 2), (int, float)))
+    def calculate(self, time, delta_time):
+        """
+        calculate(self, time, delta_time)
+
+        Calculates the energy consumed or produced by each element during the
+        simulation step.
+
+        :param time: The actual time of the simulator in seconds.
+        :type time: time, see :mod:`gridsim.unit`
+        :param delta_time: The delta time for which the calculation has to be
+            done in seconds.
+        :type delta_time: time, see :mod:`gridsim.unit`
+        """
+        normal = self._random_state.normal(self._mean_power,
+                                           self._standard_deviation)
 
         self._internal_delta_energy = normal * delta_time
 
@@ -415,8 +740,49 @@ class TimeSeriesElectricalCPSElement(AbstractElectricalCPSElement):
         self._internal_delta_energy = units.value(self._time_series.power) * delta_time
 
 
+class _AliasTable(object):
+
+    def __init__(self, probabilities):
+        # builds the tables of the alias method of Walker, in the version of
+        # Vose, to draw indices with the given probabilities in constant time:
+        # index i is drawn with a uniform probability and kept with
+        # probability `self.prob[i]`, otherwise replaced by `self.alias[i]`
+        super(_AliasTable, self).__init__()
+
+        n = len(probabilities)
+        scaled = np.asarray(probabilities, dtype=float) * (n / np.sum(
+            probabilities))
+        self.prob = np.ones(n)
+        self.alias = np.arange(n)
+        small = list(np.flatnonzero(scaled < 1.))
+        large = list(np.flatnonzero(scaled >= 1.))
+        while small and large:
+            i_small = small.pop()
+            i_large = large.pop()
+            self.prob[i_small] = scaled[i_small]
+            self.alias[i_small] = i_large
+            scaled[i_large] += scaled[i_small] - 1.
+            if scaled[i_large] < 1.:
+                small.append(i_large)
+            else:
+                large.append(i_large)
+        # remaining probabilities are 1 up to rounding errors
+
+    def sample(self, random_state, size=None):
+        # draws `size` indices, or a single index if `size` is None
+        u = random_state.random_sample(size) * len(self.prob)
+        index = np.minimum(np.asarray(u, dtype=int), len(self.prob) - 1)
+        index = np.where(u - index < self.prob[index], index,
+                         self.alias[index])
+        if size is None:
+            return int(index)
+        return index
+
+
 class AnyIIDRandomElectricalCPSElement(AbstractElectricalCPSElement):
 
+    _STOCHASTIC = True
+
     @accepts((1, str),
              (2, (str, np.ndarray)),
              (3, (type(None), np.ndarray)))
@@ -457,22 +823,58 @@ class AnyIIDRandomElectricalCPSElement(AbstractElectricalCPSElement):
         """
 
         # HACK: when object is constructed with *args or **kwargs
-        if fname_or_power_values.dtype is not (int, float):
-           fname_or_power_values = units.value(units.to_si(fname_or_power_values))
+        if not isinstance(fname_or_power_values, str):
+            fname_or_power_values = units.value(fname_or_power_values)
 
         super(AnyIIDRandomElectricalCPSElement, self).__init__(friendly_name)
-        # if first parameter is a string (name of a file), read data
+        # if first parameter is a string (name of a file), read data, unless
+        # the file has already been read by another element
         if isinstance(fname_or_power_values, str):
             if not frequencies is None:
                 raise RuntimeError(
                     "'frequencies' cannot be passed as argument, they are read "
                     "from file with name '" + fname_or_power_values +
                     "' in this case")
-            [power_values, frequencies] = self._read_hist_from_file(
-                fname_or_power_values)
+            # a file modified since it has been read is read again
+            path = os.path.abspath(fname_or_power_values)
+            status = os.stat(path)
+            signature = (status.st_mtime, status.st_size)
+            histogram = AnyIIDRandomElectricalCPSElement._histograms.get(path)
+            if histogram is None or histogram[0] != signature:
+                [power_values, frequencies] = self._read_hist_from_file(
+                    fname_or_power_values)
+                histogram = (signature,
+                             self._distribution(power_values, frequencies))
+                AnyIIDRandomElectricalCPSElement._histograms[path] = histogram
+            self._initialize(histogram[1])
         else:
-            power_values = fname_or_power_values  # just copy variable
-        # check
+            self._initialize(self._distribution(fname_or_power_values,
+                                                frequencies))
+
+    def _initialize(self, distribution):
+        # sets the attributes of an element whose base class is initialized,
+        # distribution is made of the power values, CDF and alias table
+        self._random_state = np.random
+        self._power_values, self._cdf, self._alias_table = distribution
+
+    @classmethod
+    def _from_distribution(cls, friendly_name, distribution):
+        # creates an element with a distribution already checked by
+        # _distribution, e.g. shared with another element
+        element = cls.__new__(cls)
+        super(AnyIIDRandomElectricalCPSElement, element).__init__(
+            friendly_name)
+        element._initialize(distribution)
+        return element
+
+    # distributions of the histogram files already read, with the
+    # modification time and size of the files, by absolute file name
+    _histograms = {}
+
+    @staticmethod
+    def _distribution(power_values, frequencies):
+        # checks the distribution and returns its power values, CDF and alias
+        # table
         if power_values.dtype != float:
             raise TypeError("'power_values' has to be an array of floats.")
         if len(power_values.shape) != 1:
@@ -487,14 +889,13 @@ class AnyIIDRandomElectricalCPSElement(AbstractElectricalCPSElement):
         if frequencies.shape[0] != power_values.shape[0]:
             raise RuntimeError(
                 "'frequencies' and 'power_values' must have the same length")
-        self._power_values = power_values
         if frequencies[-1] == 1.0:
             for i_pos in range(1, frequencies.shape[0]):
                 if frequencies[i_pos] <= frequencies[i_pos - 1]:
                     raise RuntimeError(
                         "cumulative relative 'frequencies' should be "
                         "monotonically increasing.")
-            self._cdf = frequencies
+            cdf = frequencies
         else:
             if frequencies.dtype == int:
                 frequencies.astype('float')
@@ -502,7 +903,8 @@ class AnyIIDRandomElectricalCPSElement(AbstractElectricalCPSElement):
             if sum_freq == 0.:
                 raise TypeError(
                     "sum of values in 'frequencies' may not be zero.")
-            self._cdf = np.cumsum((1.0 / sum_freq) * frequencies)
+            cdf = np.cumsum((1.0 / sum_freq) * frequencies)
+        return power_values, cdf, _AliasTable(np.ediff1d(cdf, to_begin=cdf[0]))
 
     @accepts((1, str))
     def _read_hist_from_file(self, fname):
@@ -549,6 +951,20 @@ class AnyIIDRandomElectricalCPSElement(AbstractElectricalCPSElement):
         """
         return self._cdf
 
+    @property
+    def random_state(self):
+        """
+        Gets or sets the random number generator of the element, see
+        :attr:`GaussianRandomElectricalCPSElement.random_state`.
+
+        :rtype: :class:`numpy.random.RandomState`
+        """
+        return self._random_state
+
+    @random_state.setter
+    def random_state(self, value):
+        self._random_state = value
+
     def calculate(self, time, delta_time):
         """
         Calculate the element's the energy consumed or produced by the element
@@ -561,7 +977,91 @@ class AnyIIDRandomElectricalCPSElement(AbstractElectricalCPSElement):
         :type delta_time: float
         """
         self._internal_delta_energy = \
-            self._power_values[np.searchsorted(self._cdf,
-                                               np.random.random())] * delta_time
+            self._power_values[self._alias_table.sample(
+                self._random_state)] * delta_time
 
 
+class AnyIIDRandomElectricalCPSElementGroup(
+        AbstractElectricalCPSElementGroup):
+
+    _STOCHASTIC = True
+
+    @accepts((1, list),
+             (2, (str, np.ndarray)),
+             (3, (type(None), np.ndarray)))
+    def __init__(self, friendly_names, fname_or_power_values,
+                 frequencies=None):
+        """
+        __init__(self, friendly_names, fname_or_power_values, frequencies=None)
+
+        This class provides a group of
+        :class:`AnyIIDRandomElectricalCPSElement` sharing the same
+        distribution, whose powers are drawn at each step by a single
+        vectorized draw from the alias table of the distribution.
+
+        The elements are created by the group and are added to the electrical
+        simulator with :func:`.ElectricalSimulator.add_group`.
+
+        :param friendly_names: Friendly names of the elements. Should be unique
+            within the simulation module.
+        :type friendly_names: list of str
+
+        :param fname_or_power_values: Name of the file from which the
+            distribution has to be read or power values, see
+            :class:`AnyIIDRandomElectricalCPSElement`.
+        :type fname_or_power_values: either string or 1-D numpy array of float
+
+        :param frequencies: Frequencies of the power values, see
+            :class:`AnyIIDRandomElectricalCPSElement`.
+        :type frequencies: None or 1-D numpy array of integer or float
+        """
+        self._random_state = np.random
+        elements = []
+        distribution = None
+        for friendly_name in friendly_names:
+            if distribution is None:
+                element = AnyIIDRandomElectricalCPSElement(
+                    friendly_name, fname_or_power_values, frequencies)
+                distribution = (element.power_values, element.cdf,
+                                element._alias_table)
+            else:
+                # the elements share the distribution of the first one
+                element = AnyIIDRandomElectricalCPSElement._from_distribution(
+                    friendly_name, distribution)
+            elements.append(element)
+        if distribution is not None:
+            self._power_values, cdf, self._alias_table = distribution
+        super(AnyIIDRandomElectricalCPSElementGroup, self).__init__(elements)
+
+    @property
+    def random_state(self):
+        """
+        Gets or sets the random number generator of the group, see
+        :attr:`GaussianRandomElectricalCPSElement.random_state`.
+
+        :rtype: :class:`numpy.random.RandomState`
+        """
+        return self._random_state
+
+    @random_state.setter
+    def random_state(self, value):
+        self._random_state = value
+
+    @accepts(((1, 2), (int, float)))
+    def calculate(self, time, delta_time):
+        """
+        calculate(self, time, delta_time)
+
+        Calculates the energy consumed or produced by each element during the
+        simulation step.
+
+        :param time: The actual time of the simulator in seconds.
+        :type time: time, see :mod:`gridsim.unit`
+        :param delta_time: The delta time for which the calculation has to be
+            done in seconds.
+        :type delta_time: time, see :mod:`gridsim.unit`
+        """
+        if len(self._elements) > 0:
+            self._internal_delta_energy = self._power_values[
+                self._alias_table.sample(self._random_state,
+                                         len(self._elements))] * delta_time
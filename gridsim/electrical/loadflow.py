@@ -11,12 +11,410 @@ power-flow problem:
 .. seealso::
     http://en.wikipedia.org/wiki/Power-flow_study#Power-flow_problem_formulation
 """
+from enum import Enum
+from timeit import default_timer
+
 import numpy as np
-from numpy.linalg import inv
-from scipy.sparse import lil_matrix
+from scipy.sparse import csr_matrix, csc_matrix, diags, vstack, hstack
+from scipy.sparse.linalg import splu, spilu, gmres, bicgstab, \
+    LinearOperator
+from scipy.sparse.csgraph import breadth_first_order
 
 from gridsim.decorators import accepts, returns
 
+# all factorized matrices (susceptance matrices, Jacobian) have a symmetric
+# sparsity pattern, minimum degree ordering on A^T+A gives the least fill-in
+_PERMC_SPEC = 'MMD_AT_PLUS_A'
+
+# batched Newton-Raphson steps of networks with at most this number of unknowns
+# are solved with full Jacobian matrices, by chunks of at most this number of
+# matrix element
+_DENSE_BATCH_MAX_UNKNOWNS = 200
+_DENSE_BATCH_MAX_ELEMENTS = 2 ** 22
+
+# maximal number of branches added to the network of a calculator with
+# low-rank updates before matrices are factorized again
+_MAX_LOW_RANK_UPDATES = 32
+
+# iterative solves whose residual grows beyond this ratio of the residual of
+# their first iteration are considered as diverging
+_DIVERGENCE_RATIO = 1e6
+
+# Krylov linear solvers: the incomplete LU factorization of a matrix is
+# computed again when its entries have changed by more than this ratio, in
+# Frobenius norm, since the factorization
+_ILU_REFRESH_RATIO = 0.1
+# drop tolerance and fill factor of the incomplete LU factorizations
+_ILU_DROP_TOL = 1e-4
+_ILU_FILL_FACTOR = 10
+# largest relative tolerance of the inexact solves of iterative calculators,
+# the tolerance of a solve is the residual of its iteration below this term
+_MAX_FORCING_TERM = 0.1
+
+
+def _put_sparse(state, name, matrix):
+    # stores the arrays of a CSR or CSC matrix into a compiled state
+    state[name + '.data'] = matrix.data
+    state[name + '.indices'] = matrix.indices
+    state[name + '.indptr'] = matrix.indptr
+    state[name + '.shape'] = np.array(matrix.shape)
+
+
+def _get_sparse(state, name, matrix_class):
+    # reads a CSR or CSC matrix stored by _put_sparse
+    return matrix_class((state[name + '.data'], state[name + '.indices'],
+                         state[name + '.indptr']),
+                        shape=tuple(state[name + '.shape']))
+
+
+class _OrderedLU(object):
+
+    def __init__(self, matrix, perm_c):
+        # LU factorization of a CSC matrix with a known fill-reducing column
+        # ordering, e.g. read from a compiled state: the ordering is not
+        # computed again, only the numerical factorization is done
+        self.perm_c = perm_c
+        self._lu = splu(matrix[:, perm_c].tocsc(), permc_spec='NATURAL')
+
+    def solve(self, rhs, trans='N'):
+        # same interface as SuperLU.solve, the column permutation applies to
+        # the solution, or to the right-hand side of the transposed system
+        if trans == 'N':
+            x = np.empty(rhs.shape)
+            x[self.perm_c] = self._lu.solve(rhs)
+            return x
+        return self._lu.solve(np.asfortranarray(rhs[self.perm_c]), trans=trans)
+
+
+def _factorize(matrix, perm_c=None):
+    # sparse LU factorization of a CSC matrix, with the given column ordering
+    # if any
+    if perm_c is None:
+        return splu(matrix, permc_spec=_PERMC_SPEC)
+    return _OrderedLU(matrix, perm_c)
+
+
+class LinearSolver(Enum):
+    """
+    The way the linear systems of the iterations of
+    :class:`SparseNewtonRaphsonLoadFlowCalculator` and
+    :class:`FastDecoupledLoadFlowCalculator` are solved.
+    """
+    DIRECT = 0
+    """
+    Sparse LU factorization, the systems are solved exactly.
+    """
+    GMRES = 1
+    """
+    Restarted GMRES preconditioned by an incomplete LU factorization. The
+    systems are solved inexactly, with a relative tolerance tied to the
+    residual of the iteration, which saves the memory of the complete
+    factorization on very large networks. The matrix is factorized completely
+    when the method breaks down or does not reach the tolerance. The scenarios
+    of a batched load flow, see
+    :func:`AbstractElectricalLoadFlowCalculator.calculate_many`, are solved
+    one after the other, with the same preconditioner.
+    """
+    BICGSTAB = 2
+    """
+    BiCGStab preconditioned by an incomplete LU factorization, as
+    :attr:`GMRES` but with a fixed memory use per solve.
+    """
+
+
+def _forcing_term(residual):
+    # relative tolerance of the inexact solve of an iteration whose residual
+    # is given, the iterations keep converging quadratically near the solution
+    return min(_MAX_FORCING_TERM, residual)
+
+
+class _KrylovSolver(object):
+
+    def __init__(self, linear_solver, matrix):
+        # Krylov method of the solves, relative tolerance of the next solves
+        # and number of incomplete or complete factorizations computed so far
+        self._method = gmres if linear_solver == LinearSolver.GMRES \
+            else bicgstab
+        self.tolerance = _MAX_FORCING_TERM
+        self.factorizations = 0
+        self._matrix = None
+        self._preconditioner = None
+        # entries of the matrix the preconditioner has been computed from,
+        # and whether it is the current matrix
+        self._reference = None
+        self._is_current = False
+        # complete factorization of the matrix, only computed when the Krylov
+        # method fails
+        self._lu = None
+        self.update(matrix)
+
+    def update(self, matrix):
+        # sets the CSC matrix of the next solves, with the same sparsity
+        # pattern as the previous one, its incomplete factorization is kept
+        # while its entries change little
+        self._matrix = matrix
+        self._is_current = False
+        self._lu = None
+        if self._reference is None or len(self._reference) != matrix.nnz or \
+                np.linalg.norm(matrix.data - self._reference) > \
+                _ILU_REFRESH_RATIO * np.linalg.norm(self._reference):
+            self._precondition()
+
+    def _precondition(self):
+        ilu = spilu(self._matrix, drop_tol=_ILU_DROP_TOL,
+                    fill_factor=_ILU_FILL_FACTOR)
+        self._preconditioner = LinearOperator(self._matrix.shape,
+                                              matvec=ilu.solve)
+        self._reference = self._matrix.data.copy()
+        self._is_current = True
+        self.factorizations += 1
+
+    def solve(self, rhs):
+        # same interface as SuperLU.solve, one column per right-hand side,
+        # Krylov methods solve them one after the other
+        if rhs.ndim == 2:
+            x = np.empty(rhs.shape)
+            for k in range(rhs.shape[1]):
+                x[:, k] = self._solve(rhs[:, k])
+            return x
+        return self._solve(rhs)
+
+    def _solve(self, rhs):
+        # the tolerance is only relative to the right-hand side, see
+        # _forcing_term
+        x, info = self._method(self._matrix, rhs, tol=self.tolerance, atol=0.,
+                               M=self._preconditioner)
+        if info > 0 and not self._is_current:
+            # the factorization of an older matrix is not good enough
+            self._precondition()
+            x, info = self._method(self._matrix, rhs, tol=self.tolerance,
+                                   atol=0., M=self._preconditioner)
+        if info != 0:
+            # the method broke down (info < 0) or did not reach the tolerance
+            # with the preconditioner of the current matrix, which is then
+            # factorized completely
+            if self._lu is None:
+                self._lu = _factorize(self._matrix)
+                self.factorizations += 1
+            x = self._lu.solve(rhs)
+        return x
+
+
+def admittance_matrix(b, Yb, n_buses):
+    """
+    admittance_matrix(b, Yb, n_buses)
+
+    Computes the admittance matrix of a network of N buses and M branches, as
+    a sparse matrix. Duplicate entries, i.e. diagonal element and parallel
+    branches, are summed up.
+
+    :param b: Mx2 table containing for each branch the ids of start and end
+        buses
+    :type b: 2-dimensional numpy array of int
+    :param Yb: Mx4 table containing the admittances `Yii`, `Yij`, `Yjj`, and
+        `Yji` of each branch
+    :type Yb: 2-dimensional numpy array of complex
+    :param n_buses: the number N of buses, including slack
+    :type n_buses: int
+    :returns: the NxN admittance matrix
+    :rtype: :class:`scipy.sparse.csr_matrix` of complex
+    """
+    i_bus = b[:, 0]
+    j_bus = b[:, 1]
+    rows = np.concatenate((i_bus, j_bus, i_bus, j_bus))
+    cols = np.concatenate((j_bus, i_bus, i_bus, j_bus))
+    # off-diagonal element, then diagonal element
+    data = np.concatenate((-Yb[:, 1], -Yb[:, 3], Yb[:, 0], Yb[:, 2]))
+    return csr_matrix((data, (rows, cols)), shape=(n_buses, n_buses),
+                      dtype=complex)
+
+
+def branch_power_flows(V, Th, b, Yb):
+    """
+    branch_power_flows(V, Th, b, Yb)
+
+    Computes the power flows of M branches from the voltages of the N buses,
+    as :func:`AbstractElectricalLoadFlowCalculator.get_branch_power_flows`.
+
+    :param V: N-long vector of bus voltage amplitudes
+    :type V: 1-dimensional numpy array of float
+    :param Th: N-long vector of bus voltage angles
+    :type Th: 1-dimensional numpy array of float
+    :param b: Mx2 table containing for each branch the ids of start and end
+        buses
+    :type b: 2-dimensional numpy array of int
+    :param Yb: Mx4 table containing the admittances `Yii`, `Yij`, `Yjj`, and
+        `Yji` of each branch
+    :type Yb: 2-dimensional numpy array of complex
+    :returns: the M-long vectors Pij, Qij, Pji and Qji of the active and
+        reactive powers entering the branches from their from-bus and to-bus
+        terminals
+    :rtype: tuple of one-dimensional numpy arrays of float
+    """
+    # compute partial results
+    ViVj = V[b[:, 0]] * V[b[:, 1]]
+    dThij = Th[b[:, 0]] - Th[b[:, 1]]
+    e_j_dThij = np.exp(1j * dThij)
+
+    # branch flow from from-bus terminal
+    Vi2 = V[b[:, 0]] * V[b[:, 0]]
+    e_j_dThij_Yij_ = e_j_dThij * np.conjugate(Yb[:, 1])
+    Pij = Vi2 * np.real(Yb[:, 0]) - ViVj * np.real(e_j_dThij_Yij_)
+    Qij = Vi2 * (-np.imag(Yb[:, 0])) - ViVj * np.imag(e_j_dThij_Yij_)
+
+    # branch flow from to-bus terminal
+    Vj2 = V[b[:, 1]] * V[b[:, 1]]
+    e_j_dThji_Yji_ = np.conjugate(e_j_dThij) * np.conjugate(Yb[:, 3])
+    Pji = Vj2 * np.real(Yb[:, 2]) - ViVj * np.real(e_j_dThji_Yji_)
+    Qji = Vj2 * (-np.imag(Yb[:, 2])) - ViVj * np.imag(e_j_dThji_Yji_)
+
+    return Pij, Qij, Pji, Qji
+
+
+def branch_currents(V, Th, b, Yb):
+    """
+    branch_currents(V, Th, b, Yb)
+
+    Computes the current amplitude of M branches from the voltages of the N
+    buses, i.e. for each branch the largest amplitude of the currents
+    ``Yii*Vi - Yij*Vj`` and ``Yjj*Vj - Yji*Vi`` flowing into the branch at its
+    from-bus and to-bus terminals.
+
+    :param V: N-long vector of bus voltage amplitudes
+    :type V: 1-dimensional numpy array of float
+    :param Th: N-long vector of bus voltage angles
+    :type Th: 1-dimensional numpy array of float
+    :param b: Mx2 table containing for each branch the ids of start and end
+        buses
+    :type b: 2-dimensional numpy array of int
+    :param Yb: Mx4 table containing the admittances `Yii`, `Yij`, `Yjj`, and
+        `Yji` of each branch
+    :type Yb: 2-dimensional numpy array of complex
+    :returns: M-long vector of branch current amplitudes
+    :rtype: 1-dimensional numpy array of float
+    """
+    # complex bus voltages (amplitude and phase) at both branch ends
+    Vc = V * np.exp(1j * Th)
+    Vi_c = Vc[b[:, 0]]
+    Vj_c = Vc[b[:, 1]]
+
+    Iij = np.abs(Yb[:, 0] * Vi_c - Yb[:, 1] * Vj_c)
+    Iji = np.abs(Yb[:, 2] * Vj_c - Yb[:, 3] * Vi_c)
+    return np.maximum(Iij, Iji)
+
+
+class LoadFlowStatistics(object):
+
+    def __init__(self, iterations=0, residual=None, time=0.,
+                 factorizations=0, converged=True, diverged=False):
+        """
+        __init__(self, iterations=0, residual=None, time=0., factorizations=0, converged=True, diverged=False)
+
+        Record of the work done by one call to
+        :func:`AbstractElectricalLoadFlowCalculator.calculate`, see
+        :attr:`AbstractElectricalLoadFlowCalculator.statistics`.
+        """
+        super(LoadFlowStatistics, self).__init__()
+
+        self.iterations = iterations
+        """
+        The number of iterations, 0 for direct methods.
+        """
+        self.residual = residual
+        """
+        The largest residual error on bus powers after the last iteration,
+        None for direct methods.
+        """
+        self.time = time
+        """
+        The wall time of the solve, in second.
+        """
+        self.factorizations = factorizations
+        """
+        The number of matrices factorized during the solve, 0 if the solve
+        only reused the factorizations done when the network was updated.
+        """
+        self.converged = converged
+        """
+        Whether the solve has converged.
+        """
+        self.diverged = diverged
+        """
+        Whether the solve has been stopped because its residual was not finite
+        or was growing, rather than because it reached the maximal number of
+        iterations.
+        """
+
+
+class LoadFlowRunStatistics(object):
+
+    def __init__(self):
+        """
+        __init__(self)
+
+        Aggregation of the :class:`LoadFlowStatistics` of many solves, e.g.
+        of all the load flows computed by the :class:`.ElectricalSimulator`
+        during a simulation run.
+        """
+        super(LoadFlowRunStatistics, self).__init__()
+
+        self.solves = 0
+        """
+        The number of solves.
+        """
+        self.iterations = 0
+        """
+        The total number of iterations.
+        """
+        self.max_iterations = 0
+        """
+        The largest number of iterations of one solve.
+        """
+        self.time = 0.
+        """
+        The total wall time of the solves, in second.
+        """
+        self.max_time = 0.
+        """
+        The largest wall time of one solve, in second.
+        """
+        self.factorizations = 0
+        """
+        The total number of matrices factorized during the solves.
+        """
+        self.max_residual = None
+        """
+        The largest final residual of one solve, None if no solve has a
+        residual.
+        """
+        self.failures = 0
+        """
+        The number of solves that have not converged.
+        """
+
+    @accepts((1, LoadFlowStatistics))
+    def add(self, statistics):
+        """
+        add(self, statistics)
+
+        Adds the statistics of one solve to the aggregation.
+
+        :param statistics: the statistics of the solve
+        :type statistics: :class:`LoadFlowStatistics`
+        """
+        self.solves += 1
+        self.iterations += statistics.iterations
+        self.max_iterations = max(self.max_iterations, statistics.iterations)
+        self.time += statistics.time
+        self.max_time = max(self.max_time, statistics.time)
+        self.factorizations += statistics.factorizations
+        if statistics.residual is not None:
+            self.max_residual = statistics.residual \
+                if self.max_residual is None \
+                else max(self.max_residual, statistics.residual)
+        if not statistics.converged:
+            self.failures += 1
+
 
 class AbstractElectricalLoadFlowCalculator(object):
 
@@ -60,11 +458,39 @@ class AbstractElectricalLoadFlowCalculator(object):
         self._nQ = None
         self._nBr = None
         self._is_PQ = None
+        self._y_sc = None
         self._Y = None
         self._P = None
         self._Q = None
         self._V = None
         self._Th = None
+        self._reuse_arrays = False
+        self._statistics = None
+
+    @property
+    def reuse_arrays(self):
+        """
+        Whether :func:`calculate` returns the work arrays of the calculator,
+        which the next call overwrites, instead of new arrays. The work arrays
+        are allocated at the first call after :func:`update` and filled in
+        place by the next calls, reusing them saves the allocation of the
+        returned vectors at each call. The :class:`.ElectricalSimulator`
+        supports calculators reusing their arrays. Defaults to False.
+        """
+        return self._reuse_arrays
+
+    @reuse_arrays.setter
+    @accepts((1, bool))
+    def reuse_arrays(self, value):
+        self._reuse_arrays = value
+
+    @property
+    def statistics(self):
+        """
+        The :class:`LoadFlowStatistics` of the last call to :func:`calculate`,
+        None if it has not been called.
+        """
+        return self._statistics
 
     @accepts(((1, 2), (int, float)))
     def update(self, s_base, v_base, is_PV, b, Yb):
@@ -89,6 +515,12 @@ class AbstractElectricalLoadFlowCalculator(object):
         :type Yb: 2-dimensional numpy array of complex
 
         """
+        self._set_network(s_base, v_base, is_PV, b, Yb)
+        self._Y = self._admittance_matrix(self._b, self._Yb)
+
+    def _set_network(self, s_base, v_base, is_PV, b, Yb):
+        # checks and stores the network given to update or to
+        # load_compiled_state, with the values directly derived from it
         if s_base <= 0:
             raise RuntimeError(
                 'Reference power value s_base cannot be zero or negative')
@@ -103,21 +535,7 @@ class AbstractElectricalLoadFlowCalculator(object):
             raise RuntimeError(
                 'bus with 1st position is slack and therefore '
                 'cannot be a PV bus')
-        if b.dtype != int:
-            raise TypeError('b has to be an integer array')
-        if len(b.shape) != 2:
-            raise RuntimeError('b has to be a two-dimensional array')
-        if b.shape[1] != 2:
-            raise RuntimeError('b array should have two columns')
-        if Yb.dtype != complex:
-            raise TypeError('array Yb has to be a complex array')
-        if len(Yb.shape) != 2:
-            raise RuntimeError('Yb has to be a two-dimensional array')
-        if Yb.shape[1] != 4:
-            raise RuntimeError('Yb array should have four columns')
-        if Yb.shape[0] != b.shape[0]:
-            raise RuntimeError(
-                'Yb and b arrays should have the same number of rows')
+        self._check_branches(b, Yb)
 
         self.s_base = s_base
         self.v_base = v_base
@@ -144,21 +562,9 @@ class AbstractElectricalLoadFlowCalculator(object):
 
         # scale self._Yb according to s_base and v_base
         # S = V*I = V^2*Y
-        v2_base = self.v_base * self.v_base
-        if self.s_base != v2_base:
-            self._Yb *= (v2_base * self._Yb)
-
-        # compute admittance matrix Y
-        self._Y = np.zeros([self._nBu, self._nBu], dtype=complex)
-        # off-diagonal element
-        self._Y[self._b[:, 0], self._b[:, 1]] = -self._Yb[:, 1]
-        self._Y[self._b[:, 1], self._b[:, 0]] = -self._Yb[:, 3]
-        # diagonal element
-        for i_branch in range(0, self._nBr):
-            i_bus = self._b[i_branch, 0]
-            j_bus = self._b[i_branch, 1]
-            self._Y[i_bus, i_bus] += self._Yb[i_branch, 0]
-            self._Y[j_bus, j_bus] += self._Yb[i_branch, 2]
+        self._y_sc = self.v_base * self.v_base / self.s_base
+        if self._y_sc != 1.:
+            self._Yb = self._y_sc * self._Yb
 
         # set internal bus electrical values to None
         self._P = None
@@ -166,6 +572,112 @@ class AbstractElectricalLoadFlowCalculator(object):
         self._V = None
         self._Th = None
 
+    def _compile_settings(self):
+        # settings of the calculator changing the arrays computed by update,
+        # they are part of the keys of a CompiledNetworkCache
+        return ()
+
+    def get_compiled_state(self):
+        """
+        get_compiled_state(self)
+
+        Returns the arrays computed by :func:`update` from the network, which
+        :func:`load_compiled_state` reads back instead of computing them
+        again, e.g. from a :class:`.CompiledNetworkCache`. The arrays of a
+        factorized matrix include its fill-reducing column ordering, only its
+        numerical factorization is done again when it is loaded.
+
+        :return: the arrays by name
+        :rtype: dict of numpy arrays
+
+        :raise RuntimeError: if :func:`update` has not been called
+        """
+        if self._Y is None:
+            raise RuntimeError('The update method has to be called first!')
+        state = {}
+        _put_sparse(state, 'Y', self._Y)
+        return state
+
+    @accepts(((1, 2), (int, float)))
+    def load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state):
+        """
+        load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state)
+
+        Updates values of the calculator as :func:`update`, reading the arrays
+        computed from the network in `state` instead of computing them again.
+
+        :param s_base: reference power value
+        :type s_base: float
+        :param v_base: reference voltage value
+        :type v_base: float
+        :param is_PV: N-long vector specifying which bus is of type
+            :class:`.ElectricalPVBus`, where N is the number of buses including
+            slack.
+        :type is_PV: 1-dimensional numpy array of boolean
+        :param b: Mx2 table containing for each branch the ids of start and end
+            buses.
+        :type b: 2-dimensional numpy array of int
+        :param Yb: Mx4 table containing the admittances `Yii`, `Yij`, `Yjj`,
+            and `Yji` of each branch.
+        :type Yb: 2-dimensional numpy array of complex
+        :param state: the arrays returned by :func:`get_compiled_state` of a
+            calculator of the same class and settings, updated with the same
+            values
+        :type state: dict of numpy arrays
+        """
+        self._set_network(s_base, v_base, is_PV, b, Yb)
+        self._Y = _get_sparse(state, 'Y', csr_matrix)
+
+    def _check_branches(self, b, Yb):
+
+        if b.dtype != int:
+            raise TypeError('b has to be an integer array')
+        if len(b.shape) != 2:
+            raise RuntimeError('b has to be a two-dimensional array')
+        if b.shape[1] != 2:
+            raise RuntimeError('b array should have two columns')
+        if Yb.dtype != complex:
+            raise TypeError('array Yb has to be a complex array')
+        if len(Yb.shape) != 2:
+            raise RuntimeError('Yb has to be a two-dimensional array')
+        if Yb.shape[1] != 4:
+            raise RuntimeError('Yb array should have four columns')
+        if Yb.shape[0] != b.shape[0]:
+            raise RuntimeError(
+                'Yb and b arrays should have the same number of rows')
+
+    def _admittance_matrix(self, b, Yb):
+        # compute admittance matrix Y of the given branches as sparse matrix
+        return admittance_matrix(b, Yb, self._nBu)
+
+    def add_branches(self, b, Yb):
+        """
+        add_branches(self, b, Yb)
+
+        Adds branches between existing buses to the network of the calculator,
+        e.g. when lines are switched on during a simulation. This
+        implementation calls :func:`update` with all branches, sub-classes
+        override it to update their data incrementally.
+
+        :param b: Kx2 table containing for each new branch the ids of start and
+            end buses.
+        :type b: 2-dimensional numpy array of int
+        :param Yb: Kx4 table containing the admittances `Yii`, `Yij`, `Yjj`,
+            and `Yji` of each new branch.
+        :type Yb: 2-dimensional numpy array of complex
+        """
+        if self._Y is None:
+            # update has not been called
+            raise RuntimeError('The update method has to be called first!')
+        self._check_branches(b, Yb)
+        if b.size > 0 and (b.min() < 0 or b.max() >= self._nBu):
+            raise RuntimeError('b refers to an unknown bus')
+
+        # update scales admittances again
+        self.update(self.s_base, self.v_base, self._is_PV,
+                    np.vstack((self._b, b)),
+                    np.vstack((self._Yb / self._y_sc, Yb)))
+
     def _read_calculate_args(self, P, Q, V, Th, scaled):
 
         if P.dtype != float or Q.dtype != float \
@@ -176,14 +688,43 @@ class AbstractElectricalLoadFlowCalculator(object):
                 or len(V.shape) != 1 or len(Th.shape) != 1:
             raise RuntimeError('input array has to be one-dimensional')
 
+        if self._P is None:
+            # work arrays of the bus electrical values, allocated at the first
+            # call after update and filled in place by the next ones
+            self._P = np.empty(self._nBu)
+            self._Q = np.empty(self._nBu)
+            self._V = np.empty(self._nBu)
+            self._Th = np.zeros(self._nBu)
+        if scaled:
+            np.copyto(self._P, P)
+            np.copyto(self._Q, Q)
+            np.copyto(self._V, V)
+        else:
+            np.multiply(P, self._s_sc, out=self._P)
+            np.multiply(Q, self._s_sc, out=self._Q)
+            np.multiply(V, self._v_sc, out=self._V)
+
+    def _bus_results(self):
+        # bus electrical values returned by calculate, see reuse_arrays
+        if self._reuse_arrays:
+            return [self._P, self._Q, self._V, self._Th]
+        return [self._P.copy(), self._Q.copy(), self._V.copy(),
+                self._Th.copy()]
+
+    def _read_calculate_many_args(self, P, Q, V, scaled):
+
+        if P.dtype != float or Q.dtype != float or V.dtype != float:
+            raise TypeError('input array has to be an array of floats.')
+
+        if len(P.shape) != 2 or P.shape[1] != self._nBu \
+                or Q.shape != P.shape or V.shape != P.shape:
+            raise RuntimeError('input array has to be a two-dimensional '
+                               'array with one column per bus.')
+
         if scaled:
-            self._P = P.copy()
-            self._Q = Q.copy()
-            self._V = V.copy()
+            return P.copy(), Q.copy(), V.copy()
         else:
-            self._P = self._s_sc * P
-            self._Q = self._s_sc * Q
-            self._V = self._v_sc * V
+            return self._s_sc * P, self._s_sc * Q, self._v_sc * V
 
     @accepts((5, bool))
     def calculate(self, P, Q, V, Th, scaled):
@@ -230,6 +771,49 @@ class AbstractElectricalLoadFlowCalculator(object):
         """
         raise NotImplementedError('Pure abstract method!')
 
+    @accepts((4, bool))
+    def calculate_many(self, P, Q, V, scaled):
+        """
+        calculate_many(self, P, Q, V, scaled)
+
+        Computes the bus electrical values of K independent scenarios on the
+        same network, e.g. for hosting capacity or uncertainty studies. Each
+        row of the (K, N) tables `P`, `Q` and `V` is the input of one scenario,
+        as for :func:`calculate`. Voltage angles start from 0.0.
+
+        This implementation calls :func:`calculate` for each scenario.
+        Sub-classes override it to solve all scenarios at once. The bus
+        electrical values of the last call to :func:`calculate`, used by
+        :func:`get_branch_power_flows`, are not modified.
+
+        :param P: KxN table of bus active powers, where K is the number of
+            scenarios and N the number of buses including slack.
+        :type P: 2-dimensional numpy array of float
+        :param Q: KxN table of bus reactive powers.
+        :type Q: 2-dimensional numpy array of float
+        :param V: KxN table of bus voltage amplitudes.
+        :type V: 2-dimensional numpy array of float
+        :param scaled: specifies whether electrical input and output values
+            are scaled or not
+        :type scaled: boolean
+
+        :return: new KxN tables [P, Q, V, Th]
+        :rtype: a list of 4 2-dimensional numpy arrays of float
+        """
+        # input checks only, calculate does the scaling
+        self._read_calculate_many_args(P, Q, V, True)
+
+        state = (self._P, self._Q, self._V, self._Th)
+        results = [np.empty(P.shape) for _ in range(4)]
+        for k in range(P.shape[0]):
+            solution = self.calculate(P[k].copy(), Q[k].copy(), V[k].copy(),
+                                      np.zeros(self._nBu), scaled)
+            for result, values in zip(results, solution):
+                result[k] = values
+        (self._P, self._Q, self._V, self._Th) = state
+
+        return results
+
     @accepts((1, bool))
     @returns(tuple)
     def get_branch_power_flows(self, scaled):
@@ -262,24 +846,8 @@ class AbstractElectricalLoadFlowCalculator(object):
 
         :rtype: tuple of one-dimensional numpy arrays of float
         """
-        # compute partial results
-        ViVj = self._V[self._b[:, 0]] * self._V[self._b[:, 1]]
-        dThij = self._Th[self._b[:, 0]] - self._Th[self._b[:, 1]]
-        e_j_dThij = np.exp(1j * dThij)
-
-        # branch flow from from-bus terminal
-        Vi2 = self._V[self._b[:, 0]] * self._V[self._b[:, 0]]
-        e_j_dThij_Yij_ = e_j_dThij * np.conjugate(self._Yb[:, 1])
-        Pij = Vi2 * np.real(self._Yb[:, 0]) - ViVj * np.real(e_j_dThij_Yij_)
-        Qij = Vi2 * (-np.imag(self._Yb[:, 0])) - ViVj * np.imag(e_j_dThij_Yij_)
-
-        # branch flow from to-bus terminal
-        Vj2 = self._V[self._b[:, 1]] * self._V[self._b[:, 1]]
-        e_j_dThji_Yji_ = np.conjugate(e_j_dThij) * np.conjugate(self._Yb[:, 3])
-        Pji = Vj2 * np.real(self._Yb[:, 2]) - ViVj * np.real(e_j_dThji_Yji_)
-        Qji = Vj2 * (-np.imag(self._Yb[:, 2])) - ViVj * np.imag(e_j_dThji_Yji_)
-
-        # TODO:verify
+        Pij, Qij, Pji, Qji = branch_power_flows(self._V, self._Th, self._b,
+                                                self._Yb)
 
         if not scaled:
             Pij *= self.s_base
@@ -295,8 +863,10 @@ class AbstractElectricalLoadFlowCalculator(object):
         """
         get_branch_max_currents(self, scaled)
 
-        Compute the maximal current amplitude of each branch. Cannot be called
-        before method :func:`AbstractElectricalLoadFlowCalculator.calculate`.
+        Compute the maximal current amplitude of each branch, i.e. the largest
+        amplitude of the currents flowing into the branch at its two
+        terminals, see :func:`branch_currents`. Cannot be called before method
+        :func:`AbstractElectricalLoadFlowCalculator.calculate`.
         Returns a M-long vector of maximal branch
         current amplitudes, where M is the number of branches.
 
@@ -309,25 +879,15 @@ class AbstractElectricalLoadFlowCalculator(object):
         :rtype: 1-dimensional numpy array of float
 
         """
-        # from-bus bus complex voltage (amplitude and phase)
-        Vi_c = self._V[self._b[:, 0]] * np.exp(1j * self._Th[self._b[:, 0]])
-        # current to ground at from-bus bus
-        Ii0_c = Vi_c * (self._Yb[:, 0] - self._Yb[:, 1])
-
-        # to-bus bus complex voltage (amplitude and phase)
-        Vj_c = self._V[self._b[:, 1]] * np.exp(1j * self._Th[self._b[:, 1]])
-        # current to ground at to-bus bus
-        Ij0_c = Vj_c * (self._Yb[:, 2] - self._Yb[:, 3])
-
-        # traversing current
-        Iij_c = (Vi_c - Vj_c) * self._Yb[:, 1]
+        if self._P is None:
+            # calculate has not been called
+            raise RuntimeError('The calculate method has to be called first!')
 
-        Imax = np.max(np.hstack(abs(Ii0_c), abs(Ij0_c), abs(Ii0_c + Iij_c),
-                                abs(Ij0_c - Iij_c), abs(Iij_c)), axis=1)
+        Imax = branch_currents(self._V, self._Th, self._b, self._Yb)
 
-        # TODO:verify
         if not scaled:
-            Imax = Imax * self.s_base * self.v_sc
+            # base current
+            Imax *= self.s_base / self.v_base
 
         return Imax
 
@@ -359,8 +919,17 @@ class DirectLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
         """
         super(DirectLoadFlowCalculator, self).__init__()
 
-        self._invBvq = None
+        self._Bvq = None
+        self._Bvq_lu = None
         self._bA = None
+        # low-rank modifications of B since its factorization (Woodbury)
+        self._wb_U = None
+        self._wb_V = None
+        self._wb_W = None
+        self._wb_WT = None
+        self._wb_S = None
+        # number of changes of the network, to detect them
+        self._nChanges = 0
 
         if s_base is not None and v_base is not None and is_PV is not None \
                 and b is not None and Yb is not None:
@@ -399,25 +968,155 @@ class DirectLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
 
         # compute matrix B from admittance matrix Y
         # off-diagonal element are equal to minus imaginary part of Y element
-        B = -np.imag(self._Y)
+        B = -self._Y.imag
+        B = B - diags(B.diagonal())
         # diagonal element are equal to minus sum of off-diagonal element
-        np.fill_diagonal(B, np.zeros(B.shape[0]))
-        np.fill_diagonal(B, -B.sum(1))
-        # compute inverse of B after removing first row and first column
-        # (corresponding to slack bus)
-        self._invBvq = np.linalg.inv(B[1:, 1:])
+        B = (B - diags(np.asarray(B.sum(1)).ravel())).tocsr()
+        # factorize B after removing first row and first column
+        # (corresponding to slack bus), voltage angles are then obtained by
+        # forward and backward substitutions
+        self._Bvq = B[1:, 1:].tocsc()
+        self._factorize(None)
+
+        self._bA = self._branch_susceptances(self._b, self._Yb)
+
+    def _factorize(self, perm_c):
+        # factorizes the reduced matrix B, without low-rank modification
+        self._Bvq_lu = _factorize(self._Bvq, perm_c)
+        self._wb_U = None
+        self._wb_V = None
+        self._wb_W = None
+        self._wb_WT = None
+        self._wb_S = None
+        self._nChanges += 1
+
+    def get_compiled_state(self):
+        """
+        get_compiled_state(self)
+
+        Returns the arrays computed by :func:`update` from the network, see
+        :func:`AbstractElectricalLoadFlowCalculator.get_compiled_state`.
+
+        :return: the arrays by name
+        :rtype: dict of numpy arrays
 
+        :raise RuntimeError: if :func:`update` has not been called, or if
+            branches have been added by :func:`add_branches` since
+        """
+        if self._wb_U is not None:
+            raise RuntimeError('The compiled state does not include the '
+                               'branches added since the last update.')
+        state = super(DirectLoadFlowCalculator, self).get_compiled_state()
+        _put_sparse(state, 'Bvq', self._Bvq)
+        state['Bvq.perm_c'] = self._Bvq_lu.perm_c
+        _put_sparse(state, 'bA', self._bA)
+        return state
+
+    @accepts(((1, 2), (int, float)))
+    def load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state):
+        """
+        load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state)
+
+        Updates values of the calculator as :func:`update`, reading the arrays
+        computed from the network in `state`, see
+        :func:`AbstractElectricalLoadFlowCalculator.load_compiled_state`.
+        """
+        super(DirectLoadFlowCalculator, self).load_compiled_state(
+            s_base, v_base, is_PV, b, Yb, state)
+        self._Bvq = _get_sparse(state, 'Bvq', csc_matrix)
+        self._factorize(state['Bvq.perm_c'])
+        self._bA = _get_sparse(state, 'bA', csr_matrix)
+
+    def _branch_susceptances(self, b, Yb):
         # build bA matrix from branch susceptances as sparse matrix
-        self._bA = lil_matrix((self._nBr, self._nBu))
+        # this is minus the susceptance value, taken from each branch and not
+        # from matrix B, which sums up susceptances of parallel branches
+        mb = np.imag(Yb[:, 1])
+        branches = np.arange(b.shape[0])
+        return csr_matrix(
+            (np.concatenate((-mb, mb)),
+             (np.concatenate((branches, branches)),
+              np.concatenate((b[:, 0], b[:, 1])))),
+            shape=(b.shape[0], self._nBu))
+
+    def add_branches(self, b, Yb):
+        """
+        add_branches(self, b, Yb)
 
-        for i_branch in range(0, self._nBr):
-            # this is minus the susceptance value
-            mb = B[self._b[i_branch, 0], self._b[i_branch, 1]]
-            self._bA[i_branch, self._b[i_branch, 0]] = -mb
-            self._bA[i_branch, self._b[i_branch, 1]] = mb
+        Adds branches between existing buses to the network of the calculator.
+        Matrix B is not factorized again: adding K branches is a rank-K
+        modification of B, which is taken into account when solving with the
+        Sherman-Morrison-Woodbury formula. After too many added branches, B is
+        factorized again by :func:`update`.
 
-        # change sparse matrix representation
-        self._bA = self._bA.tocsr()
+        :param b: Kx2 table containing for each new branch the ids of start and
+            end buses.
+        :type b: 2-dimensional numpy array of int
+        :param Yb: Kx4 table containing the admittances `Yii`, `Yij`, `Yjj`,
+            and `Yji` of each new branch.
+        :type Yb: 2-dimensional numpy array of complex
+        """
+        n_low_rank = 0 if self._wb_U is None else self._wb_U.shape[1]
+        if self._Bvq_lu is None \
+                or n_low_rank + b.shape[0] > _MAX_LOW_RANK_UPDATES:
+            super(DirectLoadFlowCalculator, self).add_branches(b, Yb)
+            return
+        self._check_branches(b, Yb)
+        if b.size > 0 and (b.min() < 0 or b.max() >= self._nBu):
+            raise RuntimeError('b refers to an unknown bus')
+
+        Yb = self._y_sc * Yb
+        self._b = np.vstack((self._b, b))
+        self._Yb = np.vstack((self._Yb, Yb))
+        self._nBr = self._b.shape[0]
+        self._Y = self._Y + self._admittance_matrix(b, Yb)
+        self._bA = vstack((self._bA, self._branch_susceptances(b, Yb))).tocsr()
+
+        # reduced B changes by U*V^T where column k of U is
+        # -Im(Yij)*e_i + Im(Yji)*e_j and column k of V is e_i - e_j, the slack
+        # bus row being removed
+        n = self._nBu - 1
+        k = b.shape[0]
+        U = np.zeros((self._nBu, k))
+        V = np.zeros((self._nBu, k))
+        cols = np.arange(k)
+        np.add.at(U, (b[:, 0], cols), -np.imag(Yb[:, 1]))
+        np.add.at(U, (b[:, 1], cols), np.imag(Yb[:, 3]))
+        np.add.at(V, (b[:, 0], cols), 1.)
+        np.add.at(V, (b[:, 1], cols), -1.)
+        U = U[1:]
+        V = V[1:]
+        W = self._Bvq_lu.solve(np.asfortranarray(U)).reshape(n, k)
+        WT = self._Bvq_lu.solve(np.asfortranarray(V), trans='T').reshape(n, k)
+        if self._wb_U is None:
+            self._wb_U, self._wb_V, self._wb_W, self._wb_WT = U, V, W, WT
+        else:
+            self._wb_U = np.hstack((self._wb_U, U))
+            self._wb_V = np.hstack((self._wb_V, V))
+            self._wb_W = np.hstack((self._wb_W, W))
+            self._wb_WT = np.hstack((self._wb_WT, WT))
+        # capacitance matrix
+        self._wb_S = np.eye(self._wb_U.shape[1]) + \
+            self._wb_V.T.dot(self._wb_W)
+        self._nChanges += 1
+
+    def _solve(self, rhs, trans=False):
+        # solves B*x = rhs (or B^T*x = rhs) for the reduced matrix B, one
+        # column of rhs being one right-hand side
+        if not trans:
+            x = self._Bvq_lu.solve(np.asfortranarray(rhs))
+        else:
+            x = self._Bvq_lu.solve(np.asfortranarray(rhs), trans='T')
+        x = x.reshape(rhs.shape)
+        if self._wb_U is not None:
+            # Sherman-Morrison-Woodbury correction of added branches
+            if not trans:
+                x = x - self._wb_W.dot(np.linalg.solve(
+                    self._wb_S, self._wb_V.T.dot(x)))
+            else:
+                x = x - self._wb_WT.dot(np.linalg.solve(
+                    self._wb_S.T, self._wb_U.T.dot(x)))
+        return x
 
     @accepts((5, bool))
     def calculate(self, P, Q, V, Th, scaled):
@@ -452,18 +1151,16 @@ class DirectLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
         :return: modified [P, Q, V, Th]
         :rtype: a list of 4 element
         """
+        start_time = default_timer()
         # check input arguments and save them to internal
         # variables _P, _Q, and _V
-        # variables _P, _Q, and _V
         self._read_calculate_args(P, Q, V, Th, scaled)
-        # initialize voltage angles internal variable _Th to 0.0
-        self._Th = np.zeros([self._nBu, 1])
 
         # compute slack active power (based on the assumption that there are no
         # branch losses)
 
         # update intern variable
-        self._P[0] = -sum(self._P[1:])
+        self._P[0] = -self._P[1:].sum()
         # update external variable
         if scaled:
             P[0] = self._P[0]
@@ -473,15 +1170,116 @@ class DirectLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
         # TODO: decide if Q and V should be updated to be consistent
         # TODO (V should be set to ones)
 
-        # vector of voltage angles
+        # vector of voltage angles, the slack bus being the reference
         # update intern variable
-        self._Th = np.concatenate(([0.0], np.dot(self._invBvq, self._P[1:])))
+        self._Th[0] = 0.0
+        self._Th[1:] = self._solve(self._P[1:])
 
 
         # return external variable
         self._calculate_done = True
+        self._statistics = LoadFlowStatistics(
+            time=default_timer() - start_time)
+
+        return self._bus_results()
+
+    @accepts((2, bool))
+    def calculate_horizon(self, P, scaled):
+        """
+        calculate_horizon(self, P, scaled)
+
+        Computes the bus voltage angles and the branch active power flows of
+        T independent time steps at once, e.g. of a whole time series. Since
+        the direct load flow is linear, all time steps are solved with the
+        factorization of :func:`update` in a single forward and backward
+        substitution with a T-column right-hand side.
+
+        Unlike :func:`calculate`, this method does not modify the internal
+        state of the calculator, i.e. :func:`get_branch_power_flows` still
+        returns the power flows of the last call to :func:`calculate`.
+
+        :param P: NxT table of bus active powers, where N is the number of buses
+            including slack and T the number of time steps. Values of the first
+            row (slack) are not used.
+        :type P: 2-dimensional numpy array of float
+        :param scaled: specifies whether electrical input and output values are
+            scaled or not
+        :type scaled: boolean
+
+        :return: [P, Th, Pij], i.e. the NxT table of bus active powers with
+            slack powers in first row, the NxT table of bus voltage angles and
+            the MxT table of active powers entering the branches from the
+            from-bus termination, where M is the number of branches
+        :rtype: a list of 3 2-dimensional numpy arrays of float
+        """
+        if self._Bvq_lu is None:
+            # update has not been called
+            raise RuntimeError('The update method has to be called first!')
+
+        if P.dtype != float:
+            raise TypeError('input array has to be an array of floats.')
+        if len(P.shape) != 2 or P.shape[0] != self._nBu:
+            raise RuntimeError('input array has to be a two-dimensional '
+                               'array with one row per bus.')
+
+        if scaled:
+            P = P.copy()
+        else:
+            P = self._s_sc * P
+
+        # slack active power (no branch losses) for each time step
+        P[0, :] = -np.sum(P[1:, :], axis=0)
+
+        # voltage angles of all time steps in one multi-RHS solve
+        Th = np.zeros(P.shape)
+        if P.shape[1] > 0:
+            Th[1:, :] = self._solve(P[1:, :])
+
+        # branch active powers
+        Pbr = self._bA.dot(Th)
+
+        if not scaled:
+            P *= self.s_base
+            Pbr *= self.s_base
+
+        return [P, Th, Pbr]
+
+    @accepts((4, bool))
+    def calculate_many(self, P, Q, V, scaled):
+        """
+        calculate_many(self, P, Q, V, scaled)
+
+        Computes the slack active power and the bus voltage angles of K
+        scenarios at once, with one multi-RHS solve, see
+        :func:`calculate_horizon`. Reactive powers and voltage amplitudes are
+        returned unchanged.
+
+        :param P: KxN table of bus active powers, where K is the number of
+            scenarios and N the number of buses including slack.
+        :type P: 2-dimensional numpy array of float
+        :param Q: KxN table of bus reactive powers.
+        :type Q: 2-dimensional numpy array of float
+        :param V: KxN table of bus voltage amplitudes.
+        :type V: 2-dimensional numpy array of float
+        :param scaled: specifies whether electrical input and output values
+            are scaled or not
+        :type scaled: boolean
+
+        :return: new KxN tables [P, Q, V, Th]
+        :rtype: a list of 4 2-dimensional numpy arrays of float
+        """
+        [P, Q, V] = self._read_calculate_many_args(P, Q, V, scaled)
+
+        [P, Th, _] = self.calculate_horizon(P.T, True)
+        P = P.T
+        Th = Th.T
 
-        return [self._P, self._Q, self._V, self._Th]
+        if not scaled:
+            P *= self.s_base
+            Q *= self.s_base
+            V *= self.v_base
+
+        return [P, Q, V, Th]
 
     @accepts((1, bool))
     def get_branch_power_flows(self, scaled):
@@ -531,15 +1329,15 @@ class DirectLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
         """
         get_branch_max_currents(self, scaled)
 
-        Returns active powers entering the branch from the from-bus termination.
+        Returns the current amplitude of each branch, equal in per unit to
+        the amplitude of the active power flowing through the branch.
 
-        :param scaled: specifies whether output power flows have to be scaled
-            or not
+        :param scaled: specifies whether output currents have to be scaled or
+            not
         :type scaled: boolean
-        :returns: a M-long vector of active powers entering the branch from the
-                  from-bus termination, where M is the number of branches
-
-        .. warning:: This function is currently untested.
+        :returns: M-long vector containing for each branch the current
+            amplitude, where M is the number of branches
+        :rtype: 1-dimensional numpy array of float
         """
 
         if self._P is None:
@@ -547,58 +1345,147 @@ class DirectLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
             raise RuntimeError('The calculate method has to be called first!')
 
         # it can be shown that in per unit the branch current magnitude is equal
-        # to the branch active power (Vk~=1.0)
+        # to the branch active power (Vk~=1.0), which is the same at both
+        # terminals of the lossless branches of the direct load flow
 
         # branch active powers
         [Pbr, _, _, _] = self.get_branch_power_flows(True)
-        Ibr = Pbr  # FIXME Pij or Pji ???
+        Ibr = np.abs(Pbr)
 
         if not scaled:
-            Ibr *= (self.s_base * self.v_sc) #
+            # base current
+            Ibr *= self.s_base / self.v_base
 
         return Ibr
 
 
-class NewtonRaphsonLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
+class AbstractIterativeLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
 
-    @accepts(((1, 2), (int, float)))
-    def __init__(self, s_base=None, v_base=None, is_PV=None, b=None, Yb=None):
+    # number of matrices factorized by each iteration of _iterate
+    _FACTORIZATIONS_PER_ITERATION = 0
+
+    def __init__(self, warm_start=False):
         """
-        This class implements the Newton-Raphson method to solve the power-flow
-        problem.
+        __init__(self, warm_start=False)
+
+        This class is the base for all calculators solving the power-flow
+        problem iteratively. It implements :func:`calculate` once for all of
+        them: initialization of the unknown bus electrical values, iteration
+        until the residual errors on bus powers are small enough and
+        computation of the slack power and of the reactive powers of
+        :class:`.ElectricalPVBus`. Sub-classes only implement one solve in
+        :func:`_iterate`.
+
+        By default each call to :func:`calculate` starts from a flat start,
+        i.e. voltage amplitudes of :class:`.ElectricalPQBus` are set to 1.0 and
+        all voltage angles to 0.0. With ``warm_start``, each call starts from
+        the solution of the previous call instead, which saves most of the
+        iterations when consecutive simulation steps only differ slightly. If
+        the solve from the previous solution diverges or meets a singular
+        matrix, a flat start is done.
+
+        A solve has converged when the largest residual error on bus powers is
+        below :attr:`tolerance`. It fails when it has not converged after
+        :attr:`max_iterations` iterations, or as soon as its residual is not
+        finite or has grown far beyond the residual of its first iteration.
+        The work done by each solve is recorded in :attr:`statistics`.
+
+        :param warm_start: whether each solve starts from the previous solution
+        :type warm_start: bool
+        """
+        super(AbstractIterativeLoadFlowCalculator, self).__init__()
 
-        .. seealso::
-            http://en.wikipedia.org/wiki/Power-flow_study#Power-flow_problem_formulation.
+        self._warm_start = warm_start
+        self._residual_metric = None
+        self._residual_tolerance = 1e-10
+        self._max_iterations = 100
+        self._initial_residual = None
+        self._diverged = False
+        self._nIter = 0
+        self._nTotalIter = 0
+        self._V_prev = None
+        self._Th_prev = None
+        self._P_prev = None
+        self._Q_prev = None
+        # factorized Jacobian matrix and bus electrical values of the solution
+        # it has been computed at, see linearize
+        self._linearization = None
+
+    @property
+    def warm_start(self):
+        """
+        Whether each solve starts from the solution of the previous one.
+        """
+        return self._warm_start
 
-        At initialization the user has to give the reference power value
-        `s_base` (all power values are then given relative to this reference
-        value), the reference voltage value `v_base` (all voltage values are
-        then given relative to this reference value), a boolean array `is_PV`
-        specifying which one among the buses is a :class:`.ElectricalPVBus`
-        (the bus with 1st position is slack, the others non
-        :class:`.ElectricalPVBus` are :class:`.ElectricalPQBus`), an integer
-        array `b` specifying for each branch the bus id it is starting from and
-        the bus id it is going to, a complex array `Yb` specifying
-        admittances of each network branch.
+    @warm_start.setter
+    @accepts((1, bool))
+    def warm_start(self, value):
+        self._warm_start = value
+
+    @property
+    def tolerance(self):
         """
-        super(NewtonRaphsonLoadFlowCalculator, self).__init__()
+        The largest residual error on bus powers, relative to `s_base`, for
+        which a solve has converged.
+        """
+        return self._residual_tolerance
 
-        self._G = None
-        self._B = None
-        self._residual_metric = None
-        self._residual_tolerance = None
-        self._ones_vector = None
+    @tolerance.setter
+    @accepts((1, float))
+    def tolerance(self, value):
+        if value <= 0:
+            raise RuntimeError('Tolerance has to be positive')
+        self._residual_tolerance = value
 
-        if s_base is not None and v_base is not None and is_PV is not None \
-                and b is not None and Yb is not None:
-            self.update(s_base, v_base, is_PV, b, Yb)
+    @property
+    def max_iterations(self):
+        """
+        The maximal number of iterations of a solve. A solve that has not
+        converged after this number of iterations fails.
+        """
+        return self._max_iterations
+
+    @max_iterations.setter
+    @accepts((1, int))
+    def max_iterations(self, value):
+        if value < 1:
+            raise RuntimeError('The maximal number of iterations has to be '
+                               'positive')
+        self._max_iterations = value
+
+    @property
+    def residual(self):
+        """
+        The largest residual error on bus powers after the last iteration of
+        the last call to :func:`calculate`, None if it has not been called
+        since the last call to :func:`update`.
+        """
+        return self._residual_metric
+
+    @property
+    def iterations(self):
+        """
+        The number of iterations done by the last call to :func:`calculate`,
+        including those of a failed warm start.
+        """
+        return self._nIter
+
+    @property
+    def total_iterations(self):
+        """
+        The number of iterations done by all calls to :func:`calculate` since
+        the last call to :func:`update`.
+        """
+        return self._nTotalIter
 
     @accepts(((1, 2), (int, float)))
     def update(self, s_base, v_base, is_PV, b, Yb):
         """
         update(self, s_base, v_base, is_PV, b, Yb)
 
-        Updates values of the calculator.
+        Updates values of the calculator. The solution of a previous call to
+        :func:`calculate` is not used for warm start any more.
 
         :param s_base: reference power value
         :type s_base: float
@@ -615,25 +1502,117 @@ class NewtonRaphsonLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
             and `Yji` of each branch.
         :type Yb: 2-dimensional numpy array of complex
         """
-        super(NewtonRaphsonLoadFlowCalculator, self).update(s_base, v_base,
-                                                            is_PV, b, Yb)
+        super(AbstractIterativeLoadFlowCalculator, self).update(s_base, v_base,
+                                                                is_PV, b, Yb)
+        self._forget_solutions()
 
-        # compute real part and imaginary part of admittance matrix
-        self._G = np.real(self._Y)
-        self._B = np.imag(self._Y)
-
-        self._residual_metric = 1
-        self._residual_tolerance = 1e-12
-        self._ones_vector = np.ones(self._nBu)
+    @accepts(((1, 2), (int, float)))
+    def load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state):
+        """
+        load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state)
 
-    @accepts((5, bool))
-    def calculate(self, P, Q, V, Th, scaled):
+        Updates values of the calculator as :func:`update`, reading the arrays
+        computed from the network in `state`, see
+        :func:`AbstractElectricalLoadFlowCalculator.load_compiled_state`.
         """
-        calculate(self, P, Q, V, Th, scaled)
+        super(AbstractIterativeLoadFlowCalculator, self).load_compiled_state(
+            s_base, v_base, is_PV, b, Yb, state)
+        self._forget_solutions()
 
-        Compute all bus electrical values determined by the network, i.e
+    def _forget_solutions(self):
+        # solutions of previous solves are not valid for a new network
+        self._nIter = 0
+        self._nTotalIter = 0
+        self._V_prev = None
+        self._Th_prev = None
+        self._P_prev = None
+        self._Q_prev = None
+        self._linearization = None
+        self._residual_metric = None
 
-        - takes as input active powers `P` of all non-slack buses, reactive
+    def _initialize(self, flat_start):
+        if flat_start or self._V_prev is None:
+            # initialize voltage amplitudes of PQ buses to 1.0
+            self._V[self._is_PQ] = 1.0
+            # initialize voltage angles of all buses to 0.0
+            self._Th.fill(0.0)
+        else:
+            # start from previous solution
+            self._V[self._is_PQ] = self._V_prev[self._is_PQ]
+            np.copyto(self._Th, self._Th_prev)
+
+    def _iterate(self):
+        """
+        _iterate(self)
+
+        Iterates from the current values of internal variables `_V` and `_Th`
+        until the residual errors on bus powers are smaller than the
+        tolerance, counting iterations in `_nIter`.
+
+        :returns: the N-long vectors of bus active and reactive powers
+            computed from the final voltages, or None if the solve diverged.
+        :rtype: tuple of 1-dimensional numpy arrays of float
+        """
+        raise NotImplementedError('Pure abstract method!')
+
+    def _factorizations(self, n_iter):
+        # number of matrices factorized by a solve of n_iter iterations
+        return self._FACTORIZATIONS_PER_ITERATION * n_iter
+
+    def _stop_iterating(self):
+        # tells from the residual of the current iteration of _iterate, which
+        # has not converged, whether iterating has to be given up
+        if self._nIter == 0:
+            self._initial_residual = self._residual_metric
+        if not np.isfinite(self._residual_metric) or \
+                self._residual_metric > \
+                _DIVERGENCE_RATIO * self._initial_residual:
+            self._diverged = True
+            return True
+        return self._nIter >= self._max_iterations
+
+    def _iterate_many(self, P, Q, V, Th):
+        """
+        _iterate_many(self, P, Q, V, Th)
+
+        Iterates all scenarios given by the rows of the KxN tables `P`, `Q`,
+        `V` and `Th` as :func:`_iterate`. `V` and `Th` are modified in place.
+        This implementation calls :func:`_iterate` for each scenario.
+
+        :returns: the KxN tables of bus active and reactive powers computed
+            from the final voltages and the K-long vector specifying which
+            scenarios have converged.
+        :rtype: tuple of numpy arrays
+        """
+        state = (self._P, self._Q, self._V, self._Th)
+        p_calc = np.empty(P.shape)
+        q_calc = np.empty(P.shape)
+        converged = np.zeros(P.shape[0], dtype=bool)
+        n_iter = 0
+        for k in range(P.shape[0]):
+            self._P = P[k]
+            self._Q = Q[k]
+            self._V = V[k].copy()
+            self._Th = Th[k].copy()
+            result = self._iterate()
+            n_iter = max(n_iter, self._nIter)
+            V[k] = self._V
+            Th[k] = self._Th
+            if result is not None:
+                [p_calc[k], q_calc[k]] = result
+                converged[k] = True
+        (self._P, self._Q, self._V, self._Th) = state
+        self._nIter = n_iter
+        return p_calc, q_calc, converged
+
+    @accepts((5, bool))
+    def calculate(self, P, Q, V, Th, scaled):
+        """
+        calculate(self, P, Q, V, Th, scaled)
+
+        Compute all bus electrical values determined by the network, i.e
+
+        - takes as input active powers `P` of all non-slack buses, reactive
           powers of :class:`.ElectricalPQBus` and voltage amplitudes of
           :class:`.ElectricalPVBus`; all these values have to be placed by the
           user at the right place in the N-long vectors, `P`, `Q`, and,
@@ -645,7 +1624,6 @@ class NewtonRaphsonLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
           values are placed by this method at the right place in the N-long
           vectors `P`, `Q`, `V`, and, respectively, Th, passed to this method.
 
-
         :param P: N-long vector of bus active powers, where N is the number of
             buses including slack.
         :type P: 1-dimensional numpy array of float
@@ -661,160 +1639,1373 @@ class NewtonRaphsonLoadFlowCalculator(AbstractElectricalLoadFlowCalculator):
         :param scaled: specifies whether electrical input values are scaled
             or not
         :type scaled: boolean
+
+        :return: modified [P, Q, V, Th]
+        :rtype: a list of 4 element
+
+        :raise RuntimeError: if the solve does not converge
         """
+        start_time = default_timer()
         # check input arguments and save them to internal variables _P, _Q,
         # and _V
         self._read_calculate_args(P, Q, V, Th, scaled)
-        # initialize voltage amplitudes of PQ buses to 1.0
-        self._V[self._is_PQ] = 1.0
-        # initialize voltage angles of all buses to 0.0
-        self._Th = np.zeros([self._nBu])
 
+        self._residual_metric = None
+        self._diverged = False
+        warm_start = self._warm_start and self._V_prev is not None
+        self._initialize(not warm_start)
+        if warm_start:
+            # a bad previous solution may diverge or be singular, the solve
+            # then restarts from flat start
+            try:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    result = self._iterate()
+            except (RuntimeError, np.linalg.LinAlgError):
+                # the Jacobian matrix at the previous solution is singular
+                result = None
+        else:
+            result = self._iterate()
+        n_iter = self._nIter
+        if result is None and warm_start:
+            # previous solution was a bad guess, restart from flat start
+            self._diverged = False
+            self._initialize(True)
+            result = self._iterate()
+            n_iter += self._nIter
+        self._nIter = n_iter
+        self._nTotalIter += n_iter
+
+        self._statistics = LoadFlowStatistics(
+            n_iter, self._residual_metric, default_timer() - start_time,
+            self._factorizations(n_iter), result is not None, self._diverged)
+
+        if result is None:
+            if self._diverged:
+                raise RuntimeError(
+                    self.__class__.__name__ + ' diverged after ' +
+                    str(self._nIter) + ' iterations')
+            raise RuntimeError(
+                self.__class__.__name__ + ' did not converge in ' +
+                str(self._max_iterations) + ' iterations')
+        [p_calc, q_calc] = result
+
+        # Update active power for slack
+        self._P[0] = p_calc[0]
+        # Update reactive power for slack and all PV buses
+        self._Q[~self._is_PQ] = q_calc[~self._is_PQ]
+
+        # save scaled solution for next warm start and linearization, into
+        # the same arrays after the first solve
+        if self._V_prev is None:
+            self._V_prev = self._V.copy()
+            self._Th_prev = self._Th.copy()
+            self._P_prev = self._P.copy()
+            self._Q_prev = self._Q.copy()
+        else:
+            np.copyto(self._V_prev, self._V)
+            np.copyto(self._Th_prev, self._Th)
+            np.copyto(self._P_prev, self._P)
+            np.copyto(self._Q_prev, self._Q)
+
+        if not scaled:
+            self._P *= self.s_base
+            self._Q *= self.s_base
+            self._V *= self.v_base
+
+        return self._bus_results()
+
+    @property
+    def linearized(self):
+        """
+        Whether the power-flow equations have been linearized by
+        :func:`linearize` since the last call to :func:`update`.
+        """
+        return self._linearization is not None
+
+    def linearize(self):
+        """
+        linearize(self)
+
+        Factorizes the Jacobian matrix of the power-flow equations at the
+        solution of the last call to :func:`calculate`. Its inverse holds the
+        sensitivities of bus voltage angles and amplitudes to bus powers,
+        which :func:`calculate_linear` uses to approximate the solution for
+        other bus powers without iterating.
+
+        :raise RuntimeError: if :func:`calculate` has not been called
+        """
+        if self._V_prev is None:
+            raise RuntimeError('The calculate method has to be called first!')
+
+        # positions of all non-slack buses and of PQ buses
+        pvpq = np.arange(1, self._nBu)
+        pq = np.flatnonzero(self._is_PQ)
+
+        # derivatives of complex bus powers with respect to voltage angles and
+        # voltage amplitudes
+        Y = self._Y.tocsr()
+        Vc = self._V_prev * np.exp(1j * self._Th_prev)
+        diag_Vc = diags(Vc, 0)
+        diag_Ic = diags(Y.dot(Vc), 0)
+        diag_Vn = diags(Vc / np.abs(Vc), 0)
+        dS_dTh = (1j * diag_Vc.dot((diag_Ic - Y.dot(diag_Vc)).conj())).tocsr()
+        dS_dV = (diag_Vc.dot(Y.dot(diag_Vn).conj()) +
+                 diag_Ic.conj().dot(diag_Vn)).tocsr()
+
+        # H, N, M and L parts of the Jacobian matrix
+        jacobian = vstack((
+            hstack((dS_dTh[pvpq][:, pvpq].real, dS_dV[pvpq][:, pq].real)),
+            hstack((dS_dTh[pq][:, pvpq].imag, dS_dV[pq][:, pq].imag)))).tocsc()
+
+        # the saved solution is overwritten by the next solve
+        self._linearization = (splu(jacobian, permc_spec=_PERMC_SPEC),
+                               self._P_prev.copy(), self._Q_prev.copy(),
+                               self._V_prev.copy(), self._Th_prev.copy(),
+                               pvpq, pq)
+
+    @accepts((5, bool), (6, float))
+    def calculate_linear(self, P, Q, V, Th, scaled, tolerance):
+        """
+        calculate_linear(self, P, Q, V, Th, scaled, tolerance)
+
+        Approximates the result of :func:`calculate` for the given bus values
+        by a linear update of the solution linearized by :func:`linearize`,
+        i.e. with one solve with the factorized Jacobian matrix instead of
+        iterations. Voltage amplitudes of :class:`.ElectricalPVBus` are the
+        given ones.
+
+        The residual errors on bus powers of the approximation, which grow
+        with the distance of the bus powers to those of the linearized
+        solution, are computed exactly. The approximation is only returned if
+        the largest one is below `tolerance`, which is then also reported by
+        :attr:`residual`.
+
+        :param P: N-long vector of bus active powers, where N is the number of
+            buses including slack.
+        :type P: 1-dimensional numpy array of float
+        :param Q: N-long vector of bus reactive powers.
+        :type Q: 1-dimensional numpy array of float
+        :param V: N-long vector of bus voltage amplitudes.
+        :type V: 1-dimensional numpy array of float
+        :param Th: N-long vector of bus voltage angles, not used.
+        :type Th: 1-dimensional numpy array of float
+        :param scaled: specifies whether electrical input values are scaled
+            or not
+        :type scaled: boolean
+        :param tolerance: the largest residual error on bus powers, relative
+            to `s_base`, of an approximation which can be returned
+        :type tolerance: float
+
+        :return: modified [P, Q, V, Th], or None if the approximation is not
+            accurate enough
+        :rtype: a list of 4 element
+
+        :raise RuntimeError: if :func:`linearize` has not been called
+        """
+        if self._linearization is None:
+            raise RuntimeError('The linearize method has to be called first!')
+        start_time = default_timer()
+        self._read_calculate_args(P, Q, V, Th, scaled)
+        [lu, P0, Q0, V0, Th0, pvpq, pq] = self._linearization
+
+        # changes of voltage angles and amplitudes from the changes of bus
+        # powers
+        n_th = self._nBu - 1
+        K = lu.solve(np.concatenate([self._P[pvpq] - P0[pvpq],
+                                     self._Q[pq] - Q0[pq]]))
+        np.copyto(self._Th, Th0)
+        self._Th[pvpq] += K[0:n_th]
+        self._V[pq] = V0[pq] + K[n_th:]
+
+        # exact residual errors of the approximation
+        Vc = self._V * np.exp(1j * self._Th)
+        S_calc = Vc * np.conjugate(self._Y.dot(Vc))
+        MM = np.concatenate([self._P[pvpq] - S_calc.real[pvpq],
+                             self._Q[pq] - S_calc.imag[pq]])
+        self._residual_metric = max(abs(MM)) if len(MM) > 0 else 0.
+        if not self._residual_metric <= tolerance:
+            return None
+
+        self._statistics = LoadFlowStatistics(
+            0, self._residual_metric, default_timer() - start_time)
+
+        # Update active power for slack
+        self._P[0] = S_calc.real[0]
+        # Update reactive power for slack and all PV buses
+        self._Q[~self._is_PQ] = S_calc.imag[~self._is_PQ]
+
+        if not scaled:
+            self._P *= self.s_base
+            self._Q *= self.s_base
+            self._V *= self.v_base
+
+        return self._bus_results()
+
+    @accepts((4, bool))
+    def calculate_many(self, P, Q, V, scaled):
+        """
+        calculate_many(self, P, Q, V, scaled)
+
+        Computes the bus electrical values of K independent scenarios on the
+        same network, each row of the (K, N) tables `P`, `Q` and `V` being the
+        input of one scenario, as for :func:`calculate`. All scenarios start
+        from a flat start and are iterated together, scenarios that have
+        converged are not iterated any more. The number of iterations of the
+        slowest scenario is reported by :attr:`iterations`.
+
+        :param P: KxN table of bus active powers, where K is the number of
+            scenarios and N the number of buses including slack.
+        :type P: 2-dimensional numpy array of float
+        :param Q: KxN table of bus reactive powers.
+        :type Q: 2-dimensional numpy array of float
+        :param V: KxN table of bus voltage amplitudes.
+        :type V: 2-dimensional numpy array of float
+        :param scaled: specifies whether electrical input and output values
+            are scaled or not
+        :type scaled: boolean
+
+        :return: new KxN tables [P, Q, V, Th]
+        :rtype: a list of 4 2-dimensional numpy arrays of float
+
+        :raise RuntimeError: if the solve of a scenario does not converge
+        """
+        [P, Q, V] = self._read_calculate_many_args(P, Q, V, scaled)
+
+        # flat start
+        V[:, self._is_PQ] = 1.0
+        Th = np.zeros(P.shape)
+
+        [p_calc, q_calc, converged] = self._iterate_many(P, Q, V, Th)
+        self._nTotalIter += self._nIter
+
+        if not np.all(converged):
+            raise RuntimeError(
+                self.__class__.__name__ + ' did not converge in ' +
+                str(self._max_iterations) + ' iterations for scenarios ' +
+                str(list(np.flatnonzero(~converged))))
+
+        # Update active power for slack
+        P[:, 0] = p_calc[:, 0]
+        # Update reactive power for slack and all PV buses
+        Q[:, ~self._is_PQ] = q_calc[:, ~self._is_PQ]
+
+        if not scaled:
+            P *= self.s_base
+            Q *= self.s_base
+            V *= self.v_base
+
+        return [P, Q, V, Th]
+
+
+class NewtonRaphsonLoadFlowCalculator(AbstractIterativeLoadFlowCalculator):
+
+    # the Jacobian matrix is factorized at each iteration
+    _FACTORIZATIONS_PER_ITERATION = 1
+
+    @accepts(((1, 2), (int, float)))
+    def __init__(self, s_base=None, v_base=None, is_PV=None, b=None, Yb=None,
+                 warm_start=False):
+        """
+        This class implements the Newton-Raphson method to solve the power-flow
+        problem.
+
+        .. seealso::
+            http://en.wikipedia.org/wiki/Power-flow_study#Power-flow_problem_formulation.
+
+        At initialization the user has to give the reference power value
+        `s_base` (all power values are then given relative to this reference
+        value), the reference voltage value `v_base` (all voltage values are
+        then given relative to this reference value), a boolean array `is_PV`
+        specifying which one among the buses is a :class:`.ElectricalPVBus`
+        (the bus with 1st position is slack, the others non
+        :class:`.ElectricalPVBus` are :class:`.ElectricalPQBus`), an integer
+        array `b` specifying for each branch the bus id it is starting from and
+        the bus id it is going to, a complex array `Yb` specifying
+        admittances of each network branch.
+
+        Its default :attr:`tolerance` is 1e-12, as in earlier versions, instead
+        of the 1e-10 of the other iterative calculators.
+
+        :param warm_start: whether each solve starts from the previous solution,
+            see :class:`AbstractIterativeLoadFlowCalculator`
+        :type warm_start: bool
+        """
+        super(NewtonRaphsonLoadFlowCalculator, self).__init__(warm_start)
+
+        self._residual_tolerance = 1e-12
+        self._G = None
+        self._B = None
+        self._G_diag = None
+        self._B_diag = None
+        # work arrays of the iterations, see _allocate_workspace
+        self._work_VV = None
+        self._work_Th = None
+        self._work_cos = None
+        self._work_sin = None
+        self._work_GcBs = None
+        self._work_GsBc = None
+        self._work_parts = None
+        self._work_PQ_calc = None
+        self._work_dPQ = None
+        self._work_MM = None
+        self._work_jacobian = None
+        self._jac_index = None
+        self._MM_index = None
+
+        if s_base is not None and v_base is not None and is_PV is not None \
+                and b is not None and Yb is not None:
+            self.update(s_base, v_base, is_PV, b, Yb)
+
+    @accepts(((1, 2), (int, float)))
+    def update(self, s_base, v_base, is_PV, b, Yb):
+        """
+        update(self, s_base, v_base, is_PV, b, Yb)
+
+        Updates values of the calculator.
+
+        :param s_base: reference power value
+        :type s_base: float
+        :param v_base: reference voltage value
+        :type v_base: float
+        :param is_PV: N-long vector specifying which bus is of type
+            :class:`.ElectricalPVBus`, where N is the number of buses including
+            slack.
+        :type is_PV: 1-dimensional numpy array of boolean
+        :param b: Mx2 table containing for each branch the ids of start and end
+            buses.
+        :type b: 2-dimensional numpy array of int
+        :param Yb: Mx4 table containing the admittances `Yii`, `Yij`, `Yjj`,
+            and `Yji` of each branch.
+        :type Yb: 2-dimensional numpy array of complex
+        """
+        super(NewtonRaphsonLoadFlowCalculator, self).update(s_base, v_base,
+                                                            is_PV, b, Yb)
+
+        # compute real part and imaginary part of admittance matrix
+        # the Newton-Raphson iteration below works on full matrices
+        self._G = self._Y.real.toarray()
+        self._B = self._Y.imag.toarray()
+        self._allocate_workspace()
+
+    def _allocate_workspace(self):
+        # allocates the work arrays filled in place by the iterations: NxN
+        # tables of the voltage products and angle differences, the H, N, M
+        # and L parts of the Jacobian matrix before the slack bus and PV buses
+        # are removed, computed and residual bus powers and the Jacobian
+        # matrix
+        N = self._nBu
+        pq = np.flatnonzero(self._is_PQ)
+        n_th = N - 1
+        n_eq = n_th + len(pq)
+        self._G_diag = np.diagonal(self._G).copy()
+        self._B_diag = np.diagonal(self._B).copy()
+        self._work_VV = np.empty((N, N))
+        self._work_Th = np.empty((N, N))
+        self._work_cos = np.empty((N, N))
+        self._work_sin = np.empty((N, N))
+        self._work_GcBs = np.empty((N, N))
+        self._work_GsBc = np.empty((N, N))
+        self._work_parts = np.empty((4, N, N))
+        self._work_PQ_calc = np.empty((2, N))
+        self._work_dPQ = np.empty(2 * N)
+        self._work_MM = np.empty(n_eq)
+        self._work_jacobian = np.empty((n_eq, n_eq))
+
+        # positions in the flattened parts of the element of the Jacobian
+        # matrix, L part being transposed, and positions in the flattened
+        # residual bus powers of the residuals of the equations
+        th = np.arange(1, N)
+        index = np.empty((n_eq, n_eq), dtype=int)
+        index[:n_th, :n_th] = th[:, np.newaxis] * N + th
+        index[:n_th, n_th:] = N * N + th[:, np.newaxis] * N + pq
+        index[n_th:, :n_th] = 2 * N * N + pq[:, np.newaxis] * N + th
+        index[n_th:, n_th:] = 3 * N * N + pq * N + pq[:, np.newaxis]
+        self._jac_index = index.ravel()
+        self._MM_index = np.concatenate((th, N + pq))
+
+    def get_compiled_state(self):
+        """
+        get_compiled_state(self)
+
+        Returns the arrays computed by :func:`update` from the network, see
+        :func:`AbstractElectricalLoadFlowCalculator.get_compiled_state`.
+
+        :return: the arrays by name
+        :rtype: dict of numpy arrays
+        """
+        state = super(NewtonRaphsonLoadFlowCalculator,
+                      self).get_compiled_state()
+        state['G'] = self._G
+        state['B'] = self._B
+        return state
+
+    @accepts(((1, 2), (int, float)))
+    def load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state):
+        """
+        load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state)
+
+        Updates values of the calculator as :func:`update`, reading the arrays
+        computed from the network in `state`, see
+        :func:`AbstractElectricalLoadFlowCalculator.load_compiled_state`.
+        The full matrices G and B are read without copy: with a
+        :class:`.CompiledNetworkCache`, processes computing the same network
+        share their memory.
+        """
+        super(NewtonRaphsonLoadFlowCalculator, self).load_compiled_state(
+            s_base, v_base, is_PV, b, Yb, state)
+        self._G = state['G']
+        self._B = state['B']
+        self._allocate_workspace()
+
+    def _iterate(self):
+        N = self._nBu
+        n_th = N - 1
+        VV = self._work_VV
+        matTh = self._work_Th
+        cos_matTh = self._work_cos
+        sin_matTh = self._work_sin
+        GcBs = self._work_GcBs
+        GsBc = self._work_GsBc
+        [H, N_part, M, L] = self._work_parts
+        [P_calc, Q_calc] = self._work_PQ_calc
+        dPQ = self._work_dPQ
+        MM = self._work_MM
+        jacobian = self._work_jacobian
+        pq = self._is_PQ
         self._nIter = 0
-        while (self._residual_metric > self._residual_tolerance):
+        while True:
             # all bus voltage amplitude products
-            V_1X = np.array([self._V])
-            # 2-D array with 1 row containing vector V
-            _matVV = V_1X.transpose() * V_1X
+            np.multiply.outer(self._V, self._V, out=VV)
 
             # all bus voltage angle differences and their sin and cos values
-            Th_1X = np.array([self._Th])
-            # 2-D array with 1 row containing vector Th
-            _matTh = Th_1X.transpose() - Th_1X
-            _cos_matTh = np.cos(_matTh)
-            _sin_matTh = np.sin(_matTh)
+            np.subtract.outer(self._Th, self._Th, out=matTh)
+            np.cos(matTh, out=cos_matTh)
+            np.sin(matTh, out=sin_matTh)
+
+            # G*cos + B*sin and G*sin - B*cos, with real part G and imaginary
+            # part B of admittance matrix, matTh being used as temporary
+            np.multiply(self._G, cos_matTh, out=GcBs)
+            np.multiply(self._B, sin_matTh, out=matTh)
+            GcBs += matTh
+            np.multiply(self._G, sin_matTh, out=GsBc)
+            np.multiply(self._B, cos_matTh, out=matTh)
+            GsBc -= matTh
+
+            # bus active and reactive powers computed from voltage amplitudes
+            # and phases, M part of the Jacobian matrix is minus the terms of
+            # active powers and H part the terms of reactive powers
+            np.multiply(VV, GcBs, out=M)
+            M.sum(axis=1, out=P_calc)
+            np.multiply(VV, GsBc, out=H)
+            H.sum(axis=1, out=Q_calc)
+
+            # residual errors on active powers of all buses except slack and
+            # on reactive powers of PQ buses
+            np.subtract(self._P, P_calc, out=dPQ[:N])
+            np.subtract(self._Q, Q_calc, out=dPQ[N:])
+            np.take(dPQ, self._MM_index, out=MM, mode='clip')
+
+            self._residual_metric = np.abs(MM).max()
+
+            if self._residual_metric <= self._residual_tolerance:
+                return P_calc, Q_calc
+            if self._stop_iterating():
+                return None
+
+            # >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
 
-            # pre-compute with real part and imaginary part of admittance matrix
-            _G_cos_matTh = self._G * _cos_matTh
-            _G_sin_matTh = self._G * _sin_matTh
-            _B_cos_matTh = self._B * _cos_matTh
-            _B_sin_matTh = self._B * _sin_matTh
+            # JACOBIAN
 
-            # bus active powers computed from voltage amplitudes and phases
-            P_calc = np.sum(_matVV * (_G_cos_matTh + _B_sin_matTh), axis=1)
+            # H part of the Jacobian Matrix
+            np.fill_diagonal(H, -Q_calc - self._V ** 2 * self._B_diag)
 
-            # bus reactive powers computed from voltage amplitudes and phases
-            Q_calc = np.sum(_matVV * (_G_sin_matTh - _B_cos_matTh), axis=1)
+            # M part of the Jacobian Matrix
+            np.negative(M, out=M)
+            np.fill_diagonal(M, P_calc - self._V ** 2 * self._G_diag)
+
+            # N part of the Jacobian Matrix, V_j * (G*cos + B*sin) summed
+            # over j on the diagonal
+            np.multiply(GcBs, self._V, out=N_part)
+            N_diag = N_part.sum(axis=1) + self._V * self._G_diag
+            np.multiply(GcBs, self._V[:, np.newaxis], out=N_part)
+            np.fill_diagonal(N_part, N_diag)
+
+            # L part of the Jacobian Matrix, V_j * (G*sin - B*cos) summed
+            # over j on the diagonal
+            np.multiply(GsBc, self._V, out=L)
+            L_diag = L.sum(axis=1) - self._V * self._B_diag
+            np.multiply(GsBc, self._V[:, np.newaxis], out=L)
+            np.fill_diagonal(L, L_diag)
+
+            # Jacobian, without slack bus and PV bus rows and columns
+            np.take(self._work_parts, self._jac_index,
+                    out=jacobian.reshape(-1), mode='clip')
+
+            # Compute changes from Jacobian
+            K = np.linalg.solve(jacobian, MM)
 
-            # residual errors on active and reactive powers
-            _dPaux = self._P - P_calc
-            _dQaux = self._Q - Q_calc
+            # Update Theta and V values
 
-            # select residual error of all bus active powers except slack
-            _dP = _dPaux[1:]
-            # select residual error of PQ bus reactive powers
-            _dQ = _dQaux[self._is_PQ]
-            # concatenate residuals
-            MM = np.concatenate([_dP, _dQ])
+            # Update Theta for all buses except slack, from dTH the voltage
+            # angle changes
+            self._Th[1:] += K[:n_th]
 
-            self._residual_metric = max(abs(MM))
+            # Update V for all PQ buses, from dV the voltage amplitude changes
+            self._V[pq] += K[n_th:]
 
-            # >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
+            self._nIter += 1
+        # end of iteration loop
 
-            # JACOBIAN
 
+class SparseNewtonRaphsonLoadFlowCalculator(
+        AbstractIterativeLoadFlowCalculator):
 
-            # H part of the Jacobian Matrix
+    # the Jacobian matrix is factorized at each iteration
+    _FACTORIZATIONS_PER_ITERATION = 1
+
+    @accepts(((1, 2), (int, float)))
+    def __init__(self, s_base=None, v_base=None, is_PV=None, b=None, Yb=None,
+                 warm_start=False, linear_solver=LinearSolver.DIRECT):
+        """
+        This class implements the Newton-Raphson method to solve the power-flow
+        problem on the sparse admittance matrix. It gives the same results as
+        :class:`NewtonRaphsonLoadFlowCalculator`, up to its default
+        :attr:`tolerance` of 1e-10, but is suited to large networks: bus powers
+        are computed as ``S = V * conj(Y * V)``, the Jacobian is only built on
+        the non-zero element of the admittance matrix and the voltage
+        corrections are obtained from a sparse LU factorization of the
+        Jacobian.
+
+        With a Krylov `linear_solver`, the voltage corrections are computed
+        inexactly instead (inexact Newton method): the relative tolerance of
+        each solve is the residual of the iteration, at most 0.1, and the
+        incomplete LU factorization preconditioning the solves is only
+        computed again when the Jacobian has changed substantially. The
+        iterations stop on the same residual as with the direct solver.
+
+        .. seealso::
+            http://en.wikipedia.org/wiki/Power-flow_study#Power-flow_problem_formulation.
+
+        .. seealso:: R. S. Dembo, S. C. Eisenstat, T. Steihaug, Inexact Newton
+                     Methods, SIAM Journal on Numerical Analysis, 1982
+
+        At initialization the user has to give the reference power value
+        `s_base` (all power values are then given relative to this reference
+        value), the reference voltage value `v_base` (all voltage values are
+        then given relative to this reference value), a boolean array `is_PV`
+        specifying which one among the buses is a :class:`.ElectricalPVBus`
+        (the bus with 1st position is slack, the others non
+        :class:`.ElectricalPVBus` are :class:`.ElectricalPQBus`), an integer
+        array `b` specifying for each branch the bus id it is starting from and
+        the bus id it is going to, a complex array `Yb` specifying
+        admittances of each network branch.
 
-            _HOrig = _matVV * (_G_sin_matTh - _B_cos_matTh)
+        :param warm_start: whether each solve starts from the previous solution,
+            see :class:`AbstractIterativeLoadFlowCalculator`
+        :type warm_start: bool
+        :param linear_solver: the way the Newton-Raphson steps are solved
+        :type linear_solver: :class:`LinearSolver`
+        """
+        super(SparseNewtonRaphsonLoadFlowCalculator, self).__init__(warm_start)
+
+        if not isinstance(linear_solver, LinearSolver):
+            raise TypeError('linear_solver has to be a LinearSolver')
+        self._linear_solver = linear_solver
+        # Krylov solver of the Newton-Raphson steps, None with the direct
+        # solver
+        self._krylov = None
+        self._pvpq = None
+        self._pq = None
+        self._jac_Y_i = None
+        self._jac_Y_j = None
+        self._jac_Y_data = None
+        self._jac_n_eq = None
+        self._jac_parts = None
+        self._jac_rows = None
+        self._jac_cols = None
 
-            _auxHorig = np.sum(-_HOrig, axis=1) - self._V ** 2 * np.diagonal(
-                self._B)
+        if s_base is not None and v_base is not None and is_PV is not None \
+                and b is not None and Yb is not None:
+            self.update(s_base, v_base, is_PV, b, Yb)
 
-            np.fill_diagonal(_HOrig, _auxHorig)
+    @property
+    def linear_solver(self):
+        """
+        The way the Newton-Raphson steps are solved.
+        """
+        return self._linear_solver
 
-            _auxPosPQ = np.array(np.where(self._is_PQ == True))
+    @accepts(((1, 2), (int, float)))
+    def update(self, s_base, v_base, is_PV, b, Yb):
+        """
+        update(self, s_base, v_base, is_PV, b, Yb)
 
-            _H = _HOrig[1:len(_HOrig), 1:len(_HOrig)]
+        Updates values of the calculator.
 
+        :param s_base: reference power value
+        :type s_base: float
+        :param v_base: reference voltage value
+        :type v_base: float
+        :param is_PV: N-long vector specifying which bus is of type
+            :class:`.ElectricalPVBus`, where N is the number of buses including
+            slack.
+        :type is_PV: 1-dimensional numpy array of boolean
+        :param b: Mx2 table containing for each branch the ids of start and end
+            buses.
+        :type b: 2-dimensional numpy array of int
+        :param Yb: Mx4 table containing the admittances `Yii`, `Yij`, `Yjj`,
+            and `Yji` of each branch.
+        :type Yb: 2-dimensional numpy array of complex
+        """
+        super(SparseNewtonRaphsonLoadFlowCalculator, self).update(
+            s_base, v_base, is_PV, b, Yb)
+
+        # positions of all non-slack buses and of PQ buses
+        self._pvpq = np.arange(1, self._nBu)
+        self._pq = np.flatnonzero(self._is_PQ)
+
+        # sparsity pattern of the Jacobian matrix: position of each non-zero
+        # element of Y and of each diagonal element in the H, N, M and L parts
+        Y = self._Y.tocoo()
+        self._jac_Y_i = Y.row
+        self._jac_Y_j = Y.col
+        self._jac_Y_data = Y.data
+        i_bus = np.concatenate((Y.row, np.arange(self._nBu)))
+        j_bus = np.concatenate((Y.col, np.arange(self._nBu)))
+        n_th = self._nBu - 1
+        # equation (row) and unknown (column) numbers of bus angles and
+        # voltage amplitudes, -1 where there is none
+        eq_th = np.arange(-1, n_th)
+        eq_v = -np.ones(self._nBu, dtype=int)
+        eq_v[self._pq] = n_th + np.arange(len(self._pq))
+        self._jac_n_eq = n_th + len(self._pq)
+        self._jac_parts = []
+        rows = []
+        cols = []
+        for row_eq, col_eq in ((eq_th, eq_th), (eq_th, eq_v),
+                               (eq_v, eq_th), (eq_v, eq_v)):
+            part = np.flatnonzero((row_eq[i_bus] >= 0) & (col_eq[j_bus] >= 0))
+            self._jac_parts.append(part)
+            rows.append(row_eq[i_bus[part]])
+            cols.append(col_eq[j_bus[part]])
+        self._jac_rows = np.concatenate(rows)
+        self._jac_cols = np.concatenate(cols)
+        self._krylov = None
+
+    # arrays of the sparsity pattern of the Jacobian matrix in compiled states
+    _JACOBIAN_PATTERN = ('pvpq', 'pq', 'jac_Y_i', 'jac_Y_j', 'jac_Y_data',
+                         'jac_rows', 'jac_cols')
+
+    def get_compiled_state(self):
+        """
+        get_compiled_state(self)
 
+        Returns the arrays computed by :func:`update` from the network, see
+        :func:`AbstractElectricalLoadFlowCalculator.get_compiled_state`.
 
-            # M part of the Jacobian Matrix
+        :return: the arrays by name
+        :rtype: dict of numpy arrays
+        """
+        state = super(SparseNewtonRaphsonLoadFlowCalculator,
+                      self).get_compiled_state()
+        for name in self._JACOBIAN_PATTERN:
+            state[name] = getattr(self, '_' + name)
+        for i_part, part in enumerate(self._jac_parts):
+            state['jac_parts.%d' % i_part] = part
+        return state
 
-            _MOrig = _matVV * (-_G_cos_matTh - _B_sin_matTh)
+    @accepts(((1, 2), (int, float)))
+    def load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state):
+        """
+        load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state)
 
-            _auxMorig = np.sum(-_MOrig, axis=1) - self._V ** 2 * np.diagonal(
-                self._G)
+        Updates values of the calculator as :func:`update`, reading the arrays
+        computed from the network in `state`, see
+        :func:`AbstractElectricalLoadFlowCalculator.load_compiled_state`.
+        """
+        super(SparseNewtonRaphsonLoadFlowCalculator, self).load_compiled_state(
+            s_base, v_base, is_PV, b, Yb, state)
+        for name in self._JACOBIAN_PATTERN:
+            setattr(self, '_' + name, state[name])
+        self._jac_parts = [state['jac_parts.%d' % i_part]
+                           for i_part in range(4)]
+        self._jac_n_eq = self._nBu - 1 + len(self._pq)
+        self._krylov = None
+
+    def _solve_step(self, jacobian, MM, residual):
+        # solves one Newton-Raphson step, inexactly with a Krylov solver whose
+        # preconditioner is shared by all steps since the last update
+        if self._linear_solver == LinearSolver.DIRECT:
+            return splu(jacobian, permc_spec=_PERMC_SPEC).solve(MM)
+        if self._krylov is None:
+            self._krylov = _KrylovSolver(self._linear_solver, jacobian)
+        else:
+            self._krylov.update(jacobian)
+        self._krylov.tolerance = _forcing_term(residual)
+        return self._krylov.solve(MM)
+
+    def _factorizations(self, n_iter):
+        if self._krylov is None:
+            return super(SparseNewtonRaphsonLoadFlowCalculator,
+                         self)._factorizations(n_iter)
+        # incomplete factorizations of the Jacobian matrix since the last solve
+        factorizations = self._krylov.factorizations
+        self._krylov.factorizations = 0
+        return factorizations
+
+    def _jacobian_entries(self, Vc):
+        # derivatives of complex bus powers with respect to voltage angles and
+        # voltage amplitudes, only non-zero element of Y and diagonal element
+        # are involved; returns the values of the Jacobian matrix at positions
+        # (_jac_rows, _jac_cols), one row per row of Vc
+        Ic = self._Y.dot(Vc.T).T
+        Vn = Vc / np.abs(Vc)
+        y_i = self._jac_Y_i
+        y_j = self._jac_Y_j
+        y = self._jac_Y_data
+        dS_dTh = np.hstack((-1j * Vc[:, y_i] * np.conjugate(y * Vc[:, y_j]),
+                            1j * Vc * np.conjugate(Ic)))
+        dS_dV = np.hstack((Vc[:, y_i] * np.conjugate(y * Vn[:, y_j]),
+                           np.conjugate(Ic) * Vn))
+
+        # H, N, M and L parts of the Jacobian matrix
+        [_H, _N, _M, _L] = self._jac_parts
+        return np.hstack((dS_dTh[:, _H].real, dS_dV[:, _N].real,
+                          dS_dTh[:, _M].imag, dS_dV[:, _L].imag))
+
+    def _jacobian(self, Vc):
+        n_eq = self._jac_n_eq
+        # duplicate entries (diagonal element) are summed up
+        return csc_matrix((self._jacobian_entries(Vc[np.newaxis])[0],
+                           (self._jac_rows, self._jac_cols)),
+                          shape=(n_eq, n_eq))
+
+    def _solve_many(self, Vc, MM):
+        # solves the Newton-Raphson step of each scenario (row of Vc and MM)
+        n_eq = self._jac_n_eq
+        entries = self._jacobian_entries(Vc)
+        if n_eq > _DENSE_BATCH_MAX_UNKNOWNS:
+            # one sparse solve per scenario
+            return np.array([
+                self._solve_step(csc_matrix((data, (self._jac_rows,
+                                                    self._jac_cols)),
+                                            shape=(n_eq, n_eq)),
+                                 mm, max(abs(mm)))
+                for data, mm in zip(entries, MM)]).reshape(MM.shape)
+
+        # small networks: stack of full Jacobian matrices solved at once
+        K = np.empty(MM.shape)
+        n_chunk = max(1, _DENSE_BATCH_MAX_ELEMENTS // (n_eq * n_eq))
+        positions = self._jac_rows * n_eq + self._jac_cols
+        for start in range(0, MM.shape[0], n_chunk):
+            chunk = entries[start:start + n_chunk]
+            n_sc = chunk.shape[0]
+            offsets = n_eq * n_eq * np.arange(n_sc)[:, np.newaxis]
+            # duplicate entries (diagonal element) are summed up
+            jacobian = np.bincount((positions + offsets).ravel(),
+                                   weights=chunk.ravel(),
+                                   minlength=n_sc * n_eq * n_eq)
+            K[start:start + n_sc] = np.linalg.solve(
+                jacobian.reshape(n_sc, n_eq, n_eq),
+                MM[start:start + n_sc, :, np.newaxis])[:, :, 0]
+        return K
+
+    def _iterate(self):
+        n_th = self._nBu - 1
+        self._nIter = 0
+        while True:
+            # complex bus voltages and powers
+            Vc = self._V * np.exp(1j * self._Th)
+            S_calc = Vc * np.conjugate(self._Y.dot(Vc))
 
-            np.fill_diagonal(_MOrig, _auxMorig)
+            # residual errors on active powers of all buses except slack and
+            # on reactive powers of PQ buses
+            MM = np.concatenate([self._P[self._pvpq] - S_calc.real[self._pvpq],
+                                 self._Q[self._pq] - S_calc.imag[self._pq]])
 
-            _M = _MOrig[_auxPosPQ[0, :], 1:len(_MOrig)]
+            self._residual_metric = max(abs(MM)) if len(MM) > 0 else 0.
+            if self._residual_metric <= self._residual_tolerance:
+                return S_calc.real, S_calc.imag
+            if self._stop_iterating():
+                return None
 
+            # compute changes from the Jacobian
+            K = self._solve_step(self._jacobian(Vc), MM, self._residual_metric)
 
+            # update Theta for all buses except slack and V for PQ buses
+            self._Th[self._pvpq] += K[0:n_th]
+            self._V[self._pq] += K[n_th:]
 
-            # N part of the Jacobian Matrix
+            self._nIter += 1
+        # end of iteration loop
 
-            _NOrig = (V_1X.transpose() * (self._ones_vector)) * (
-            _G_cos_matTh + _B_sin_matTh)
+    def _iterate_many(self, P, Q, V, Th):
+        n_th = self._nBu - 1
+        p_calc = np.empty(P.shape)
+        q_calc = np.empty(P.shape)
+        converged = np.zeros(P.shape[0], dtype=bool)
+        # scenarios still iterated
+        active = np.arange(P.shape[0])
+        self._nIter = 0
+        while len(active) > 0:
+            # complex bus voltages and powers, one row per scenario
+            Vc = V[active] * np.exp(1j * Th[active])
+            S_calc = Vc * np.conjugate(self._Y.dot(Vc.T).T)
+
+            # residual errors on active powers of all buses except slack and
+            # on reactive powers of PQ buses
+            MM = np.hstack((P[active][:, self._pvpq] -
+                            S_calc.real[:, self._pvpq],
+                            Q[active][:, self._pq] - S_calc.imag[:, self._pq]))
+
+            residual = np.max(abs(MM), axis=1) if MM.shape[1] > 0 \
+                else np.zeros(len(active))
+            done = residual <= self._residual_tolerance
+            p_calc[active[done]] = S_calc.real[done]
+            q_calc[active[done]] = S_calc.imag[done]
+            converged[active[done]] = True
+
+            keep = ~done & np.isfinite(residual)
+            if self._nIter >= self._max_iterations or not np.any(keep):
+                break
+            active = active[keep]
+
+            # compute changes of all scenarios
+            K = self._solve_many(Vc[keep], MM[keep])
+
+            # update Theta for all buses except slack and V for PQ buses
+            Th[np.ix_(active, self._pvpq)] += K[:, 0:n_th]
+            V[np.ix_(active, self._pq)] += K[:, n_th:]
 
-            _auxNorig = (
-                ((self._ones_vector).transpose() * self._V) * (
-                _G_cos_matTh + _B_sin_matTh))
-            _auxNorig = np.sum(_auxNorig, axis=1)
-            _auxNorig = _auxNorig + self._V * np.diagonal(self._G)
+            self._nIter += 1
+        # end of iteration loop
 
-            np.fill_diagonal(_NOrig, _auxNorig)
+        if self._krylov is not None:
+            # only the factorizations of calculate are recorded
+            self._krylov.factorizations = 0
+        return p_calc, q_calc, converged
 
-            _N = _NOrig[1:len(_NOrig), _auxPosPQ[0, :]]
 
+class FastDecoupledLoadFlowCalculator(AbstractIterativeLoadFlowCalculator):
 
-            # L part of the Jacobian Matrix
+    class Method(Enum):
+        XB = 0
+        """
+        Resistances are neglected when building matrix B' (standard method of
+        Stott and Alsac).
+        """
+        BX = 1
+        """
+        Resistances are neglected when building matrix B'' (method of Van
+        Amerongen, better suited for networks with high R/X ratios).
+        """
 
-            _LOrig = (V_1X.transpose() * (self._ones_vector)) * (
-            _G_sin_matTh - _B_cos_matTh)
+    @accepts(((1, 2), (int, float)))
+    def __init__(self, s_base=None, v_base=None, is_PV=None, b=None, Yb=None,
+                 method=Method.XB, warm_start=False,
+                 linear_solver=LinearSolver.DIRECT):
+        """
+        __init__(self, s_base=None, v_base=None, is_PV=None, b=None, Yb=None, method=FastDecoupledLoadFlowCalculator.Method.XB, warm_start=False, linear_solver=LinearSolver.DIRECT)
 
-            _auxLorig = (
-                (self._ones_vector.transpose() * self._V) * (
-                _G_sin_matTh - _B_cos_matTh))
-            _auxLorig = np.sum(_auxLorig, axis=1)
-            _auxLorig = _auxLorig - self._V * np.diagonal(self._B)
+        This class implements the fast-decoupled method to solve the power-flow
+        problem. Active powers are decoupled from voltage amplitudes and
+        reactive powers from voltage angles, the Jacobian is then approximated
+        by two constant matrices B' and B'' which are factorized once in
+        :func:`update`. Each iteration of :func:`calculate` only consists of
+        forward and backward substitutions. Since bus power mismatches are
+        computed exactly, the method converges to the same solution as the
+        Newton-Raphson method, but needs more (much cheaper) iterations.
 
-            np.fill_diagonal(_LOrig, _auxLorig)
+        With a Krylov `linear_solver`, only incomplete LU factorizations of
+        B' and B'' are computed in :func:`update`, as preconditioners of
+        inexact solves whose relative tolerance is the residual of the
+        iteration, at most 0.1.
 
-            _L = _LOrig[_auxPosPQ, _auxPosPQ.transpose()]
+        .. seealso:: B. Stott, O. Alsac, Fast Decoupled Load Flow, IEEE
+                     Transactions on Power Apparatus and Systems, 1974
 
-            # Jacobian
+        At initialization the user has to give the reference power value
+        `s_base` (all power values are then given relative to this reference
+        value), the reference voltage value `v_base` (all voltage values are
+        then given relative to this reference value), a boolean array `is_PV`
+        specifying which one among the buses is a :class:`.ElectricalPVBus`
+        (the bus with 1st position is slack, the others non
+        :class:`.ElectricalPVBus` are :class:`.ElectricalPQBus`), an integer
+        array `b` specifying for each branch the bus id it is starting from and
+        the bus id it is going to, a complex array `Yb` specifying
+        admittances of each network branch.
 
-            jacobian = np.vstack((np.hstack((_H, _N)), np.hstack((_M, _L))))
+        :param method: the way matrices B' and B'' are built
+        :type method: :class:`FastDecoupledLoadFlowCalculator.Method`
+        :param warm_start: whether each solve starts from the previous solution,
+            see :class:`AbstractIterativeLoadFlowCalculator`
+        :type warm_start: bool
+        :param linear_solver: the way the half iterations are solved
+        :type linear_solver: :class:`LinearSolver`
+        """
+        super(FastDecoupledLoadFlowCalculator, self).__init__(warm_start)
+
+        if not isinstance(method, FastDecoupledLoadFlowCalculator.Method):
+            raise TypeError('method has to be a '
+                            'FastDecoupledLoadFlowCalculator.Method')
+        if not isinstance(linear_solver, LinearSolver):
+            raise TypeError('linear_solver has to be a LinearSolver')
+        self._method = method
+        self._linear_solver = linear_solver
+        self._pvpq = None
+        self._pq = None
+        self._Bp = None
+        self._Bpp = None
+        self._Bp_lu = None
+        self._Bpp_lu = None
 
-            # JacobianOrig = np.vstack(
-            #     (np.hstack((_HOrig, _NOrig)), np.hstack((_MOrig, _LOrig))))
+        if s_base is not None and v_base is not None and is_PV is not None \
+                and b is not None and Yb is not None:
+            self.update(s_base, v_base, is_PV, b, Yb)
 
-            # Compute changes from inverse Jacobian
+    @property
+    def method(self):
+        """
+        The way matrices B' and B'' are built.
+        """
+        return self._method
 
-            K = inv(jacobian).dot(MM)
+    @property
+    def linear_solver(self):
+        """
+        The way the half iterations are solved.
+        """
+        return self._linear_solver
+
+    def _laplacian(self, b):
+        # susceptance matrix of a network made of the branches with the given
+        # series susceptances, without shunt element, branches without
+        # susceptance, e.g. open ones, are left out
+        branches = np.flatnonzero(b)
+        b = b[branches]
+        i_bus = self._b[branches, 0]
+        j_bus = self._b[branches, 1]
+        return csr_matrix(
+            (np.concatenate((-b, -b, b, b)),
+             (np.concatenate((i_bus, j_bus, i_bus, j_bus)),
+              np.concatenate((j_bus, i_bus, i_bus, j_bus)))),
+            shape=(self._nBu, self._nBu))
 
-            # Update Theta and V values
+    @accepts(((1, 2), (int, float)))
+    def update(self, s_base, v_base, is_PV, b, Yb):
+        """
+        update(self, s_base, v_base, is_PV, b, Yb)
 
-            # Extract dTH from K, dTH are voltage angle changes for all buses
-            # except slack
-            dTH = K[0:self._nBu - 1]
-            # Extract dV from K, dV are voltage amplitude changes for all PV
-            # buses
-            dV = K[self._nBu - 1:]
+        Updates values of the calculator and factorizes matrices B' and B''.
 
-            # Update Theta for all buses except slack
-            self._Th[1:self._nBu] = self._Th[1:self._nBu] + dTH
+        :param s_base: reference power value
+        :type s_base: float
+        :param v_base: reference voltage value
+        :type v_base: float
+        :param is_PV: N-long vector specifying which bus is of type
+            :class:`.ElectricalPVBus`, where N is the number of buses including
+            slack.
+        :type is_PV: 1-dimensional numpy array of boolean
+        :param b: Mx2 table containing for each branch the ids of start and end
+            buses.
+        :type b: 2-dimensional numpy array of int
+        :param Yb: Mx4 table containing the admittances `Yii`, `Yij`, `Yjj`,
+            and `Yji` of each branch.
+        :type Yb: 2-dimensional numpy array of complex
+        """
+        super(FastDecoupledLoadFlowCalculator, self).update(s_base, v_base,
+                                                            is_PV, b, Yb)
 
-            # Update V for all PV buses
-            self._V[_auxPosPQ] = self._V[_auxPosPQ] + dV
+        # positions of all non-slack buses and of PQ buses
+        self._pvpq = np.arange(1, self._nBu)
+        self._pq = np.flatnonzero(self._is_PQ)
+
+        # branch series susceptances with and without resistances, open
+        # branches (null admittance, e.g. two-ports without load flow model)
+        # have none; branches without reactance are given the magnitude of
+        # their admittance, they would otherwise be ignored and could make B'
+        # and B'' singular
+        y_series = self._Yb[:, 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_series = np.imag(1. / y_series)
+        is_reactive = (y_series != 0) & (x_series != 0)
+        is_resistive = (y_series != 0) & ~is_reactive
+        b_series = np.where(is_resistive, -np.abs(y_series),
+                            np.imag(y_series))
+        b_x = b_series.copy()
+        b_x[is_reactive] = -1. / x_series[is_reactive]
+
+        # full susceptance matrix, including shunt element and taps
+        B = -self._Y.imag + self._laplacian(np.where(is_resistive,
+                                                     np.abs(y_series), 0.))
+        if self._method == FastDecoupledLoadFlowCalculator.Method.XB:
+            Bp = self._laplacian(-b_x)
+            Bpp = B
+        else:
+            Bp = self._laplacian(-b_series)
+            Bpp = B - self._laplacian(-b_series) + self._laplacian(-b_x)
+
+        # factorize B' and B'' once for all iterations
+        self._Bp = Bp.tocsr()[self._pvpq, :][:, self._pvpq].tocsc()
+        if len(self._pq) > 0:
+            self._Bpp = Bpp.tocsr()[self._pq, :][:, self._pq].tocsc()
+        else:
+            self._Bpp = None
+        self._factorize(None, None)
+
+    def _factorize(self, Bp_perm_c, Bpp_perm_c):
+        # factorizes B' and B'', there is no B'' without PQ bus; with a Krylov
+        # solver only their incomplete factorizations are computed, the
+        # column orderings are then not used
+        if self._linear_solver != LinearSolver.DIRECT:
+            self._Bp_lu = _KrylovSolver(self._linear_solver, self._Bp)
+            self._Bpp_lu = _KrylovSolver(self._linear_solver, self._Bpp) \
+                if len(self._pq) > 0 else None
+            return
+        self._Bp_lu = _factorize(self._Bp, Bp_perm_c)
+        if len(self._pq) > 0:
+            self._Bpp_lu = _factorize(self._Bpp, Bpp_perm_c)
+        else:
+            self._Bpp_lu = None
+
+    def _compile_settings(self):
+        return (self._method.name,)
+
+    def get_compiled_state(self):
+        """
+        get_compiled_state(self)
+
+        Returns the arrays computed by :func:`update` from the network, see
+        :func:`AbstractElectricalLoadFlowCalculator.get_compiled_state`.
+
+        :return: the arrays by name
+        :rtype: dict of numpy arrays
+        """
+        state = super(FastDecoupledLoadFlowCalculator,
+                      self).get_compiled_state()
+        state['pvpq'] = self._pvpq
+        state['pq'] = self._pq
+        # there is no column ordering with a Krylov solver
+        _put_sparse(state, 'Bp', self._Bp)
+        if self._linear_solver == LinearSolver.DIRECT:
+            state['Bp.perm_c'] = self._Bp_lu.perm_c
+        if self._Bpp_lu is not None:
+            _put_sparse(state, 'Bpp', self._Bpp)
+            if self._linear_solver == LinearSolver.DIRECT:
+                state['Bpp.perm_c'] = self._Bpp_lu.perm_c
+        return state
+
+    @accepts(((1, 2), (int, float)))
+    def load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state):
+        """
+        load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state)
+
+        Updates values of the calculator as :func:`update`, reading the arrays
+        computed from the network in `state`, see
+        :func:`AbstractElectricalLoadFlowCalculator.load_compiled_state`.
+        Matrices B' and B'' are factorized with their stored column ordering,
+        if any.
+        """
+        super(FastDecoupledLoadFlowCalculator, self).load_compiled_state(
+            s_base, v_base, is_PV, b, Yb, state)
+        self._pvpq = state['pvpq']
+        self._pq = state['pq']
+        self._Bp = _get_sparse(state, 'Bp', csc_matrix)
+        if len(self._pq) > 0:
+            self._Bpp = _get_sparse(state, 'Bpp', csc_matrix)
+            self._factorize(state.get('Bp.perm_c'), state.get('Bpp.perm_c'))
+        else:
+            self._Bpp = None
+            self._factorize(state.get('Bp.perm_c'), None)
+
+    def _mismatch(self, P, Q, V, Th):
+        # residual errors on bus active and reactive powers, of one scenario
+        # (vectors) or of one scenario per row (tables)
+        Vc = V * np.exp(1j * Th)
+        S_calc = Vc * np.conjugate(self._Y.dot(Vc.T).T)
+        return P - S_calc.real, Q - S_calc.imag, S_calc
+
+
+    def _set_forcing_term(self, residual):
+        # relative tolerance of the inexact solves of the next iteration
+        if self._linear_solver != LinearSolver.DIRECT:
+            for solver in (self._Bp_lu, self._Bpp_lu):
+                if solver is not None:
+                    solver.tolerance = _forcing_term(residual)
+
+    def _iterate(self):
+        self._nIter = 0
+        while True:
+            dP, dQ, S_calc = self._mismatch(self._P, self._Q, self._V,
+                                            self._Th)
+            self._residual_metric = max(np.max(abs(dP[self._pvpq])),
+                                        np.max(abs(dQ[self._pq]))
+                                        if len(self._pq) > 0 else 0.)
+            if self._residual_metric <= self._residual_tolerance:
+                return S_calc.real, S_calc.imag
+            if self._stop_iterating():
+                return None
+            self._set_forcing_term(self._residual_metric)
+
+            # P-Th half iteration
+            self._Th[self._pvpq] += self._Bp_lu.solve(
+                dP[self._pvpq] / self._V[self._pvpq])
+
+            # Q-V half iteration
+            if self._Bpp_lu is not None:
+                dP, dQ, S_calc = self._mismatch(self._P, self._Q, self._V,
+                                                self._Th)
+                self._V[self._pq] += self._Bpp_lu.solve(
+                    dQ[self._pq] / self._V[self._pq])
 
             self._nIter += 1
-            # print self._nIter
         # end of iteration loop
 
-        # Compute final active and reactive powers for all buses
-        p_calc = np.sum(_matVV * (_G_cos_matTh + _B_sin_matTh), axis=1)
-        q_calc = np.sum(_matVV * (_G_sin_matTh - _B_cos_matTh), axis=1)
+    def _iterate_many(self, P, Q, V, Th):
+        p_calc = np.empty(P.shape)
+        q_calc = np.empty(P.shape)
+        converged = np.zeros(P.shape[0], dtype=bool)
+        # scenarios still iterated
+        active = np.arange(P.shape[0])
+        self._nIter = 0
+        while len(active) > 0:
+            dP, dQ, S_calc = self._mismatch(P[active], Q[active], V[active],
+                                            Th[active])
+            residual = np.max(abs(dP[:, self._pvpq]), axis=1)
+            if len(self._pq) > 0:
+                residual = np.maximum(residual,
+                                      np.max(abs(dQ[:, self._pq]), axis=1))
+            done = residual <= self._residual_tolerance
+            p_calc[active[done]] = S_calc.real[done]
+            q_calc[active[done]] = S_calc.imag[done]
+            converged[active[done]] = True
+
+            keep = ~done & np.isfinite(residual)
+            if self._nIter >= self._max_iterations or not np.any(keep):
+                break
+            active = active[keep]
+            self._set_forcing_term(np.max(residual[keep]))
+
+            # P-Th half iteration, all scenarios in one multi-RHS solve
+            pvpq = np.ix_(active, self._pvpq)
+            Th[pvpq] += self._Bp_lu.solve(np.asfortranarray(
+                (dP[keep][:, self._pvpq] / V[pvpq]).T)).T
+
+            # Q-V half iteration
+            if self._Bpp_lu is not None:
+                dP, dQ, S_calc = self._mismatch(P[active], Q[active],
+                                                V[active], Th[active])
+                pq = np.ix_(active, self._pq)
+                V[pq] += self._Bpp_lu.solve(np.asfortranarray(
+                    (dQ[:, self._pq] / V[pq]).T)).T
 
-        # Update active power for slack
-        self._P[0] = p_calc[0]
-        # Update reactive power for slack and all PV buses
-        self._Q[~self._is_PQ] = q_calc[~self._is_PQ]
+            self._nIter += 1
+        # end of iteration loop
 
-        if not scaled:
-            self._P *= self.s_base
-            self._Q *= self.s_base
-            self._V *= self.v_base
+        return p_calc, q_calc, converged
+
+
+class BackwardForwardSweepLoadFlowCalculator(
+        AbstractIterativeLoadFlowCalculator):
+
+    @accepts(((1, 2), (int, float)))
+    def __init__(self, s_base=None, v_base=None, is_PV=None, b=None, Yb=None,
+                 warm_start=False):
+        """
+        This class implements the backward/forward sweep method to solve the
+        power-flow problem of radial networks, e.g. distribution feeders. No
+        matrix is factorized: each iteration consists of a backward sweep,
+        computing branch currents from the leaves to the slack bus, followed
+        by a forward sweep, computing bus voltages from the slack bus to the
+        leaves. Both sweeps are done level by level of the tree rooted at the
+        slack bus, the tree is built once in :func:`update`.
+
+        .. seealso:: D. Shirmohammadi et al., A Compensation-based Power Flow
+                     Method for Weakly Meshed Distribution and Transmission
+                     Networks, IEEE Transactions on Power Systems, 1988
+
+        At initialization the user has to give the reference power value
+        `s_base` (all power values are then given relative to this reference
+        value), the reference voltage value `v_base` (all voltage values are
+        then given relative to this reference value), a boolean array `is_PV`
+        specifying which one among the buses is a :class:`.ElectricalPVBus`
+        (the bus with 1st position is slack, the others non
+        :class:`.ElectricalPVBus` are :class:`.ElectricalPQBus`), an integer
+        array `b` specifying for each branch the bus id it is starting from and
+        the bus id it is going to, a complex array `Yb` specifying
+        admittances of each network branch.
+
+        Only networks without :class:`.ElectricalPVBus` and whose branches
+        form a tree, i.e. connect all buses without loop, are supported.
+
+        :param warm_start: whether each solve starts from the previous solution,
+            see :class:`AbstractIterativeLoadFlowCalculator`
+        :type warm_start: bool
+        """
+        super(BackwardForwardSweepLoadFlowCalculator, self).__init__(warm_start)
+
+        self._levels = None
+        self._Ypp = None
+        self._Ypc = None
+        self._Ycp = None
+        self._Ycc = None
+
+        if s_base is not None and v_base is not None and is_PV is not None \
+                and b is not None and Yb is not None:
+            self.update(s_base, v_base, is_PV, b, Yb)
+
+    @accepts(((1, 2), (int, float)))
+    def update(self, s_base, v_base, is_PV, b, Yb):
+        """
+        update(self, s_base, v_base, is_PV, b, Yb)
+
+        Updates values of the calculator.
+
+        :param s_base: reference power value
+        :type s_base: float
+        :param v_base: reference voltage value
+        :type v_base: float
+        :param is_PV: N-long vector specifying which bus is of type
+            :class:`.ElectricalPVBus`, where N is the number of buses including
+            slack.
+        :type is_PV: 1-dimensional numpy array of boolean
+        :param b: Mx2 table containing for each branch the ids of start and end
+            buses.
+        :type b: 2-dimensional numpy array of int
+        :param Yb: Mx4 table containing the admittances `Yii`, `Yij`, `Yjj`,
+            and `Yji` of each branch.
+        :type Yb: 2-dimensional numpy array of complex
+
+        :raise RuntimeError: if the network has a PV bus, is meshed or is not
+            connected
+        """
+        super(BackwardForwardSweepLoadFlowCalculator, self).update(
+            s_base, v_base, is_PV, b, Yb)
+
+        if np.any(self._is_PV):
+            raise RuntimeError('The backward/forward sweep method does not '
+                               'support PV buses.')
+        if self._nBr > self._nBu - 1:
+            raise RuntimeError('The backward/forward sweep method requires a '
+                               'radial network, the network is meshed.')
+
+        # tree rooted at the slack bus
+        graph = csr_matrix((np.ones(self._nBr), (self._b[:, 0], self._b[:, 1])),
+                           shape=(self._nBu, self._nBu))
+        order, parent = breadth_first_order(graph, 0, directed=False,
+                                            return_predecessors=True)
+        if len(order) < self._nBu:
+            raise RuntimeError('The backward/forward sweep method requires '
+                               'all buses to be connected to the slack bus.')
+
+        # orientate branches from parent bus to child bus
+        swapped = parent[self._b[:, 0]] == self._b[:, 1]
+        child = np.where(swapped, self._b[:, 0], self._b[:, 1])
+        self._Ypp = np.where(swapped, self._Yb[:, 2], self._Yb[:, 0])
+        self._Ypc = np.where(swapped, self._Yb[:, 3], self._Yb[:, 1])
+        self._Ycc = np.where(swapped, self._Yb[:, 0], self._Yb[:, 2])
+        self._Ycp = np.where(swapped, self._Yb[:, 1], self._Yb[:, 3])
+
+        # depth of each bus in the tree, buses are ordered by depth
+        depth = np.zeros(self._nBu, dtype=int)
+        for bus in order[1:]:
+            depth[bus] = depth[parent[bus]] + 1
+
+        # branches of each level, with their child and parent buses
+        self._levels = []
+        branch_depth = depth[child]
+        for level in range(1, depth.max() + 1):
+            branches = np.flatnonzero(branch_depth == level)
+            self._levels.append((branches, child[branches],
+                                 parent[child[branches]]))
+
+    def get_compiled_state(self):
+        """
+        get_compiled_state(self)
+
+        Returns the arrays computed by :func:`update` from the network, see
+        :func:`AbstractElectricalLoadFlowCalculator.get_compiled_state`.
+
+        :return: the arrays by name
+        :rtype: dict of numpy arrays
+        """
+        state = super(BackwardForwardSweepLoadFlowCalculator,
+                      self).get_compiled_state()
+        for name in ('Ypp', 'Ypc', 'Ycp', 'Ycc'):
+            state[name] = getattr(self, '_' + name)
+        # levels are stored one after the other
+        empty = np.zeros(0, dtype=int)
+        for i_part, name in enumerate(('branches', 'children', 'parents')):
+            state['levels.' + name] = np.concatenate(
+                [empty] + [level[i_part] for level in self._levels])
+        state['levels.starts'] = np.cumsum(
+            [0] + [len(level[0]) for level in self._levels])
+        return state
+
+    @accepts(((1, 2), (int, float)))
+    def load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state):
+        """
+        load_compiled_state(self, s_base, v_base, is_PV, b, Yb, state)
+
+        Updates values of the calculator as :func:`update`, reading the arrays
+        computed from the network in `state`, see
+        :func:`AbstractElectricalLoadFlowCalculator.load_compiled_state`.
+        """
+        super(BackwardForwardSweepLoadFlowCalculator,
+              self).load_compiled_state(s_base, v_base, is_PV, b, Yb, state)
+        for name in ('Ypp', 'Ypc', 'Ycp', 'Ycc'):
+            setattr(self, '_' + name, state[name])
+        starts = state['levels.starts']
+        self._levels = [
+            tuple(state['levels.' + name][starts[i]:starts[i + 1]]
+                  for name in ('branches', 'children', 'parents'))
+            for i in range(len(starts) - 1)]
+
+    def _iterate(self):
+        n_bu = self._nBu
+        pq = self._is_PQ
+        S = self._P + 1j * self._Q
+        # currents entering the branches at child and parent side
+        I_c = np.zeros(self._nBr, dtype=complex)
+        I_p = np.zeros(self._nBr, dtype=complex)
+        Vc = self._V * np.exp(1j * self._Th)
+        self._nIter = 0
+        while True:
+            # residual errors on bus powers
+            S_calc = Vc * np.conjugate(self._Y.dot(Vc))
+            dS = S[pq] - S_calc[pq]
+            self._residual_metric = max(np.max(abs(dS.real)),
+                                        np.max(abs(dS.imag))) \
+                if len(dS) > 0 else 0.
+            if self._residual_metric <= self._residual_tolerance:
+                return S_calc.real, S_calc.imag
+            if self._stop_iterating():
+                return None
+
+            # currents injected into the network by the buses
+            I_bus = np.zeros(n_bu, dtype=complex)
+            I_bus[pq] = np.conjugate(S[pq] / Vc[pq])
+
+            # backward sweep: the current entering a branch at the child side
+            # is the current injected by the child bus minus the currents
+            # leaving it through the branches to its own children
+            for branches, child, parent in reversed(self._levels):
+                I_c[branches] = I_bus[child]
+                I_p[branches] = self._Ypp[branches] * Vc[parent] - \
+                    self._Ypc[branches] * (
+                        I_c[branches] + self._Ycp[branches] * Vc[parent]) / \
+                    self._Ycc[branches]
+                I_bus -= np.bincount(parent, I_p[branches].real, n_bu) + \
+                    1j * np.bincount(parent, I_p[branches].imag, n_bu)
+
+            # forward sweep: child voltage from parent voltage and current
+            for branches, child, parent in self._levels:
+                Vc[child] = (I_c[branches] + self._Ycp[branches] *
+                             Vc[parent]) / self._Ycc[branches]
+
+            np.abs(Vc, out=self._V)
+            np.arctan2(Vc.imag, Vc.real, out=self._Th)
+
+            self._nIter += 1
+        # end of iteration loop
 
-        return [self._P, self._Q, self._V, self._Th]
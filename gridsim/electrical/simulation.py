@@ -5,28 +5,90 @@
 
 """
 
+import copy
 import warnings
 import types
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
-from scipy.sparse import lil_matrix
+from scipy.sparse import csr_matrix, coo_matrix, diags
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
 
 from gridsim.decorators import accepts, returns
 from gridsim.core import AbstractSimulationModule
+from gridsim.unit import units
+from gridsim.util import RandomStreams
 
+from .cache import CompiledNetworkCache
 from .core import AbstractElectricalElement, ElectricalBus, \
-    ElectricalNetworkBranch, AbstractElectricalCPSElement
-from .loadflow import AbstractElectricalLoadFlowCalculator
+    ElectricalNetworkBranch, AbstractElectricalCPSElement, \
+    AbstractElectricalCPSElementGroup
+from .loadflow import AbstractElectricalLoadFlowCalculator, \
+    AbstractIterativeLoadFlowCalculator, DirectLoadFlowCalculator, \
+    LoadFlowRunStatistics, admittance_matrix, branch_currents, \
+    branch_power_flows
 from .network import AbstractElectricalTwoPort, ElectricalTransmissionLine, \
-    ElectricalGenTransformer, ElectricalSlackBus
+    ElectricalGenTransformer, ElectricalSlackBus, ElectricalPVBus, \
+    ElectricalPQBus
 
 
 class _BusElectricalValues(object):
-    pass
+
+    def __init__(self):
+        super(_BusElectricalValues, self).__init__()
+        self.P = None
+        self.Q = None
+        self.V = None
+        self.Th = None
 
 
 class _BranchElectricalValues(object):
-    pass
+
+    def __init__(self):
+        super(_BranchElectricalValues, self).__init__()
+        self.Pij = None
+        self.Qij = None
+        self.Pji = None
+        self.Qji = None
+        self.I = None
+        self.Ploss = None
+
+
+class _ElectricalIsland(object):
+
+    def __init__(self, buses, branches, calculator):
+        super(_ElectricalIsland, self).__init__()
+        # ids of the buses of the island, its reference bus first
+        self.buses = buses
+        # ids of the branches of the island
+        self.branches = branches
+        # load flow calculator of the island network, None if the island has
+        # no branch
+        self.calculator = calculator
+
+
+class _KronReduction(object):
+
+    def __init__(self, kept, eliminated, Y_ek, Y_ee):
+        # ids of the buses kept in the reduced network, the slack bus first,
+        # and of the zero-injection buses eliminated from it
+        self.kept = kept
+        self.eliminated = eliminated
+        # admittances between eliminated and kept buses, and factorized
+        # admittance matrix of the eliminated buses
+        self.Y_ek = Y_ek
+        self.Y_ee_lu = splu(Y_ee.tocsc())
+        # equivalent branches of the reduced network, between positions in
+        # kept
+        self.b = None
+        self.Yb = None
+
+    def recover(self, Vc):
+        # complex voltages of the eliminated buses from the complex voltages
+        # Vc of the kept buses, eliminated buses draw no current:
+        # Y_ek*Vc + Y_ee*Vc_e = 0
+        return -self.Y_ee_lu.solve(self.Y_ek.dot(Vc))
 
 
 class ElectricalSimulator(AbstractSimulationModule):
@@ -57,10 +119,28 @@ class ElectricalSimulator(AbstractSimulationModule):
         self._cps_elements = []
         self._cps_elementDict = {}
         self._cps_elementBusMap = {}
+        # elements computed one by one, and groups of elements computed at
+        # once with the ids of their elements
+        self._single_cps_elements = []
+        self._cps_element_groups = []
+        # streams of random numbers of stochastic elements, whether their seed
+        # has been set by the user or is drawn again at each reset
+        self._random_streams = self._draw_streams()
+        self._has_seed = False
+
+        # results of the last load flow computation, buses and branches read
+        # their values from these arrays
+        self._bus_values = _BusElectricalValues()
+        self._branch_values = _BranchElectricalValues()
+
         self._buses.append(None)
         self.add(ElectricalSlackBus("Slack Bus"))
         # TODO: allow to change the slack bus position
+        # buses have been added, the network has to be compiled again
         self._hasChanges = False
+        # elements have been added, attached or detached, only the aggregation
+        # of element powers into bus powers has to be computed again
+        self._hasElementChanges = False
 
         # matrix representing aggregation of CPS element into buses
         self._mat_A = None
@@ -78,12 +158,50 @@ class ElectricalSimulator(AbstractSimulationModule):
         self._mat_Y = None
         self._b = None
 
+        # islands of the network, None when all buses are connected to the
+        # slack bus
+        self._islands = None
+        self._island_count = 0
+        self._is_dead = None
+        self._workers = 1
+        self._pool = None
+        # persistent cache of the compiled networks of the calculators
+        self._compile_cache = None
+        # elimination of the zero-injection buses, the reduction of the last
+        # compilation of the network if any
+        self._kron_reduction = False
+        self._reduction = None
+
         # bus electrical values
         self._bu = _BusElectricalValues()
 
         # branches electrical values
         self._br = _BranchElectricalValues()
 
+        # reuse of the last load flow solution when bus injections have not
+        # changed
+        self._injection_atol = 0.
+        self._injection_rtol = 0.
+        self._last_injections = None
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # work done by the load flow computations
+        self._load_flow_statistics = LoadFlowRunStatistics()
+
+        # branch monitoring: current ratings, overload threshold in percent
+        # of the ratings, number of steps since reset and overload events
+        # found at each step as (step, branch ids, loadings) tuples
+        self._branch_ratings = None
+        self._overload_threshold = 100.
+        self._step_count = 0
+        self._overloads = []
+
+        # linear updates of the solution with the voltage sensitivities of the
+        # last full solve, see update
+        self._sensitivity_threshold = None
+        self._sensitivity_tolerance = 1e-6
+        self._linear_steps = 0
 
     @property
     @returns((AbstractElectricalLoadFlowCalculator, types.NoneType))
@@ -99,6 +217,278 @@ class ElectricalSimulator(AbstractSimulationModule):
     @accepts((1, (AbstractElectricalLoadFlowCalculator, types.NoneType)))
     def load_flow_calculator(self, new_calculator):
         self._load_flow_calculator = new_calculator
+        self._hasChanges = True
+
+    @property
+    def injection_atol(self):
+        """
+        The absolute tolerance on bus active powers below which bus injections
+        are considered unchanged since the last load flow computation, see
+        :func:`update`. Defaults to 0.
+        """
+        return self._injection_atol
+
+    @injection_atol.setter
+    @accepts((1, (int, float)))
+    def injection_atol(self, value):
+        if value < 0:
+            raise RuntimeError('Tolerance cannot be negative')
+        self._injection_atol = value
+
+    @property
+    def injection_rtol(self):
+        """
+        The tolerance on bus active powers relative to their values at the
+        last load flow computation, below which bus injections are considered
+        unchanged, see :func:`update`. Defaults to 0.
+        """
+        return self._injection_rtol
+
+    @injection_rtol.setter
+    @accepts((1, (int, float)))
+    def injection_rtol(self, value):
+        if value < 0:
+            raise RuntimeError('Tolerance cannot be negative')
+        self._injection_rtol = value
+
+    @property
+    def workers(self):
+        """
+        The number of threads solving the load flows of the islands of the
+        network in parallel, see :func:`update`. Defaults to 1, i.e. islands
+        are solved one after the other.
+        """
+        return self._workers
+
+    @workers.setter
+    @accepts((1, int))
+    def workers(self, value):
+        if value < 1:
+            raise RuntimeError('The number of workers has to be positive')
+        self.close()
+        self._workers = value
+
+    @property
+    def compile_cache(self):
+        """
+        The :class:`.CompiledNetworkCache` the load flow calculators are
+        updated from when the network is compiled, i.e. at the first step
+        after buses or branches have been added, or None. Processes
+        simulating the same network with a cache in the same directory then
+        compile it only once. Defaults to None, i.e. calculators are updated
+        without cache.
+
+        *Example*::
+
+            esim.compile_cache = CompiledNetworkCache('/tmp/networks')
+        """
+        return self._compile_cache
+
+    @compile_cache.setter
+    @accepts((1, (CompiledNetworkCache, types.NoneType)))
+    def compile_cache(self, value):
+        self._compile_cache = value
+
+    @property
+    def random_streams(self):
+        """
+        The random number streams of the stochastic elements, e.g.
+        :class:`.GaussianRandomElectricalCPSElement`. Each stochastic element
+        and each group of stochastic elements draws from its own stream, keyed
+        by its friendly name, so that a simulation run with the same seed
+        gives the same results whatever the order of the elements.
+
+        Set streams are restarted at each :func:`reset`, each run then draws
+        the same numbers. By default, or when set to None, new streams are
+        made at each :func:`reset` with a seed drawn from the global
+        generator :mod:`numpy.random`: consecutive runs draw different
+        numbers, and :func:`numpy.random.seed` makes a sequence of runs
+        reproducible.
+
+        *Example*::
+
+            esim.random_streams = RandomStreams(42)
+        """
+        return self._random_streams
+
+    @random_streams.setter
+    @accepts((1, (RandomStreams, types.NoneType)))
+    def random_streams(self, value):
+        self._has_seed = value is not None
+        self._random_streams = value if value is not None \
+            else self._draw_streams()
+        self._seed_elements()
+
+    @property
+    def island_count(self):
+        """
+        The number of islands of the network, i.e. of groups of buses
+        connected with each other by branches, as found at the last
+        compilation of the network. 0 if the network has not been compiled.
+        """
+        return self._island_count
+
+    @property
+    def dead_buses(self):
+        """
+        The list of :class:`.ElectricalBus` of the islands with neither slack
+        bus nor :class:`.ElectricalPVBus`, as found at the last compilation of
+        the network. These buses are not energized: the power of the elements
+        attached to them is lost and all their electrical values are 0.
+        """
+        if self._is_dead is None:
+            return []
+        return [self._buses[i_bus] for i_bus in np.flatnonzero(self._is_dead)]
+
+    @property
+    def kron_reduction(self):
+        """
+        Whether the zero-injection buses, i.e. the :class:`.ElectricalPQBus`
+        without attached element such as cable joints and busbars, are
+        eliminated from the network solved by the load flow calculator (Kron
+        reduction). The load flow is solved on the smaller network of the
+        other buses, joined by equivalent branches, then the voltages of the
+        eliminated buses, which draw no current, are recovered from the
+        voltages of the other buses and the power flows of all branches are
+        computed from the bus voltages.
+
+        Only networks made of a single island are reduced, and the load flow
+        calculator has to solve the AC load flow, i.e. be an
+        :class:`.AbstractIterativeLoadFlowCalculator`. Equivalent branches may
+        join buses which are not neighbours, the reduced network of a radial
+        network is then meshed. Defaults to False.
+        """
+        return self._kron_reduction
+
+    @kron_reduction.setter
+    @accepts((1, bool))
+    def kron_reduction(self, value):
+        self._kron_reduction = value
+        # the network has to be compiled again
+        self._hasChanges = True
+
+    @property
+    def eliminated_buses(self):
+        """
+        The list of :class:`.ElectricalBus` eliminated by the Kron reduction
+        at the last compilation of the network, see :attr:`kron_reduction`.
+        """
+        if self._reduction is None:
+            return []
+        return [self._buses[i_bus] for i_bus in self._reduction.eliminated]
+
+    @property
+    def load_flow_statistics(self):
+        """
+        The :class:`.LoadFlowRunStatistics` aggregating the
+        :attr:`.AbstractElectricalLoadFlowCalculator.statistics` of all load
+        flows computed since the last reset, one per island and per computed
+        simulation step.
+        """
+        return self._load_flow_statistics
+
+    @property
+    def branch_ratings(self):
+        """
+        The current ratings of the branches, in the order of their ids, used
+        to find overloaded branches at each step, see
+        :func:`overload_events`. Currents are in the units of the load flow
+        results, i.e. in ampere with the default base power and voltage.
+        Branches with an infinite rating, or added after the ratings were
+        set, are not monitored. Defaults to None, i.e. no branch is
+        monitored.
+
+        :rtype: 1-dimensional numpy array of float
+        """
+        return self._branch_ratings
+
+    @branch_ratings.setter
+    def branch_ratings(self, value):
+        if value is not None:
+            value = np.array(value, dtype=float)
+            if value.shape != (len(self._branches),):
+                raise RuntimeError('One rating has to be given per branch.')
+            if np.any(value <= 0):
+                raise RuntimeError('Branch ratings have to be positive.')
+        self._branch_ratings = value
+
+    @property
+    def sensitivity_threshold(self):
+        """
+        The largest change of a bus active power since the previous step for
+        which the load flow solution is approximated with the voltage
+        sensitivities of the last full solve, see :func:`update`. Powers are
+        in the units of the load flow, i.e. in watt with the default base
+        power. Defaults to None, i.e. every load flow is fully solved.
+        Only used with an :class:`.AbstractIterativeLoadFlowCalculator` on a
+        network without islands.
+        """
+        return self._sensitivity_threshold
+
+    @sensitivity_threshold.setter
+    @accepts((1, (type(None), int, float)))
+    def sensitivity_threshold(self, value):
+        if value is not None and value < 0:
+            raise RuntimeError('The sensitivity threshold can not be '
+                               'negative.')
+        self._sensitivity_threshold = value
+
+    @property
+    def sensitivity_tolerance(self):
+        """
+        The largest residual error on bus powers, relative to the base power,
+        of a solution approximated with the voltage sensitivities. A full
+        solve is done when the error of the approximation is larger. Defaults
+        to 1e-6.
+        """
+        return self._sensitivity_tolerance
+
+    @sensitivity_tolerance.setter
+    @accepts((1, float))
+    def sensitivity_tolerance(self, value):
+        if value <= 0:
+            raise RuntimeError('The sensitivity tolerance has to be positive.')
+        self._sensitivity_tolerance = value
+
+    @property
+    def linear_steps(self):
+        """
+        The number of steps since the last reset whose load flow solution has
+        been approximated with the voltage sensitivities instead of being
+        fully solved.
+        """
+        return self._linear_steps
+
+    @property
+    def overload_threshold(self):
+        """
+        The loading of a branch, in percent of its rating, above which the
+        branch is overloaded. Defaults to 100.
+        """
+        return self._overload_threshold
+
+    @overload_threshold.setter
+    @accepts((1, (int, float)))
+    def overload_threshold(self, value):
+        if value < 0:
+            raise RuntimeError('The overload threshold can not be negative.')
+        self._overload_threshold = value
+
+    @property
+    def cache_hits(self):
+        """
+        The number of simulation steps for which the load flow has not been
+        computed since bus injections have not changed.
+        """
+        return self._cache_hits
+
+    @property
+    def cache_misses(self):
+        """
+        The number of simulation steps for which the load flow has been
+        computed.
+        """
+        return self._cache_misses
 
     @accepts((1, AbstractElectricalElement))
     @returns(AbstractElectricalElement)
@@ -118,6 +508,7 @@ class ElectricalSimulator(AbstractSimulationModule):
             if self._buses[0] is None:
                 self._buses[0] = element
                 element.id = 0
+                element._values = self._bus_values
                 self._busDict[element.friendly_name] = element
             else:
                 raise RuntimeError(
@@ -131,8 +522,10 @@ class ElectricalSimulator(AbstractSimulationModule):
                 raise RuntimeError(
                     'Duplicate Bus friendly name, must be unique.')
             element.id = len(self._buses)
+            element._values = self._bus_values
             self._buses.append(element)
             self._busDict[element.friendly_name] = element
+            self._hasChanges = True
 
         elif isinstance(element, ElectricalNetworkBranch):
             if element.friendly_name in self._branchDict.keys():
@@ -145,6 +538,7 @@ class ElectricalSimulator(AbstractSimulationModule):
                     self._buses):
                 raise RuntimeError('Invalid "to bus ID".')
             element.id = len(self._branches)
+            element._values = self._branch_values
             self._branches.append(element)
             self._branchDict[element.friendly_name] = element
 
@@ -153,15 +547,21 @@ class ElectricalSimulator(AbstractSimulationModule):
                 raise RuntimeError(
                     'Duplicate electrical CPS element friendly name, '
                     'must be unique.')
+            if element._group is not None:
+                raise RuntimeError(
+                    'Elements of a group have to be added with add_group.')
             element.id = len(self._cps_elements)
             self._cps_elements.append(element)
+            self._single_cps_elements.append(element)
             self._cps_elementDict[element.friendly_name] = element
+            self._seed_element(element)
+            self._hasElementChanges = True
 
         else:
             # TODO: also add these element to appropriate list,
             # TODO: e.g. self.element[element.__class__.__name__]
             pass
-        self._hasChanges = True
+        # new branches are detected when updating, see _compile
         return element
 
     @accepts((1, (int, str)))
@@ -242,6 +642,86 @@ class ElectricalSimulator(AbstractSimulationModule):
             else:
                 raise KeyError('Invalid key.')
 
+    @accepts((1, str))
+    def bus_values(self, attribute_name):
+        """
+        bus_values(self, attribute_name)
+
+        Retrieves the array holding the given electrical value of all buses,
+        as computed by the last load flow. The array is not copied: the value
+        of the bus with id ``i`` is ``bus_values(attribute_name)[i]``, and
+        :class:`.ElectricalBus` objects read their values from it.
+
+        :param attribute_name: one of 'P', 'Q', 'V' or 'Th'
+        :type attribute_name: str
+        :return: the array of the bus values, or None if no load flow has been
+            computed since the last reset
+        :rtype: 1-dimensional numpy array of float
+
+        :raise KeyError: if the attribute name is not valid
+        """
+        if attribute_name not in ('P', 'Q', 'V', 'Th'):
+            raise KeyError('Invalid key.')
+        return getattr(self._bus_values, attribute_name)
+
+    @accepts((1, str))
+    def branch_values(self, attribute_name):
+        """
+        branch_values(self, attribute_name)
+
+        Retrieves the array holding the given electrical value of all
+        branches, as computed by the last load flow. The array is not copied:
+        the value of the branch with id ``i`` is
+        ``branch_values(attribute_name)[i]``, and
+        :class:`.ElectricalNetworkBranch` objects read their values from it.
+
+        :param attribute_name: one of 'Pij', 'Qij', 'Pji', 'Qji', 'I' or
+            'Ploss'
+        :type attribute_name: str
+        :return: the array of the branch values, or None if no load flow has
+            been computed since the last reset or if the load flow calculator
+            does not compute this value
+        :rtype: 1-dimensional numpy array of float
+
+        :raise KeyError: if the attribute name is not valid
+        """
+        if attribute_name not in ('Pij', 'Qij', 'Pji', 'Qji', 'I', 'Ploss'):
+            raise KeyError('Invalid key.')
+        return getattr(self._branch_values, attribute_name)
+
+    @accepts((1, (type(None), int, str)))
+    def overload_events(self, branch=None):
+        """
+        overload_events(self, branch=None)
+
+        Retrieves the overload events found since the last reset, i.e. for
+        each step and each branch whose current exceeds
+        :attr:`overload_threshold` percent of its rating in
+        :attr:`branch_ratings`, the index of the step, starting from 0, the id
+        of the branch and its loading in percent of its rating. Events are
+        ordered by step, then by branch id.
+
+        :param branch: the id or friendly name of the branch whose events
+            are retrieved, None for all branches
+        :type branch: int or str
+        :return: (steps, branch_ids, loadings), 3 arrays with one value by
+            event
+        :rtype: tuple of 1-dimensional numpy arrays
+        """
+        if len(self._overloads) == 0:
+            events = (np.zeros(0, dtype=int), np.zeros(0, dtype=int),
+                      np.zeros(0))
+        else:
+            events = (np.concatenate([np.repeat(step, len(ids))
+                                      for step, ids, _ in self._overloads]),
+                      np.concatenate([ids for _, ids, _ in self._overloads]),
+                      np.concatenate([loadings
+                                      for _, _, loadings in self._overloads]))
+        if branch is not None:
+            is_branch = events[1] == self.branch(branch).id
+            events = tuple(values[is_branch] for values in events)
+        return events
+
     @accepts((1, str),
              ((2, 3), ElectricalBus),
              (4, AbstractElectricalTwoPort))
@@ -263,6 +743,11 @@ class ElectricalSimulator(AbstractSimulationModule):
         :type bus_b: :class:`.ElectricalBus`
         :param two_port: the element placed on the branch
         :return: the new :class:`.ElectricalNetworkBranch`
+
+        .. note:: Branches connected after the first simulation step are
+            added to the load flow calculator with
+            :func:`.AbstractElectricalLoadFlowCalculator.add_branches`, which
+            may avoid computing the whole network again.
         """
         branch = self.add(
             ElectricalNetworkBranch(friendly_name, bus_a, bus_b, two_port))
@@ -289,14 +774,276 @@ class ElectricalSimulator(AbstractSimulationModule):
         if bus.type == ElectricalBus.Type.SLACK_BUS:
             raise RuntimeError('No element can be attached to slack bus')
         if not isinstance(el, AbstractElectricalCPSElement):
-            el = self._cps_elements(el)
+            el = self.cps_element(el)
         if not el.friendly_name in self._cps_elementDict.keys():
             self.add(el)
         self._cps_elementBusMap[el.id] = bus.id
-        self._hasChanges = True  # to recompute network description
+        # only the aggregation of element powers has to be recomputed
+        self._hasElementChanges = True
         # element inherits bus position
         el.position = bus.position
 
+    @accepts((1, (int, str, AbstractElectricalCPSElement)))
+    def detach(self, el):
+        """
+        detach(self, el)
+
+        Detaches the given element from its bus. The element stays in the
+        simulation but does not provide electrical energy to the network any
+        more, until it is attached again with :func:`attach`.
+
+        :param el: the element to detach
+        :type el: :class:`.AbstractElectricalCPSElement`
+
+        :raise RuntimeError: if the element is not attached to a bus
+        """
+        if not isinstance(el, AbstractElectricalCPSElement):
+            el = self.cps_element(el)
+        if el.id not in self._cps_elementBusMap \
+                or self._cps_elements[el.id] is not el:
+            raise RuntimeError('The element is not attached to a bus.')
+        del self._cps_elementBusMap[el.id]
+        self._hasElementChanges = True
+
+    def _check_new_names(self, friendly_names, known_names, kind):
+        # validates the friendly names of new element in one pass
+        names = set(friendly_names)
+        if len(names) != len(friendly_names) \
+                or not names.isdisjoint(known_names):
+            raise RuntimeError(
+                'Duplicate ' + kind + ' friendly name, must be unique.')
+
+    def _check_bus_ids(self, bus_ids, what):
+        # validates bus ids in one pass, returns them as an integer array
+        bus_ids = np.asarray(bus_ids)
+        if len(bus_ids) > 0 and (bus_ids.dtype.kind not in 'iu' or
+                                 bus_ids.min() < 0 or
+                                 bus_ids.max() >= len(self._buses)):
+            raise RuntimeError('Invalid "' + what + '".')
+        return bus_ids.astype(int)
+
+    def add_buses(self, friendly_names, bus_types):
+        """
+        add_buses(self, friendly_names, bus_types)
+
+        Adds many buses to the electrical simulation at once, e.g. to build a
+        large network. It is equivalent to calling :func:`add` for each bus,
+        but all buses are validated together.
+
+        :param friendly_names: the N names of the new buses
+        :type friendly_names: list of str
+        :param bus_types: the N types of the new buses, either
+            ``ElectricalBus.Type.PV_BUS`` or ``ElectricalBus.Type.PQ_BUS``
+        :type bus_types: list of :class:`.ElectricalBus.Type`
+        :return: the N new buses, with consecutive ids
+        :rtype: list of :class:`.ElectricalBus`
+        """
+        friendly_names = list(friendly_names)
+        bus_types = list(bus_types)
+        if len(bus_types) != len(friendly_names):
+            raise RuntimeError('One type has to be given per bus.')
+        self._check_new_names(friendly_names, self._busDict, 'Bus')
+        if 'Slack Bus' in friendly_names:
+            raise RuntimeError(
+                'Slack Bus is an invalid name for a non-slack bus.')
+        bus_classes = {ElectricalBus.Type.PV_BUS: ElectricalPVBus,
+                       ElectricalBus.Type.PQ_BUS: ElectricalPQBus}
+        if not set(bus_types).issubset(bus_classes):
+            raise RuntimeError('Only PV and PQ buses can be added.')
+
+        buses = []
+        for friendly_name, bus_type in zip(friendly_names, bus_types):
+            bus = bus_classes[bus_type](friendly_name)
+            bus.id = len(self._buses)
+            bus._values = self._bus_values
+            self._buses.append(bus)
+            self._busDict[friendly_name] = bus
+            buses.append(bus)
+        if len(buses) > 0:
+            self._hasChanges = True
+        return buses
+
+    def connect_many(self, friendly_names, from_bus_ids, to_bus_ids, X,
+                     R=None, B=None, k_factor=None):
+        """
+        connect_many(self, friendly_names, from_bus_ids, to_bus_ids, X, R=None, B=None, k_factor=None)
+
+        Connects many branches at once, e.g. to build a large network. It is
+        equivalent to calling :func:`connect` for each branch with an
+        :class:`.ElectricalTransmissionLine` of length 1 m, or with an
+        :class:`.ElectricalGenTransformer` if its K-factor is not 1, but all
+        branches are validated together. The two-port of each branch has the
+        name of the branch, it is only created when
+        :attr:`.ElectricalNetworkBranch.two_port` is read, the load flow
+        computations use the given parameters directly.
+
+        :param friendly_names: the M names of the new branches
+        :type friendly_names: list of str
+        :param from_bus_ids: the M ids of the buses the branches start from
+        :type from_bus_ids: 1-dimensional numpy array of int
+        :param to_bus_ids: the M ids of the buses the branches go to
+        :type to_bus_ids: 1-dimensional numpy array of int
+        :param X: the M branch reactances, in ohm
+        :type X: 1-dimensional numpy array of float
+        :param R: the M branch resistances, in ohm, default to 0
+        :type R: 1-dimensional numpy array of float
+        :param B: the M line chargings, in siemens, default to 0, ignored for
+            transformers
+        :type B: 1-dimensional numpy array of float
+        :param k_factor: the M transformer K-factors, default to 1
+        :type k_factor: 1-dimensional numpy array of complex
+        :return: the M new branches, with consecutive ids
+        :rtype: list of :class:`.ElectricalNetworkBranch`
+        """
+        friendly_names = list(friendly_names)
+        M = len(friendly_names)
+        from_bus_ids = self._check_bus_ids(from_bus_ids, 'from bus ID')
+        to_bus_ids = self._check_bus_ids(to_bus_ids, 'to bus ID')
+        X = np.asarray(X, dtype=float)
+        R = np.zeros(M) if R is None else np.asarray(R, dtype=float)
+        B = np.zeros(M) if B is None else np.asarray(B, dtype=float)
+        k_factor = np.ones(M, dtype=complex) if k_factor is None \
+            else np.asarray(k_factor, dtype=complex)
+        for values in (from_bus_ids, to_bus_ids, X, R, B, k_factor):
+            if values.shape != (M,):
+                raise RuntimeError('One value has to be given per branch.')
+        if not all(isinstance(name, str) for name in friendly_names):
+            raise TypeError('Branch friendly names have to be str.')
+        self._check_new_names(friendly_names, self._branchDict, 'branch')
+        if np.any(X <= 0):
+            raise RuntimeError('Line reactance X cannot be negative or null')
+        if np.any(R < 0):
+            raise RuntimeError('Line resistance R can not be negative number')
+        if np.any(B < 0):
+            raise RuntimeError('Line charging B can not be negative number')
+        if np.any(k_factor == 0):
+            raise RuntimeError(
+                'Transformer or phase shifter K-factor can not be null')
+
+        # branches keep their parameters, their two-ports are only created
+        # when asked for
+        B = np.where(k_factor == 1, B, 0.)
+        branches = []
+        for parameters in zip(friendly_names, from_bus_ids.tolist(),
+                              to_bus_ids.tolist(), R.tolist(), X.tolist(),
+                              B.tolist(), k_factor.tolist()):
+            friendly_name = parameters[0]
+            branch = ElectricalNetworkBranch._from_parameters(*parameters)
+            branch.id = len(self._branches)
+            branch._values = self._branch_values
+            self._branches.append(branch)
+            self._branchDict[friendly_name] = branch
+            branches.append(branch)
+        return branches
+
+    def attach_many(self, bus_ids, elements):
+        """
+        attach_many(self, bus_ids, elements)
+
+        Attaches many elements at once, e.g. to build a large network. It is
+        equivalent to calling :func:`attach` for each element, but all
+        elements are validated together.
+
+        :param bus_ids: the L ids of the buses the elements have to be
+            attached to
+        :type bus_ids: 1-dimensional numpy array of int
+        :param elements: the L elements
+        :type elements: list of :class:`.AbstractElectricalCPSElement`
+        """
+        elements = list(elements)
+        bus_ids = self._check_bus_ids(bus_ids, 'bus ID')
+        if bus_ids.shape != (len(elements),):
+            raise RuntimeError('One bus has to be given per element.')
+        if np.any(bus_ids == 0):
+            raise RuntimeError('No element can be attached to slack bus')
+        for element in elements:
+            if not isinstance(element, AbstractElectricalCPSElement):
+                raise TypeError('Only electrical CPS elements can be '
+                                'attached to buses.')
+        new_elements = [element for element in elements
+                        if self._cps_elementDict.get(element.friendly_name)
+                        is not element]
+        if any(element._group is not None for element in new_elements):
+            raise RuntimeError(
+                'Elements of a group have to be added with add_group.')
+        self._check_new_names([element.friendly_name
+                               for element in new_elements],
+                              self._cps_elementDict,
+                              'electrical CPS element')
+
+        for element in new_elements:
+            element.id = len(self._cps_elements)
+            self._cps_elements.append(element)
+            self._single_cps_elements.append(element)
+            self._cps_elementDict[element.friendly_name] = element
+            self._seed_element(element)
+        for element, bus_id in zip(elements, bus_ids):
+            self._cps_elementBusMap[element.id] = int(bus_id)
+            # element inherits bus position
+            element.position = self._buses[bus_id].position
+        self._hasElementChanges = True
+
+    @accepts((1, AbstractElectricalCPSElementGroup))
+    def add_group(self, group):
+        """
+        add_group(self, group)
+
+        Adds the elements of the given group to the simulation. The elements
+        are then attached to buses as any other element, e.g. with
+        :func:`attach_many`, and are found by
+        :func:`gridsim.simulation.Simulator.find`, but their energies are
+        computed by the group at once instead of one by one.
+
+        :param group: the group of elements
+        :type group: :class:`.AbstractElectricalCPSElementGroup`
+        :return: the group
+        :rtype: :class:`.AbstractElectricalCPSElementGroup`
+        """
+        elements = group.elements
+        if any(element.id is not None for element in elements):
+            raise RuntimeError('The group has already been added.')
+        self._check_new_names([element.friendly_name for element in elements],
+                              self._cps_elementDict,
+                              'electrical CPS element')
+
+        first_id = len(self._cps_elements)
+        for element in elements:
+            element.id = len(self._cps_elements)
+            self._cps_elements.append(element)
+            self._cps_elementDict[element.friendly_name] = element
+        self._cps_element_groups.append(
+            (group, np.arange(first_id, len(self._cps_elements))))
+        self._seed_group(group)
+        return group
+
+    def _seed_element(self, element):
+        # gives a stochastic element its own stream
+        if element._STOCHASTIC:
+            element.random_state = \
+                self._random_streams.stream(element.friendly_name)
+
+    def _seed_group(self, group):
+        # the stream of a group is keyed by its first element, the key can
+        # not be the friendly name of an element; elements of the group, which
+        # can be computed alone, have their own streams
+        if group._STOCHASTIC and len(group.elements) > 0:
+            group.random_state = self._random_streams.stream(
+                '\0' + group.elements[0].friendly_name)
+            for element in group.elements:
+                self._seed_element(element)
+
+    @staticmethod
+    def _draw_streams():
+        # streams with a seed drawn from the global generator
+        return RandomStreams(int(np.random.randint(0, 2 ** 31 - 1)))
+
+    def _seed_elements(self):
+        # restarts the streams of all stochastic elements and groups
+        for element in self._single_cps_elements:
+            self._seed_element(element)
+        for group, ids in self._cps_element_groups:
+            self._seed_group(group)
+
     # AbstractSimulationModule implementation.
 
     @returns(str)
@@ -334,6 +1081,19 @@ class ElectricalSimulator(AbstractSimulationModule):
         elements.extend(self._cps_elements)
         return elements
 
+    def close(self):
+        """
+        close(self)
+
+        Stops the threads solving the islands of the network in parallel, see
+        :attr:`workers`, and waits for them to end. They are started again at
+        the next step that needs them.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
     def reset(self):
         """
         reset(self)
@@ -348,6 +1108,56 @@ class ElectricalSimulator(AbstractSimulationModule):
             element.reset()
         for element in self._cps_elements:
             element.reset()
+        for group, ids in self._cps_element_groups:
+            group.reset()
+        if not self._has_seed:
+            self._random_streams = self._draw_streams()
+        self._seed_elements()
+        # buses and branches are bound to new empty arrays until the next load
+        # flow computation
+        self._bus_values = _BusElectricalValues()
+        self._branch_values = _BranchElectricalValues()
+        for element in self._buses:
+            element._values = self._bus_values
+        for element in self._branches:
+            element._values = self._branch_values
+        # network objects do not hold the last solution any more
+        self._last_injections = None
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._load_flow_statistics = LoadFlowRunStatistics()
+        self._step_count = 0
+        self._overloads = []
+        self._linear_steps = 0
+
+    def _use_sensitivities(self, calculator, P, previous_injections):
+        # tells whether the solution can be approximated from the sensitivities
+        # of the last full solve, i.e. whether bus powers have changed by less
+        # than the threshold since the last step
+        return self._sensitivity_threshold is not None \
+            and isinstance(calculator, AbstractIterativeLoadFlowCalculator) \
+            and calculator.linearized and previous_injections is not None \
+            and np.max(np.abs(P - previous_injections)) <= \
+            self._sensitivity_threshold
+
+    def _monitor_branches(self):
+        # branch currents from the bus voltages of the load flow, with the
+        # admittances scaled as by the load flow calculator, and losses from
+        # the branch power flows
+        y_sc = self.v_base * self.v_base / self.s_base
+        self._branch_values.I = branch_currents(self._bu.V, self._bu.Th,
+                                                self._b, y_sc * self._Yb)
+        self._branch_values.Ploss = self._br.Pij + self._br.Pji
+
+    def _record_overloads(self, step):
+        # keeps the branches loaded above the threshold, if any
+        if self._branch_ratings is None or self._branch_values.I is None:
+            return
+        M = len(self._branch_ratings)
+        loadings = 100. * self._branch_values.I[:M] / self._branch_ratings
+        ids = np.flatnonzero(loadings > self._overload_threshold)
+        if len(ids) > 0:
+            self._overloads.append((step, ids, loadings[ids]))
 
     def _has_orphans(self):
         # TODO: check that all element are attached to a bus and that all buses
@@ -357,61 +1167,465 @@ class ElectricalSimulator(AbstractSimulationModule):
                 return False
         return True
 
-    def _prepare_matrices(self):
+    def _branch_admittances(self, branches):
+        # gather branch ends and two-port parameters into arrays in one pass,
+        # then build Mx2 table with from_bus and to_bus id of each branch and
+        # table Yb of branch admittances
+        M = len(branches)
+        b = np.empty((M, 2), dtype=int)
+        parameters = []
+        for branch in branches:
+            two_port = branch._two_port
+            if branch._parameters is not None:
+                # branch created by connect_many, maybe without two-port
+                parameters.append((branch.from_bus_id, branch.to_bus_id) +
+                                  branch._parameters)
+            elif isinstance(two_port, ElectricalTransmissionLine):
+                parameters.append((branch.from_bus_id, branch.to_bus_id,
+                                   two_port.R, two_port.X, two_port.B, 1.))
+            elif isinstance(two_port, ElectricalGenTransformer):
+                parameters.append((branch.from_bus_id, branch.to_bus_id,
+                                   two_port.R, two_port.X, 0.,
+                                   two_port.k_factor))
+            else:
+                # other two-ports do not take part in the load flow
+                parameters.append((branch.from_bus_id, branch.to_bus_id,
+                                   float('inf'), 0., 0., 1.))
+        parameters = np.array(parameters, dtype=complex).reshape(M, 6)
+        b[:, :] = parameters[:, 0:2].real
+        R = parameters[:, 2].real
+        X = parameters[:, 3].real
+        B = parameters[:, 4].real
+        k_factor = parameters[:, 5]
+
+        # pi model of transmission lines (k_factor = 1) and transformers
+        # (B = 0)
+        Y_line = 1. / (R + 1j * X)
+        Yb = np.empty((M, 4), dtype=complex)
+        Yb[:, 0] = Y_line + 1j * B / 2
+        Yb[:, 1] = Y_line / k_factor
+        Yb[:, 2] = Y_line / np.abs(k_factor) ** 2 + 1j * B / 2
+        Yb[:, 3] = Y_line / np.conj(k_factor)
+        return b, Yb
+
+    def _prepare_injections(self):
 
         L = len(self._cps_elements)  # number of element
-        M = len(self._branches)  # number of branches
         N = len(self._buses)  # number of buses
 
         # build matrix A to aggregate element power to buses power,
-        # as sparse matrix
-        self._mat_A = lil_matrix((N, L))
-        for i_el in range(0, L):
-            self._mat_A[self._cps_elementBusMap[i_el], i_el] = 1.0
-        # change sparse matrix representation
-        self._mat_A = self._mat_A.tocsr()
+        # as sparse matrix, detached elements have an empty column
+        n_attached = len(self._cps_elementBusMap)
+        elements = np.fromiter(self._cps_elementBusMap.iterkeys(), dtype=int,
+                               count=n_attached)
+        buses = np.fromiter(self._cps_elementBusMap.itervalues(), dtype=int,
+                            count=n_attached)
+        self._mat_A = csr_matrix(
+            (np.ones(len(elements)), (buses, elements)), shape=(N, L))
+
+        # active power of electrical CPS element
+        self._Pe = np.zeros(L)
+
+    def _prepare_matrices(self):
+
+        N = len(self._buses)  # number of buses
+
+        self._prepare_injections()
 
         # build boolean vector specifying among the buses (except slack) which
         # one is a PV bus
-        self._is_PV = np.empty(N, dtype=bool)
-        for i_bus in range(0, len(self._buses)):
-            self._is_PV[i_bus] = self._buses[i_bus] == ElectricalBus.Type.PV_BUS
-
-        # build Mx2 table with from_bus and to_bus id of each branch
-        self._b = np.empty((M, 2), dtype=int)
-        for i_branch in range(0, len(self._branches)):
-            self._b[i_branch, 0] = self._branches[i_branch].from_bus_id
-            self._b[i_branch, 1] = self._branches[i_branch].to_bus_id
-
-        # build table Yb of branch admittances
-        self._Yb = np.zeros((M, 4), dtype=complex)
-        # start with the off-diagonal element
-        for i_branch in range(0, M):
-            branch = self._branches[i_branch]
-            if isinstance(branch._two_port, ElectricalTransmissionLine):
-                tline = branch._two_port
-                Y_line = 1. / (tline.R + 1j * tline.X)
-                self._Yb[i_branch, 0] = Y_line + 1j * tline.B / 2
-                self._Yb[i_branch, 1] = Y_line
-                self._Yb[i_branch, 2] = Y_line + 1j * tline.B / 2
-                self._Yb[i_branch, 3] = Y_line
-            elif isinstance(branch._two_port, ElectricalGenTransformer):
-                tap = branch._two_port
-                Y_line = 1. / (tap.R + 1j * tap.X)
-                self._Yb[i_branch, 0] = Y_line
-                self._Yb[i_branch, 1] = Y_line / tap.k_factor
-                self._Yb[i_branch, 2] = Y_line / (abs(tap.k_factor) ** 2)
-                self._Yb[i_branch, 3] = Y_line / tap.k_factor.conjugate()
+        self._is_PV = np.fromiter(
+            (bus.type == ElectricalBus.Type.PV_BUS for bus in self._buses),
+            dtype=bool, count=N)
 
-        # active power of electrical CPS element
-        self._Pe = np.zeros(L)
+        self._b, self._Yb = self._branch_admittances(self._branches)
+
+        # no load flow solution for this network yet
+        self._last_injections = None
 
         # bus electrical values
         self._bu.P = np.zeros(N)
         self._bu.Q = np.zeros(N)
-        self._bu.V = np.zeros(N)
+        # voltage amplitudes of slack and PV buses are given to the load flow,
+        # they are set to the base voltage
+        self._bu.V = np.ones(N) * self.v_base
         self._bu.Th = np.zeros(N)
 
+    def _update_calculator(self, calculator, is_PV, b, Yb):
+        # updates the calculator with the given network, through the compiled
+        # network cache if any
+        if self._compile_cache is None:
+            calculator.update(self.s_base, self.v_base, is_PV, b, Yb)
+        else:
+            self._compile_cache.update(calculator, self.s_base, self.v_base,
+                                       is_PV, b, Yb)
+
+    def _kron_reduce(self):
+        # eliminates the PQ buses without attached element from the network,
+        # made of a single island, returns the reduction or None if there is
+        # no bus to eliminate
+        if not isinstance(self.load_flow_calculator,
+                          AbstractIterativeLoadFlowCalculator):
+            raise RuntimeError('The Kron reduction requires an '
+                               'AbstractIterativeLoadFlowCalculator.')
+        N = len(self._buses)  # number of buses
+        has_elements = np.zeros(N, dtype=bool)
+        has_elements[np.fromiter(self._cps_elementBusMap.itervalues(),
+                                 dtype=int,
+                                 count=len(self._cps_elementBusMap))] = True
+        is_eliminated = ~(self._is_PV | has_elements)
+        is_eliminated[0] = False
+        eliminated = np.flatnonzero(is_eliminated)
+        kept = np.flatnonzero(~is_eliminated)
+        if len(eliminated) == 0 or len(kept) == 1:
+            return None
+
+        # Y_red = Y_kk - Y_ke * Y_ee^-1 * Y_ek, where Y_ee is block diagonal
+        # with one block per group of joined eliminated buses, the correction
+        # of a group only involves the kept buses joined to it
+        Y = admittance_matrix(self._b, self._Yb, N)
+        Y_k = Y[kept, :]
+        Y_e = Y[eliminated, :]
+        Y_ek = Y_e[:, kept].tocsr()
+        Y_ke = Y_k[:, eliminated].tocsc()
+        Y_ee = Y_e[:, eliminated].tocsr()
+        reduction = _KronReduction(kept, eliminated, Y_ek, Y_ee)
+        n_groups, labels = connected_components(
+            csr_matrix((np.ones(Y_ee.nnz), Y_ee.indices, Y_ee.indptr),
+                       shape=Y_ee.shape), directed=False)
+        is_single = np.bincount(labels, minlength=n_groups)[labels] == 1
+        # single eliminated buses, e.g. most cable joints, in one sparse
+        # product
+        singles = np.flatnonzero(is_single)
+        correction = Y_ke[:, singles].dot(
+            diags(1. / Y_ee.diagonal()[singles])).dot(
+            Y_ek[singles, :]).tocoo()
+        rows = [correction.row]
+        cols = [correction.col]
+        data = [correction.data]
+        # larger groups one after the other, with a dense correction of the
+        # size of their boundary
+        grouped = np.flatnonzero(~is_single)
+        grouped = grouped[np.argsort(labels[grouped], kind='mergesort')]
+        for group in np.split(grouped, np.flatnonzero(
+                np.diff(labels[grouped])) + 1):
+            if len(group) == 0:
+                continue
+            Y_gk = Y_ek[group, :]
+            boundary = np.unique(Y_gk.indices)
+            correction = Y_ke[:, group].tocsr()[boundary, :].dot(
+                splu(Y_ee[group, :][:, group].tocsc()).solve(
+                    np.asfortranarray(Y_gk[:, boundary].toarray())))
+            group_rows, group_cols = np.nonzero(correction)
+            rows.append(boundary[group_rows])
+            cols.append(boundary[group_cols])
+            data.append(correction[group_rows, group_cols])
+        Y_red = (Y_k[:, kept] - coo_matrix(
+            (np.concatenate(data),
+             (np.concatenate(rows), np.concatenate(cols))),
+            shape=(len(kept), len(kept)))).tocsr()
+        Y_red.eliminate_zeros()
+
+        # one equivalent branch per pair of joined buses, the diagonal element
+        # of each bus being carried by the first of its branches
+        Y_coo = Y_red.tocoo()
+        is_upper = Y_coo.row < Y_coo.col
+        b = np.column_stack((Y_coo.row[is_upper],
+                             Y_coo.col[is_upper])).astype(int)
+        M = b.shape[0]  # number of equivalent branches
+        Yb = np.zeros((M, 4), dtype=complex)
+        Yb[:, 1] = -Y_coo.data[is_upper]
+        Yb[:, 3] = -np.asarray(Y_red[b[:, 1], b[:, 0]]).ravel()
+        buses, first = np.unique(np.concatenate((b[:, 0], b[:, 1])),
+                                 return_index=True)
+        diagonal = Y_red.diagonal()
+        from_end = first < M
+        Yb[first[from_end], 0] = diagonal[buses[from_end]]
+        Yb[first[~from_end] - M, 2] = diagonal[buses[~from_end]]
+
+        reduction.b = b
+        reduction.Yb = Yb
+        return reduction
+
+    def _expand_reduction(self, bus_values):
+        # bus electrical values of the whole network from those of the reduced
+        # network, the voltages of the eliminated buses being recovered from
+        # the voltages of the kept buses, and power flows of the branches;
+        # the recovery is not delayed until the values are read, since the
+        # branch flows and currents of each step need all voltages
+        reduction = self._reduction
+        N = len(self._buses)  # number of buses
+        [P, Q, V, Th] = [np.zeros(N) for i_value in range(4)]
+        for values, reduced_values in zip((P, Q, V, Th), bus_values):
+            values[reduction.kept] = reduced_values
+        Vc = reduction.recover(V[reduction.kept] *
+                               np.exp(1j * Th[reduction.kept]))
+        V[reduction.eliminated] = np.abs(Vc)
+        Th[reduction.eliminated] = np.angle(Vc)
+        [self._bu.P, self._bu.Q, self._bu.V, self._bu.Th] = [P, Q, V, Th]
+
+        # admittances scaled as by the load flow calculator
+        y_sc = self.v_base * self.v_base / self.s_base
+        [self._br.Pij, self._br.Qij, self._br.Pji, self._br.Qji] = \
+            branch_power_flows(V, Th, self._b, y_sc * self._Yb)
+
+    def _prepare_islands(self):
+
+        N = len(self._buses)  # number of buses
+
+        # find the islands of the network, i.e. the connected components of
+        # the graph of the branches taking part in the load flow
+        is_closed = self._Yb[:, 1] != 0
+        graph = csr_matrix((np.ones(is_closed.sum()),
+                            (self._b[is_closed, 0], self._b[is_closed, 1])),
+                           shape=(N, N))
+        self._island_count, labels = connected_components(graph,
+                                                          directed=False)
+        self._is_dead = np.zeros(N, dtype=bool)
+
+        self._reduction = None
+
+        if self._island_count == 1:
+            self._islands = None
+            if self._kron_reduction:
+                self._reduction = self._kron_reduce()
+            if self._reduction is None:
+                self._update_calculator(self.load_flow_calculator,
+                                        self._is_PV, self._b, self._Yb)
+            else:
+                self._update_calculator(self.load_flow_calculator,
+                                        self._is_PV[self._reduction.kept],
+                                        self._reduction.b, self._reduction.Yb)
+            return
+
+        # group buses and branches by island, a branch between two islands
+        # does not take part in the load flow
+        bus_order = np.argsort(labels, kind='mergesort')
+        bus_groups = np.split(bus_order, np.flatnonzero(
+            np.diff(labels[bus_order])) + 1)
+        branch_labels = labels[self._b[:, 0]]
+        branch_labels[branch_labels != labels[self._b[:, 1]]] = -1
+        branch_order = np.argsort(branch_labels, kind='mergesort')
+        branch_order = branch_order[branch_labels[branch_order] >= 0]
+        branch_starts = np.searchsorted(branch_labels[branch_order],
+                                        np.arange(self._island_count + 1))
+
+        local_ids = np.empty(N, dtype=int)
+        self._islands = []
+        for buses in bus_groups:
+            label = labels[buses[0]]
+            # the reference bus of the island is the slack bus, or its first
+            # PV bus if the island has no slack bus
+            if label == labels[0]:
+                reference = 0
+            else:
+                pv_buses = buses[self._is_PV[buses]]
+                if len(pv_buses) == 0:
+                    self._is_dead[buses] = True
+                    continue
+                reference = pv_buses[0]
+            buses = np.concatenate(([reference], buses[buses != reference]))
+            branches = branch_order[branch_starts[label]:
+                                    branch_starts[label + 1]]
+
+            calculator = None
+            if len(branches) > 0:
+                local_ids[buses] = np.arange(len(buses))
+                is_PV = self._is_PV[buses]
+                is_PV[0] = False
+                # the calculator keeps the settings of the simulator one
+                calculator = copy.copy(self.load_flow_calculator)
+                self._update_calculator(calculator, is_PV,
+                                        local_ids[self._b[branches]],
+                                        self._Yb[branches])
+            self._islands.append(_ElectricalIsland(buses, branches,
+                                                   calculator))
+
+        if self._is_dead.any():
+            warnings.warn('%d buses are not connected to the slack bus nor '
+                          'to a PV bus and are not energized.'
+                          % self._is_dead.sum())
+
+    def _compile(self):
+        # brings the network description and the load flow calculator up to
+        # date with the changes made since the last simulation step
+        n_branches = 0 if self._b is None else self._b.shape[0]
+        is_split = self._islands is not None or self._reduction is not None
+        if self._hasChanges or (is_split and
+                                n_branches < len(self._branches)) or \
+                (self._kron_reduction and self._hasElementChanges):
+            # connected branches may join islands or reduced buses and
+            # attached or detached elements change the zero-injection buses,
+            # the whole network is computed again
+            self._prepare_matrices()
+            self._prepare_islands()
+            self._hasChanges = False
+            self._hasElementChanges = False
+            return
+
+        if n_branches < len(self._branches):
+            # connected branches do not change the number of buses, they are
+            # added to the existing network description
+            b, Yb = self._branch_admittances(self._branches[n_branches:])
+            self.load_flow_calculator.add_branches(b, Yb)
+            self._b = np.vstack((self._b, b))
+            self._Yb = np.vstack((self._Yb, Yb))
+            self._last_injections = None
+
+        if self._hasElementChanges:
+            self._prepare_injections()
+            self._hasElementChanges = False
+
+    def _add_statistics(self, calculator):
+        # calculators that are not part of gridsim may not record statistics
+        if calculator.statistics is not None:
+            self._load_flow_statistics.add(calculator.statistics)
+
+    def _calculate(self, calculator, P, Q, V, Th):
+        # solves the load flow with the given calculator, the statistics of
+        # the solve are recorded even if it does not converge
+        previous_statistics = calculator.statistics
+        try:
+            return calculator.calculate(P, Q, V, Th, True)
+        finally:
+            if calculator.statistics is not previous_statistics:
+                self._add_statistics(calculator)
+
+    def _calculate_island(self, island):
+        # solves the load flow of the given island, returns its bus and branch
+        # electrical values
+        buses = island.buses
+        if island.calculator is None:
+            # a single bus, the reference bus balances its own power
+            return [np.zeros(1), np.zeros(1), self._bu.V[buses],
+                    np.zeros(1)], (None, None, None, None)
+        try:
+            bus_values = island.calculator.calculate(
+                self._bu.P[buses], self._bu.Q[buses], self._bu.V[buses],
+                self._bu.Th[buses], True)
+        except RuntimeError as error:
+            # raised once the statistics of all islands are recorded
+            return error
+        return bus_values, island.calculator.get_branch_power_flows(True)
+
+    def _calculate_islands(self):
+        # solves the load flow of each island, in parallel if several workers
+        # are allowed, and gathers the results into the network arrays
+        if self._workers > 1 and len(self._islands) > 1:
+            if self._pool is None:
+                self._pool = ThreadPool(self._workers)
+            results = self._pool.map(self._calculate_island, self._islands)
+        else:
+            results = [self._calculate_island(island)
+                       for island in self._islands]
+
+        # the statistics of all islands are recorded by this thread
+        for island in self._islands:
+            if island.calculator is not None:
+                self._add_statistics(island.calculator)
+        for result in results:
+            if isinstance(result, RuntimeError):
+                raise result
+
+        bus_values = [self._bu.P.copy(), self._bu.Q.copy(), self._bu.V.copy(),
+                      self._bu.Th.copy()]
+        for values in bus_values:
+            values[self._is_dead] = 0.
+        M = len(self._branches)
+        branch_values = [np.zeros(M), np.zeros(M), np.zeros(M), np.zeros(M)]
+        for island, (island_bus_values, island_branch_values) in \
+                zip(self._islands, results):
+            for values, island_values in zip(bus_values, island_bus_values):
+                values[island.buses] = island_values
+            for i_value, island_values in enumerate(island_branch_values):
+                if island_values is None:
+                    if island.calculator is not None:
+                        # the calculator does not compute this value
+                        branch_values[i_value] = None
+                elif branch_values[i_value] is not None:
+                    branch_values[i_value][island.branches] = island_values
+
+        [self._bu.P, self._bu.Q, self._bu.V, self._bu.Th] = bus_values
+        [self._br.Pij, self._br.Qij, self._br.Pji, self._br.Qji] = \
+            branch_values
+
+    @accepts((2, (int, float)))
+    def element_powers(self, times, delta_time):
+        """
+        element_powers(self, times, delta_time)
+
+        Computes the power of each :class:`.AbstractElectricalCPSElement` of
+        this electrical simulator at each of the given times, e.g. to read the
+        profiles of :class:`.TimeSeriesElectricalCPSElement` for
+        :func:`calculate_horizon`. Each element is reset afterwards, and the
+        streams of the stochastic elements are restarted.
+
+        :param times: the T start times of the simulation steps
+        :type times: iterable of int or float in second
+        :param delta_time: the duration of each simulation step
+        :type delta_time: int or float in second
+        :return: LxT table of element powers, where L is the number of
+            elements, in the order of their ids; positive powers are consumed
+        :rtype: 2-dimensional numpy array of float
+        """
+        times = list(times)
+        powers = np.zeros((len(self._cps_elements), len(times)))
+        scale_factor = 1. / delta_time
+        for element in self._cps_elements:
+            for i_time, time in enumerate(times):
+                element.calculate(time, delta_time)
+                powers[element.id, i_time] = \
+                    scale_factor * element._internal_delta_energy
+            element.reset()
+        self._seed_elements()
+        return powers
+
+    def calculate_horizon(self, element_powers):
+        """
+        calculate_horizon(self, element_powers)
+
+        Computes the load flow of T time steps in one call, when the load flow
+        calculator is a :class:`.DirectLoadFlowCalculator`. Element powers are
+        aggregated into bus powers and all time steps are solved with
+        :func:`.DirectLoadFlowCalculator.calculate_horizon`. Network objects
+        are not modified.
+
+        :param element_powers: LxT table of element powers, where L is the
+            number of elements and T the number of time steps, as returned by
+            :func:`element_powers`
+        :type element_powers: 2-dimensional numpy array of float
+        :return: [P, Th, Pij], i.e. the NxT tables of bus active powers and
+            voltage angles and the MxT table of branch active powers, where N
+            is the number of buses including slack and M the number of branches
+        :rtype: a list of 3 2-dimensional numpy arrays of float
+
+        :raise TypeError: if the load flow calculator is not a
+            :class:`.DirectLoadFlowCalculator`
+        :raise RuntimeError: if the network has several islands
+        """
+        if not isinstance(self.load_flow_calculator,
+                          DirectLoadFlowCalculator):
+            raise TypeError('calculate_horizon requires a '
+                            'DirectLoadFlowCalculator.')
+        if len(self._buses) <= 1 or len(self._branches) == 0:
+            raise RuntimeError('The network has no branch.')
+
+        self._compile()
+        if self._islands is not None:
+            raise RuntimeError('calculate_horizon requires a network without '
+                               'islands.')
+
+        element_powers = np.asarray(element_powers, dtype=float)
+        if len(element_powers.shape) != 2 \
+                or element_powers.shape[0] != len(self._cps_elements):
+            raise RuntimeError('element powers have to be a two-dimensional '
+                               'array with one row per element.')
+
+        # compute table of bus powers
+        P = -np.asarray(self._mat_A.dot(element_powers), dtype=float)
+
+        return self.load_flow_calculator.calculate_horizon(P, True)
+
     @accepts(((1, 2), (int, float)))
     def calculate(self, time, delta_time):
         """
@@ -429,8 +1643,10 @@ class ElectricalSimulator(AbstractSimulationModule):
         :type delta_time: int or float in second
         """
 
-        for element in self._cps_elements:
+        for element in self._single_cps_elements:
             element.calculate(time, delta_time)
+        for group, ids in self._cps_element_groups:
+            group.calculate(time, delta_time)
 
     @accepts(((1, 2), (int, float)))
     def update(self, time, delta_time):
@@ -442,6 +1658,34 @@ class ElectricalSimulator(AbstractSimulationModule):
         calculate the load flow with
         :class:`.AbstractElectricalLoadFlowCalculator`.
 
+        If the network has not changed and no bus active power differs from
+        its value at the last load flow computation by more than
+        ``injection_atol + injection_rtol * abs(value)``, the load flow is not
+        computed and buses and branches keep their values.
+
+        If the network is split into several islands, the load flow of each
+        island is computed separately with a copy of the load flow
+        calculator, by :attr:`workers` threads. The reference bus of an island
+        is the slack bus, or its first :class:`.ElectricalPVBus` if it has no
+        slack bus. Islands with neither slack bus nor PV bus are not computed,
+        see :attr:`dead_buses`.
+
+        With a :attr:`sensitivity_threshold`, the Jacobian matrix of each full
+        solve of an :class:`.AbstractIterativeLoadFlowCalculator` is
+        factorized. When no bus active power has changed by more than the
+        threshold since the previous step, bus voltages are then updated
+        linearly from the solution of the last full solve with these voltage
+        sensitivities, see
+        :func:`.AbstractIterativeLoadFlowCalculator.calculate_linear`. The
+        linearization error grows as the bus powers move away from those of
+        the last full solve. A full solve is done as soon as the residual
+        error of the approximation exceeds :attr:`sensitivity_tolerance`.
+
+        The current amplitude ``I`` and the active losses ``Ploss`` of each
+        branch are computed from the results of the load flow. Branches
+        loaded above their :attr:`branch_ratings` are kept as overload events
+        of the step, see :func:`overload_events`.
+
         :param time: The actual simulation time.
         :type time: int or float in second
 
@@ -451,67 +1695,94 @@ class ElectricalSimulator(AbstractSimulationModule):
         """
 
 
-        if self.load_flow_calculator is not None and self._hasChanges and len(self._buses) > 1 \
+        if self.load_flow_calculator is not None and len(self._buses) > 1 \
                 and len(self._branches) > 0:
             # TODO: raise warning if self._as_orphans():
-            self._prepare_matrices()
-            self.load_flow_calculator.update(self.s_base, self.v_base,
-                                             self._is_PV, self._b, self._Yb)
-
-            self._hasChanges = False
+            self._compile()
 
-        for element in self._cps_elements:
+        for element in self._single_cps_elements:
             element.update(time, delta_time)
+        for group, ids in self._cps_element_groups:
+            group.update(time, delta_time)
+
+        step = self._step_count
+        self._step_count += 1
 
         if self.load_flow_calculator is not None and len(self._buses) > 1 and len(self._branches) > 0:
             # put element powers into corresponding array
             # ----------------------------------------------------
             scale_factor = 1 / delta_time
-            for element in self._cps_elements:
+            for element in self._single_cps_elements:
                 self._Pe[element.id] = scale_factor * element.delta_energy
+            for group, ids in self._cps_element_groups:
+                self._Pe[ids] = scale_factor * group.delta_energy
 
             # compute vector of bus powers
             # -----------------------------
-            self._bu.P = -self._mat_A.dot(self._Pe)
+            P = -self._mat_A.dot(self._Pe)
+
+            # reuse last solution if bus powers have not changed
+            # ---------------------------------------------------
+            if self._last_injections is not None and np.all(
+                    np.abs(P - self._last_injections) <=
+                    self._injection_atol +
+                    self._injection_rtol * np.abs(self._last_injections)):
+                self._cache_hits += 1
+                # branches are still loaded as at the last computation
+                self._record_overloads(step)
+                return
+            self._cache_misses += 1
+            previous_injections = self._last_injections
+            self._last_injections = P
+            self._bu.P = P.copy()
 
             # perform network computations
             #------------------------------
-            [self._bu.P, self._bu.Q, self._bu.V, self._bu.Th] = \
-                self.load_flow_calculator.calculate(self._bu.P, self._bu.Q,
-                                                    self._bu.V, self._bu.Th,
-                                                    True)
-
-            [self._br.Pij, self._br.Qij, self._br.Pji, self._br.Qji] = \
-                self.load_flow_calculator.get_branch_power_flows(True)
-
-            # put network computation results into network objects
-            #-----------------------------------------------------
-            for i_bus in range(1, len(self._buses)):
-                self._buses[i_bus].Th = self._bu.Th[i_bus]
-                self._buses[i_bus].P = self._bu.P[i_bus]
-                if self._is_PV[i_bus]:
-                    self._buses[i_bus].Q = self._bu.Q[i_bus]
-                else:  # is PQ
-                    self._buses[i_bus].V = self._bu.V[i_bus]
-            # slack
-            self._buses[0].P = self._bu.P[0]
-            self._buses[0].Q = self._bu.Q[0]
-            self._buses[0].Th = 0
-
-            for i_branch in range(0, len(self._branches)):
-                if not self._br.Pij is None:
-                    self._branches[i_branch].Pij = self._br.Pij[i_branch]
-                else:
-                    self._branches[i_branch].Pij = None
-                if not self._br.Qij is None:
-                    self._branches[i_branch].Qij = self._br.Qij[i_branch]
-                else:
-                    self._branches[i_branch].Qij = None
-                if not self._br.Pji is None:
-                    self._branches[i_branch].Pji = self._br.Pji[i_branch]
+            if self._islands is not None:
+                self._calculate_islands()
+            else:
+                calculator = self.load_flow_calculator
+                bus_values = [self._bu.P, self._bu.Q, self._bu.V, self._bu.Th]
+                if self._reduction is not None:
+                    # the calculator solves the reduced network
+                    bus_values = [values[self._reduction.kept]
+                                  for values in bus_values]
+                result = None
+                if self._use_sensitivities(calculator, P,
+                                           previous_injections):
+                    result = calculator.calculate_linear(
+                        bus_values[0], bus_values[1], bus_values[2],
+                        bus_values[3], True, self._sensitivity_tolerance)
+                if result is not None:
+                    self._linear_steps += 1
+                    self._add_statistics(calculator)
                 else:
-                    self._branches[i_branch].Pji = None
-                if not self._br.Qji is None:
-                    self._branches[i_branch].Qji = self._br.Qji[i_branch]
+                    result = self._calculate(calculator, *bus_values)
+                    if self._sensitivity_threshold is not None and \
+                            isinstance(calculator,
+                                       AbstractIterativeLoadFlowCalculator):
+                        calculator.linearize()
+
+                if self._reduction is not None:
+                    self._expand_reduction(result)
                 else:
-                    self._branches[i_branch].Qji = None
+                    [self._bu.P, self._bu.Q, self._bu.V, self._bu.Th] = result
+                    [self._br.Pij, self._br.Qij, self._br.Pji,
+                     self._br.Qji] = calculator.get_branch_power_flows(True)
+
+            # network objects read their values from the result arrays
+            #----------------------------------------------------------
+            self._bus_values.P = self._bu.P
+            self._bus_values.Q = self._bu.Q
+            self._bus_values.V = self._bu.V
+            self._bus_values.Th = self._bu.Th
+
+            self._branch_values.Pij = self._br.Pij
+            self._branch_values.Qij = self._br.Qij
+            self._branch_values.Pji = self._br.Pji
+            self._branch_values.Qji = self._br.Qji
+
+            # branch currents and losses
+            #----------------------------
+            self._monitor_branches()
+            self._record_overloads(step)
@@ -8,6 +8,9 @@ Gridsim util module. Defines utility classes and functions.
 """
 import types
 import math
+import hashlib
+
+import numpy as np
 
 from .decorators import accepts, returns
 from .unit import units
@@ -100,6 +103,71 @@ class Position(object):
         return 6371000. * 2. * math.atan2(math.sqrt(a), math.sqrt(1. - a))
 
 
+class RandomStreams(object):
+
+    @accepts((1, (type(None), int, long)))
+    def __init__(self, seed=None):
+        """
+        __init__(self, seed=None)
+
+        Provides independent and reproducible streams of random numbers, e.g.
+        one for each stochastic element of a simulation. Each stream is a
+        :class:`numpy.random.RandomState` seeded with the `seed` of this
+        object and the key of the stream, so that the numbers drawn from a
+        stream do not depend on the other streams nor on the order in which
+        streams are requested.
+
+        :param seed: The root seed, between 0 and 2**32 - 1. Defaults to a
+            seed drawn from the entropy of the operating system.
+        :type seed: int
+
+        *Example:*
+        ::
+
+            from gridsim.util import RandomStreams
+
+            streams = RandomStreams(42)
+            print streams.stream('Load 1').normal(0., 1., 3)
+        """
+        super(RandomStreams, self).__init__()
+
+        if seed is None:
+            seed = int(np.random.RandomState().randint(0, 2 ** 31 - 1))
+        if not 0 <= seed < 2 ** 32:
+            raise RuntimeError('The seed has to be between 0 and 2**32 - 1.')
+        self._seed = seed
+
+    @property
+    def seed(self):
+        """
+        The root seed of the streams.
+
+        :rtype: int
+        """
+        return self._seed
+
+    @accepts((1, str))
+    def stream(self, key):
+        """
+        stream(self, key)
+
+        Returns a new random number generator for the stream with the given
+        key. Generators returned for the same key draw the same numbers.
+
+        :param key: The key of the stream, e.g. the friendly name of an
+            element.
+        :type key: str
+
+        :returns: The random number generator of the stream.
+        :rtype: :class:`numpy.random.RandomState`
+        """
+        # the key is hashed into 4 words which, appended to the seed, make the
+        # seed array of the Mersenne Twister
+        digest = np.frombuffer(hashlib.md5(key).digest(), dtype='<u4')
+        return np.random.RandomState(
+            np.concatenate(([self._seed], digest)).astype(np.uint32))
+
+
 ### ALL MATERIALS
 
 
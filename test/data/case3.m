@@ -0,0 +1,35 @@
+function mpc = case3
+% 3-bus example of Hossein Seifi, Mohammad Sadegh Sepasian, Electric Power
+% System Planning: Issues, Algorithms and Solutions, pp. 247-248
+
+%% MATPOWER Case Format : Version 2
+mpc.version = '2';
+
+%%-----  Power Flow Data  -----%%
+%% system MVA base
+mpc.baseMVA = 100;
+
+%% bus data
+%	bus_i	type	Pd	Qd	Gs	Bs	area	Vm	Va	baseKV	zone	Vmax	Vmin
+mpc.bus = [
+	1	3	0	0	0	0	1	1	0	230	1	1.1	0.9;
+	2	2	0	0	0	0	1	1	0	230	1	1.1	0.9;
+	3	1	90	30	0	0	1	1	0	230	1	1.1	0.9;
+];
+
+%% generator data
+%	bus	Pg	Qg	Qmax	Qmin	Vg	mBase	status	Pmax	Pmin
+mpc.gen = [
+	1	0	0	300	-300	1	100	1	250	10;
+	2	53	0	300	-300	1	100	1	300	10;
+	3	20	0	300	-300	1	100	0	300	10;
+];
+
+%% branch data
+%	fbus	tbus	r	x	b	rateA	rateB	rateC	ratio	angle	status	angmin	angmax
+mpc.branch = [
+	1	2	0	0.0576	0	250	250	250	0	0	1	-360	360;
+	2	3	0	0.092	0	250	250	250	0	0	1	-360	360;
+	1	3	0	0.17	0	250	250	250	0	0	1	-360	360;
+	1	3	0	0.1	0	250	250	250	0	0	0	-360	360;
+];
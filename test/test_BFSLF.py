@@ -0,0 +1,84 @@
+# This program checks that the BackwardForwardSweepLoadFlowCalculator gives the
+# same results as the SparseNewtonRaphsonLoadFlowCalculator on a radial
+# feeder, and that it rejects networks it cannot solve.
+
+import unittest
+import numpy as np
+
+from gridsim.electrical.loadflow import SparseNewtonRaphsonLoadFlowCalculator, \
+    BackwardForwardSweepLoadFlowCalculator
+
+
+def radial_feeder():
+    # 8 buses feeder, with branches given in both directions and a
+    # phase-shifting transformer between bus 0 and bus 1
+    #
+    #   0 --T-- 1 ---- 2 ---- 3 ---- 4
+    #                  |      |
+    #                  5      6 ---- 7
+    is_PV = np.zeros(8, dtype=bool)
+    b = np.array([[0, 1], [2, 1], [2, 3], [4, 3], [2, 5], [3, 6], [7, 6]])
+    Y_T = 1.0/np.array([0.01+1j*0.08, 0.05+1j*0.1, 0.04+1j*0.08,
+                        0.06+1j*0.09, 0.1+1j*0.1, 0.08+1j*0.06,
+                        0.07+1j*0.07])
+    b_L = np.array([0.02, 0.01, 0.01, 0.005, 0.01, 0.])
+    k_T = 0.98*np.exp(1j*0.05)
+    Yb = np.zeros([7, 4], dtype=complex)
+    # transformer
+    Yb[0] = [Y_T[0], Y_T[0]/k_T, Y_T[0]/abs(k_T)**2, Y_T[0]/k_T.conjugate()]
+    # transmission lines
+    Yb[1:, 0] = Y_T[1:]+1j*b_L/2
+    Yb[1:, 1] = Y_T[1:]
+    Yb[1:, 2] = Y_T[1:]+1j*b_L/2
+    Yb[1:, 3] = Y_T[1:]
+
+    P = np.array([0., -0.1, -0.2, -0.15, -0.1, -0.05, -0.1, 0.05])
+    Q = np.array([0., -0.05, -0.1, -0.05, -0.02, -0.02, -0.04, 0.01])
+    V = np.array([1.02, 1., 1., 1., 1., 1., 1., 1.])
+    return is_PV, b, Yb, P, Q, V
+
+
+class TestBFSLF(unittest.TestCase):
+
+    def test_radial(self):
+        is_PV, b, Yb, P, Q, V = radial_feeder()
+        snrlf = SparseNewtonRaphsonLoadFlowCalculator(1., 1., is_PV, b,
+                                                      Yb.copy())
+        [P_ref, Q_ref, V_ref, Th_ref] = [x.copy() for x in snrlf.calculate(
+            P.copy(), Q.copy(), V.copy(), np.zeros(8), True)]
+        flows_ref = snrlf.get_branch_power_flows(True)
+
+        bfslf = BackwardForwardSweepLoadFlowCalculator(1., 1., is_PV, b,
+                                                       Yb.copy())
+        [P, Q, V, Th] = bfslf.calculate(P, Q, V, np.zeros(8), True)
+        flows = bfslf.get_branch_power_flows(True)
+
+        self.assertAlmostEqual(P[0], P_ref[0])
+        self.assertAlmostEqual(Q[0], Q_ref[0])
+        self.assertTrue(np.allclose(V, V_ref))
+        self.assertTrue(np.allclose(Th, Th_ref))
+        for flow, flow_ref in zip(flows, flows_ref):
+            self.assertTrue(np.allclose(flow, flow_ref))
+
+    def test_meshed(self):
+        is_PV, b, Yb, P, Q, V = radial_feeder()
+        b = np.vstack((b, [[4, 7]]))
+        Yb = np.vstack((Yb, Yb[-1:]))
+        self.assertRaises(RuntimeError, BackwardForwardSweepLoadFlowCalculator,
+                          1., 1., is_PV, b, Yb)
+
+    def test_not_connected(self):
+        is_PV, b, Yb, P, Q, V = radial_feeder()
+        # bus 7 is disconnected, buses 4 and 6 are connected twice
+        b[-1] = [4, 6]
+        self.assertRaises(RuntimeError, BackwardForwardSweepLoadFlowCalculator,
+                          1., 1., is_PV, b, Yb)
+
+    def test_PV_bus(self):
+        is_PV, b, Yb, P, Q, V = radial_feeder()
+        is_PV[4] = True
+        self.assertRaises(RuntimeError, BackwardForwardSweepLoadFlowCalculator,
+                          1., 1., is_PV, b, Yb)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -37,6 +37,9 @@
 # 2             2               3           0.092       250
 # 3             1               3           0.17        150
 # -------------------------------------------------------------------
+#
+# test_parallel_branches replaces line 3 by two parallel lines of reactances
+# 0.255 and 0.51 p.u., which carry two thirds and one third of its flow.
 
 import unittest
 import numpy as np
@@ -118,6 +121,23 @@ class TestDLF(unittest.TestCase):
 
         self.assertTrue(np.allclose(Pbr, ref_Pbr))
 
+    def test_parallel_branches(self):
+        is_PV = np.array([False, True, False])
+        b = np.array([[0, 1], [1, 2], [0, 2], [0, 2]])
+        x = np.array([0.0576, 0.092, 0.255, 0.51])
+        Yb = np.tile(1. / (1j * x), (4, 1)).T.copy()
+
+        dlf = DirectLoadFlowCalculator(1., 1., is_PV, b, Yb)
+        P = np.array([float('NaN'), 0.63 - 0.1, -0.9])
+        [P, Q, V, Th] = dlf.calculate(P, np.zeros(3), np.ones(3), np.zeros(3),
+                                      True)
+        self.assertTrue(np.allclose(Th, [0., -0.00254839, -0.05537872]))
+
+        # each parallel branch carries its own flow
+        [Pij, Qij, Pji, Qji] = dlf.get_branch_power_flows(True)
+        ref_Pbr = np.array([0.044243, 0.574243, 0.217171, 0.108586])
+        self.assertTrue(np.allclose(Pij, ref_Pbr))
+
 
 if __name__ == '__main__':
     unittest.main()
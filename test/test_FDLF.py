@@ -0,0 +1,58 @@
+# This program checks that the FastDecoupledLoadFlowCalculator converges to the
+# same solution as the NewtonRaphsonLoadFlowCalculator on the 5-bus and 14-bus
+# reference networks (see Xi-Fan Wang, Yonghua Song, Malcolm Irving, Modern
+# Power Systems Analysis), with both the XB and the BX methods. The 5-bus network
+# is also solved with an open branch and a purely resistive branch added.
+
+import unittest
+import numpy as np
+
+from gridsim.electrical.loadflow import NewtonRaphsonLoadFlowCalculator, \
+    FastDecoupledLoadFlowCalculator
+
+from test_SNRLF import network_5bus, network_14bus
+
+
+class TestFDLF(unittest.TestCase):
+
+    def _compare(self, network, method):
+        is_PV, b, Yb, P, Q, V, Th = network()
+        self._compare_network(is_PV, b, Yb, P, Q, V, Th, method)
+
+    def _compare_network(self, is_PV, b, Yb, P, Q, V, Th, method):
+        nrlf = NewtonRaphsonLoadFlowCalculator(1., 1., is_PV, b, Yb.copy())
+        [P_ref, Q_ref, V_ref, Th_ref] = [x.copy() for x in nrlf.calculate(
+            P.copy(), Q.copy(), V.copy(), Th.copy(), True)]
+
+        fdlf = FastDecoupledLoadFlowCalculator(1., 1., is_PV, b, Yb.copy(),
+                                               method)
+        [P, Q, V, Th] = fdlf.calculate(P, Q, V, Th, True)
+
+        self.assertAlmostEqual(P[0], P_ref[0])
+        self.assertTrue(np.allclose(Q, Q_ref))
+        self.assertTrue(np.allclose(V, V_ref))
+        self.assertTrue(np.allclose(Th, Th_ref))
+
+    def test_5bus_XB(self):
+        self._compare(network_5bus, FastDecoupledLoadFlowCalculator.Method.XB)
+
+    def test_5bus_BX(self):
+        self._compare(network_5bus, FastDecoupledLoadFlowCalculator.Method.BX)
+
+    def test_14bus_XB(self):
+        self._compare(network_14bus, FastDecoupledLoadFlowCalculator.Method.XB)
+
+    def test_14bus_BX(self):
+        self._compare(network_14bus, FastDecoupledLoadFlowCalculator.Method.BX)
+
+    def test_open_and_resistive_branches(self):
+        is_PV, b, Yb, P, Q, V, Th = network_5bus()
+        b = np.vstack((b, [[1, 2], [2, 3]]))
+        Yb = np.vstack((Yb, np.zeros((1, 4)), np.tile(10. + 0j, (1, 4))))
+        for method in FastDecoupledLoadFlowCalculator.Method:
+            self._compare_network(is_PV, b, Yb, P.copy(), Q.copy(), V.copy(),
+                                  Th.copy(), method)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# This program checks that the SparseNewtonRaphsonLoadFlowCalculator gives the
+# same results as the NewtonRaphsonLoadFlowCalculator on the 5-bus and 14-bus
+# reference networks (see Xi-Fan Wang, Yonghua Song, Malcolm Irving, Modern
+# Power Systems Analysis).
+
+import unittest
+import math
+import numpy as np
+
+from gridsim.electrical.loadflow import NewtonRaphsonLoadFlowCalculator, \
+    SparseNewtonRaphsonLoadFlowCalculator
+
+
+def _branch_admittances(b, Y_T, is_transformer, k_T, b_L):
+    is_line = ~is_transformer
+    Yb = np.zeros([b.shape[0], 4], dtype=complex)
+    # transformers
+    Yb[is_transformer, 0] = Y_T[is_transformer]
+    Yb[is_transformer, 1] = Y_T[is_transformer]/k_T
+    Yb[is_transformer, 2] = Y_T[is_transformer]/(abs(k_T)**2)
+    Yb[is_transformer, 3] = Y_T[is_transformer]/k_T.conjugate()
+    # transmission lines
+    Yb[is_line, 0] = Y_T[is_line]+1j*b_L/2
+    Yb[is_line, 1] = Y_T[is_line]
+    Yb[is_line, 2] = Y_T[is_line]+1j*b_L/2
+    Yb[is_line, 3] = Y_T[is_line]
+    return Yb
+
+
+def network_5bus():
+    is_PV = np.array([False, False, False, False, True])
+    b = np.array([[0, 3], [1, 2], [1, 3], [2, 3], [4, 2]])
+    Y_T = np.array([
+        1.0/(1j*0.03),
+        1.0/(0.04+1j*0.25),
+        1.0/(0.1+1j*0.35),
+        1.0/(0.08+1j*0.3),
+        1.0/(1j*0.015)])
+    is_transformer = np.array([True, False, False, False, True])
+    k_T = np.array([1.05+0j, 1.05+0j])
+    b_L = np.array([0.5, 0., 0.5])
+    Yb = _branch_admittances(b, Y_T, is_transformer, k_T, b_L)
+
+    P = np.array([float('NaN'), -1.6, -2.0, -3.7, 5.0])
+    Q = np.array([float('NaN'), -0.8, -1., -1.3, float('NaN')])
+    V = np.array([1.05, float('NaN'), float('NaN'), float('NaN'), 1.05])
+    Th = np.zeros([5])
+    return is_PV, b, Yb, P, Q, V, Th
+
+
+def network_14bus():
+    is_PV = np.array([False, True, True, False, False, True, False, True,
+                      False, False, False, False, False, False])
+    b = np.array([[0, 1], [0, 4], [1, 2], [1, 3], [1, 4], [2, 3], [3, 4],
+                  [3, 6], [3, 8], [4, 5], [5, 10], [5, 11], [5, 12], [6, 7],
+                  [6, 8], [8, 9], [8, 13], [9, 10], [11, 12], [12, 13]])
+    Y_T = 1.0/np.array([
+        0.01938+1j*0.05917, 0.05403+1j*0.22304, 0.04699+1j*0.19797,
+        0.05811+1j*0.17632, 0.05695+1j*0.17388, 0.06701+1j*0.17103,
+        0.01335+1j*0.04211, 0.00000+1j*0.20912, 0.00000+1j*0.55618,
+        0.00000+1j*0.25202, 0.09498+1j*0.19890, 0.12291+1j*0.25581,
+        0.06615+1j*0.13027, 0.00000+1j*0.17615, 0.00000+1j*0.11001,
+        0.03181+1j*0.08450, 0.12711+1j*0.27038, 0.08205+1j*0.19207,
+        0.22092+1j*0.19988, 0.17093+1j*0.34802])
+    is_transformer = np.zeros(20, dtype=bool)
+    is_transformer[[7, 8, 9]] = True
+    k_T = np.array([0.97800+0j, 0.96900+0j, 0.93200+0j])
+    b_L = np.zeros(17)
+    b_L[0:6] = [0.0528, 0.0492, 0.0438, 0.0340, 0.0346, 0.0128]
+    Yb = _branch_admittances(b, Y_T, is_transformer, k_T, b_L)
+
+    P = np.array([2.324, 0.183, -0.942, -0.478, -0.076, -0.112, 0.0, 0.0,
+                  -0.295, -0.090, -0.035, -0.061, -0.135, -0.149])
+    Q = np.array([0.0, 0.0, 0.0, 0.039, -0.016, 0.0, 0.0, 0.0, 0.046, -0.058,
+                  -0.018, -0.016, -0.058, -0.050])
+    nan = float('NaN')
+    V = np.array([1.06, 1.045, 1.01, nan, nan, 1.07, nan, 1.09, nan, nan,
+                  nan, nan, nan, nan])
+    Th = np.ones([14])
+    return is_PV, b, Yb, P, Q, V, Th
+
+
+class TestSNRLF(unittest.TestCase):
+
+    def _compare(self, network):
+        is_PV, b, Yb, P, Q, V, Th = network()
+        nrlf = NewtonRaphsonLoadFlowCalculator(1., 1., is_PV, b, Yb.copy())
+        [P_ref, Q_ref, V_ref, Th_ref] = [x.copy() for x in nrlf.calculate(
+            P.copy(), Q.copy(), V.copy(), Th.copy(), True)]
+        flows_ref = nrlf.get_branch_power_flows(True)
+
+        snrlf = SparseNewtonRaphsonLoadFlowCalculator(1., 1., is_PV, b,
+                                                      Yb.copy())
+        [P, Q, V, Th] = snrlf.calculate(P, Q, V, Th, True)
+        flows = snrlf.get_branch_power_flows(True)
+
+        self.assertAlmostEqual(P[0], P_ref[0])
+        self.assertTrue(np.allclose(Q, Q_ref))
+        self.assertTrue(np.allclose(V, V_ref))
+        self.assertTrue(np.allclose(Th, Th_ref))
+        for flow, flow_ref in zip(flows, flows_ref):
+            self.assertTrue(np.allclose(flow, flow_ref))
+
+        return P, Q, V, Th
+
+    def test_5bus(self):
+        P, Q, V, Th = self._compare(network_5bus)
+
+        ref_V = np.array([1.05, 0.86215, 1.07791, 1.03641, 1.05])
+        self.assertTrue(np.allclose(V, ref_V))
+
+        ref_Th = np.array([0., -4.77851, 17.85353, -4.28193, 21.84332])
+        self.assertTrue(np.allclose(Th, ref_Th*math.pi/180., atol=1e-7))
+
+    def test_14bus(self):
+        self._compare(network_14bus)
+
+    def test_defaults(self):
+        # the sparse calculator keeps the defaults of iterative calculators,
+        # only the tolerance of the dense one is stricter
+        snrlf = SparseNewtonRaphsonLoadFlowCalculator()
+        nrlf = NewtonRaphsonLoadFlowCalculator()
+        self.assertEqual(snrlf.tolerance, 1e-10)
+        self.assertEqual(snrlf.max_iterations, 100)
+        self.assertEqual(nrlf.tolerance, 1e-12)
+        self.assertEqual(nrlf.max_iterations, 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# This program checks whether AnyIIDRandomElectricalCPSElement draws its power
+# values with the alias method with the probabilities of its distribution,
+# and whether the elements reading the same histogram file share it, unless
+# the file has been modified in the meantime.
+#
+# Histogram of test/data/histogram.csv
+#-------------------------------------------------------------------
+# Power (W)     Frequency
+#-------------------------------------------------------------------
+# 0             1
+# 1             2
+# 2             3
+# 3             4
+#-------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.util import RandomStreams
+from gridsim.electrical.element import AnyIIDRandomElectricalCPSElement, \
+    AnyIIDRandomElectricalCPSElementGroup, _AliasTable
+
+HISTOGRAM = os.path.join(os.path.dirname(__file__), 'data', 'histogram.csv')
+
+
+class TestAliasMethod(unittest.TestCase):
+
+    def test_alias_table(self):
+        probabilities = np.array([.1, .2, .3, .4, 0.])
+        table = _AliasTable(probabilities)
+        # each index is drawn with probability 1/n and kept or replaced by its
+        # alias
+        n = len(probabilities)
+        drawn = table.prob / n
+        for i_index in range(n):
+            drawn[table.alias[i_index]] += (1. - table.prob[i_index]) / n
+        np.testing.assert_array_almost_equal(drawn, probabilities)
+
+        indices = table.sample(np.random.RandomState(1), 1000)
+        self.assertEqual(indices.shape, (1000,))
+        self.assertFalse(np.any(indices == 4))
+        self.assertTrue(isinstance(table.sample(np.random.RandomState(1)),
+                                   int))
+
+    def test_shared_histogram(self):
+        element1 = AnyIIDRandomElectricalCPSElement('A1', HISTOGRAM)
+        element2 = AnyIIDRandomElectricalCPSElement('A2', HISTOGRAM)
+        self.assertIs(element1._alias_table, element2._alias_table)
+        np.testing.assert_array_almost_equal(element1.cdf,
+                                             [.1, .3, .6, 1.])
+
+        element = AnyIIDRandomElectricalCPSElement(
+            'A3', np.array([0., 1.]), np.array([1, 3]))
+        np.testing.assert_array_almost_equal(element.cdf, [.25, 1.])
+
+    def test_modified_histogram(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'histogram.csv')
+            shutil.copy(HISTOGRAM, path)
+            element1 = AnyIIDRandomElectricalCPSElement('A1', path)
+
+            with open(path, 'w') as histogram_file:
+                histogram_file.write('0;1;W\n2\n2\n2\n2\n')
+            # the modification time may have a resolution of 1 s
+            modification_time = os.stat(path).st_mtime + 10
+            os.utime(path, (modification_time, modification_time))
+            element2 = AnyIIDRandomElectricalCPSElement('A2', path)
+            np.testing.assert_array_almost_equal(element1.cdf,
+                                                 [.1, .3, .6, 1.])
+            np.testing.assert_array_almost_equal(element2.cdf,
+                                                 [.25, .5, .75, 1.])
+            self.assertIs(AnyIIDRandomElectricalCPSElement('A3', path).cdf,
+                          element2.cdf)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_group(self):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.random_streams = RandomStreams(42)
+        group = esim.add_group(AnyIIDRandomElectricalCPSElementGroup(
+            ['A%d' % i_element for i_element in range(1000)], HISTOGRAM))
+        self.assertIs(esim.cps_element('A999').cdf,
+                      esim.cps_element('A0').cdf)
+
+        sim.reset()
+        sim.step(1*units.second)
+        energies = group.delta_energy.copy()
+        self.assertTrue(set(energies) <= set([0., 1., 2., 3.]))
+        # mean 2 and standard deviation 1
+        self.assertAlmostEqual(energies.mean(), 2., delta=.15)
+
+        sim.reset()
+        sim.step(1*units.second)
+        np.testing.assert_array_equal(group.delta_energy, energies)
+
+
+if __name__ == '__main__':
+    unittest.main()
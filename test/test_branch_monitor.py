@@ -0,0 +1,117 @@
+# This program checks whether the electrical simulator computes the current
+# and the losses of each branch and keeps the overload events of the branches
+# loaded above their rating. It uses the example of test_esimDLF.py, given in
+# Hossein Seifi, Mohammad Sadegh Sepasian, Electric Power System Planning:
+# Issues, Algorithms and Solutions, pp. 247-248.
+#
+# Branches
+#-------------------------------------------------------------------
+# Branch        From bus    To bus    Pij (p.u.)    Rating (p.u.)
+#-------------------------------------------------------------------
+# 1             1           2         0.044243      1.0
+# 2             2           3         0.574243      0.5
+# 3             1           3         0.325757      0.3
+#-------------------------------------------------------------------
+
+import unittest
+
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator, \
+    NewtonRaphsonLoadFlowCalculator
+
+
+class TestBranchMonitor(unittest.TestCase):
+
+    def _network(self, calculator, R=0.):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = calculator
+
+        esim.add(ElectricalPVBus('Bus 2'))
+        esim.add(ElectricalPQBus('Bus 3'))
+        esim.connect('Branch 1-2', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line 1', 1.0*units.metre,
+                                                0.0576*units.ohm,
+                                                R*units.ohm))
+        esim.connect('Branch 2-3', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 2', 1.0*units.metre,
+                                                0.092*units.ohm,
+                                                R*units.ohm))
+        esim.connect('Branch 1-3', esim.bus('Slack Bus'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 3', 1.0*units.metre,
+                                                0.17*units.ohm,
+                                                R*units.ohm))
+        esim.attach('Bus 2', ConstantElectricalCPSElement('GD2',
+                                                          -.53*units.watt))
+        esim.attach('Bus 3', ConstantElectricalCPSElement('GD3',
+                                                          .9*units.watt))
+        return sim, esim
+
+    def test_currents(self):
+        sim, esim = self._network(DirectLoadFlowCalculator())
+        sim.reset()
+        sim.step(1*units.second)
+
+        # in per unit, currents are close to the active power flows
+        np.testing.assert_array_almost_equal(
+            esim.branch_values('I'), [0.044243, 0.574243, 0.325757], 3)
+        self.assertAlmostEqual(esim.branch('Branch 2-3').I, 0.574243, 3)
+        np.testing.assert_array_almost_equal(
+            esim.load_flow_calculator.get_branch_max_currents(True),
+            [0.044243, 0.574243, 0.325757])
+        # the direct load flow has no losses
+        np.testing.assert_array_almost_equal(esim.branch_values('Ploss'),
+                                             np.zeros(3))
+
+    def test_losses(self):
+        sim, esim = self._network(NewtonRaphsonLoadFlowCalculator(), R=0.01)
+        sim.reset()
+        sim.step(1*units.second)
+
+        Ploss = esim.branch_values('Ploss')
+        self.assertTrue(np.all(Ploss > 0))
+        # all losses are paid by the slack bus
+        self.assertAlmostEqual(Ploss.sum(),
+                               esim.bus('Slack Bus').P + .53 - .9)
+        # losses are R * I^2 for lines without charging
+        np.testing.assert_array_almost_equal(
+            Ploss, 0.01 * esim.branch_values('I') ** 2)
+        np.testing.assert_array_almost_equal(
+            esim.load_flow_calculator.get_branch_max_currents(True),
+            esim.branch_values('I'))
+
+    def test_overload_events(self):
+        sim, esim = self._network(DirectLoadFlowCalculator())
+        esim.branch_ratings = np.array([1., .5, .3])
+        sim.reset()
+        for i_step in range(3):
+            sim.step(1*units.second)
+
+        steps, ids, loadings = esim.overload_events()
+        np.testing.assert_array_equal(steps, [0, 0, 1, 1, 2, 2])
+        np.testing.assert_array_equal(ids, [1, 2, 1, 2, 1, 2])
+        np.testing.assert_array_almost_equal(
+            loadings, np.tile([114.8486, 108.5857], 3), 1)
+
+        steps, ids, loadings = esim.overload_events('Branch 1-3')
+        np.testing.assert_array_equal(steps, [0, 1, 2])
+        np.testing.assert_array_equal(ids, [2, 2, 2])
+
+        esim.overload_threshold = 110.
+        sim.reset()
+        sim.step(1*units.second)
+        steps, ids, loadings = esim.overload_events()
+        np.testing.assert_array_equal(ids, [1])
+
+        self.assertRaises(RuntimeError, setattr, esim, 'branch_ratings',
+                          np.array([1., 1.]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# This program checks that the batched load flow of K scenarios computed by
+# calculate_many gives the same results as K calls to calculate, on the 5-bus
+# reference network (see Xi-Fan Wang, Yonghua Song, Malcolm Irving, Modern
+# Power Systems Analysis).
+
+import unittest
+import numpy as np
+
+from gridsim.electrical import loadflow
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator, \
+    NewtonRaphsonLoadFlowCalculator, SparseNewtonRaphsonLoadFlowCalculator, \
+    FastDecoupledLoadFlowCalculator
+
+from test_SNRLF import network_5bus
+
+
+def scenarios(P, Q, V, K):
+    # scenarios with loads scaled between 50% and 110%
+    factors = np.linspace(0.5, 1.1, K)[:, np.newaxis]
+    return factors * P, factors * Q, np.tile(V, (K, 1))
+
+
+class TestCalculateMany(unittest.TestCase):
+
+    def _check(self, cls, scaled=True):
+        is_PV, b, Yb, P, Q, V, Th = network_5bus()
+        P_K, Q_K, V_K = scenarios(P, Q, V, 7)
+        if not scaled:
+            P_K *= 100.
+            Q_K *= 100.
+            V_K *= 10.
+        calc = cls(100. if not scaled else 1., 10. if not scaled else 1.,
+                   is_PV, b, Yb.copy())
+
+        [P_m, Q_m, V_m, Th_m] = calc.calculate_many(P_K, Q_K, V_K, scaled)
+        self.assertEqual(P_m.shape, (7, 5))
+        self.assertEqual(Th_m.shape, (7, 5))
+        # input arrays are not modified
+        self.assertTrue(np.isnan(P_K[0, 0]))
+
+        for k in range(7):
+            [P_k, Q_k, V_k, Th_k] = calc.calculate(P_K[k], Q_K[k], V_K[k],
+                                                   np.zeros(5), scaled)
+            self.assertTrue(np.allclose(P_m[k], P_k, equal_nan=True))
+            self.assertTrue(np.allclose(Q_m[k], Q_k, equal_nan=True))
+            self.assertTrue(np.allclose(V_m[k], V_k, equal_nan=True))
+            self.assertTrue(np.allclose(Th_m[k], Th_k))
+
+    def test_direct(self):
+        self._check(DirectLoadFlowCalculator)
+
+    def test_newton_raphson(self):
+        self._check(NewtonRaphsonLoadFlowCalculator)
+
+    def test_sparse_newton_raphson(self):
+        self._check(SparseNewtonRaphsonLoadFlowCalculator)
+        self._check(SparseNewtonRaphsonLoadFlowCalculator, False)
+
+    def test_sparse_newton_raphson_large(self):
+        # sparse factorization per scenario as for large networks
+        max_unknowns = loadflow._DENSE_BATCH_MAX_UNKNOWNS
+        loadflow._DENSE_BATCH_MAX_UNKNOWNS = 0
+        try:
+            self._check(SparseNewtonRaphsonLoadFlowCalculator)
+        finally:
+            loadflow._DENSE_BATCH_MAX_UNKNOWNS = max_unknowns
+
+    def test_fast_decoupled(self):
+        self._check(FastDecoupledLoadFlowCalculator)
+        self._check(FastDecoupledLoadFlowCalculator, False)
+
+    def test_not_converged(self):
+        is_PV, b, Yb, P, Q, V, Th = network_5bus()
+        P_K, Q_K, V_K = scenarios(P, Q, V, 3)
+        # no solution for this load
+        P_K[1] *= 100.
+        calc = SparseNewtonRaphsonLoadFlowCalculator(1., 1., is_PV, b, Yb)
+        self.assertRaises(RuntimeError, calc.calculate_many, P_K, Q_K, V_K,
+                          True)
+
+if __name__ == '__main__':
+    unittest.main()
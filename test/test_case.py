@@ -0,0 +1,90 @@
+# This program checks the bulk construction of networks and the case readers,
+# on the 3-bus example given in Hossein Seifi, Mohammad Sadegh Sepasian,
+# Electric Power System Planning: Issues, Algorithms and Solutions,
+# pp. 247-248.
+
+import unittest
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.core import ElectricalBus
+from gridsim.electrical.network import ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement
+from gridsim.electrical.case import read_matpower, read_ieee_cdf
+
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator
+
+
+class TestElectricalCase(unittest.TestCase):
+
+    def _check(self, sim):
+        esim = sim.electrical
+        esim.load_flow_calculator = DirectLoadFlowCalculator()
+        sim.reset()
+        sim.step(1*units.second)
+        self.assertAlmostEqual(esim.bus('Slack Bus').P, 0.37)
+        self.assertAlmostEqual(esim.bus('Bus 3').Th, -0.05537872)
+
+    def test_bulk(self):
+        sim = Simulator()
+        esim = sim.electrical
+        buses = esim.add_buses(['Bus 2', 'Bus 3'],
+                               [ElectricalBus.Type.PV_BUS,
+                                ElectricalBus.Type.PQ_BUS])
+        self.assertEqual([bus.id for bus in buses], [1, 2])
+        self.assertIs(esim.bus('Bus 3'), buses[1])
+        branches = esim.connect_many(['Branch 1-2', 'Branch 2-3',
+                                      'Branch 1-3'],
+                                     np.array([0, 1, 0]), np.array([1, 2, 2]),
+                                     np.array([0.0576, 0.092, 0.17]))
+        self.assertEqual([branch.id for branch in branches], [0, 1, 2])
+        # two-ports are only created when asked for
+        self.assertIsNone(branches[2]._two_port)
+        self.assertIsInstance(branches[2].two_port, ElectricalTransmissionLine)
+        self.assertEqual(branches[2].two_port.X, 0.17)
+        esim.attach_many(np.array([1, 2]),
+                         [ConstantElectricalCPSElement('GD2',
+                                                       -.53*units.watt),
+                          ConstantElectricalCPSElement('GD3',
+                                                       .9*units.watt)])
+        self._check(sim)
+
+        # all element are validated before any is added
+        self.assertRaises(RuntimeError, esim.add_buses, ['Bus 4', 'Bus 2'],
+                          [ElectricalBus.Type.PQ_BUS] * 2)
+        self.assertRaises(RuntimeError, esim.add_buses, ['Bus 4', 'Bus 4'],
+                          [ElectricalBus.Type.PQ_BUS] * 2)
+        self.assertRaises(KeyError, esim.bus, 'Bus 4')
+        self.assertRaises(RuntimeError, esim.connect_many, ['Branch 2-4'],
+                          np.array([1]), np.array([3]), np.array([0.1]))
+        self.assertRaises(RuntimeError, esim.connect_many, ['Branch 1-2'],
+                          np.array([0]), np.array([1]), np.array([0.1]))
+        self.assertRaises(RuntimeError, esim.connect_many, ['Branch 2-4'],
+                          np.array([1]), np.array([2]), np.array([0.]))
+        self.assertRaises(TypeError, esim.connect_many, [24],
+                          np.array([1]), np.array([2]), np.array([0.1]))
+        self.assertRaises(KeyError, esim.branch, 'Branch 2-4')
+        self.assertRaises(RuntimeError, esim.attach_many, np.array([0]),
+                          [ConstantElectricalCPSElement('GD1',
+                                                        1.*units.watt)])
+
+    def test_matpower(self):
+        sim = Simulator()
+        read_matpower('./test/data/case3.m').build(sim.electrical)
+        # out-of-service generator and branch are ignored
+        self.assertRaises(KeyError, sim.electrical.branch, 'Branch 4')
+        self.assertRaises(KeyError, sim.electrical.cps_element,
+                          'Generation 3')
+        self._check(sim)
+
+    def test_ieee_cdf(self):
+        sim = Simulator()
+        case = read_ieee_cdf('./test/data/case3.cdf')
+        self.assertEqual(case.base_mva, 100.)
+        bus_ids = case.build(sim.electrical)
+        self.assertEqual(list(bus_ids), [0, 1, 2])
+        self._check(sim)
+
+if __name__ == '__main__':
+    unittest.main()
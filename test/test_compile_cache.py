@@ -0,0 +1,131 @@
+# This program checks whether load flow calculators updated from a
+# CompiledNetworkCache give the same results as calculators updated from the
+# network, on the radial feeder of test_BFSLF.py and on the 3-bus example of
+# test_esimDLF.py, given in Hossein Seifi, Mohammad Sadegh Sepasian, Electric
+# Power System Planning: Issues, Algorithms and Solutions, pp. 247-248, with
+# line resistances of 0.01 p.u.
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement
+from gridsim.electrical.cache import CompiledNetworkCache
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator, \
+    NewtonRaphsonLoadFlowCalculator, SparseNewtonRaphsonLoadFlowCalculator, \
+    FastDecoupledLoadFlowCalculator, BackwardForwardSweepLoadFlowCalculator
+
+from test_BFSLF import radial_feeder
+
+
+class TestCompileCache(unittest.TestCase):
+
+    CALCULATORS = [
+        DirectLoadFlowCalculator,
+        NewtonRaphsonLoadFlowCalculator,
+        SparseNewtonRaphsonLoadFlowCalculator,
+        FastDecoupledLoadFlowCalculator,
+        lambda: FastDecoupledLoadFlowCalculator(
+            method=FastDecoupledLoadFlowCalculator.Method.BX),
+        BackwardForwardSweepLoadFlowCalculator]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_calculators(self):
+        is_PV, b, Yb, P, Q, V = radial_feeder()
+        for new_calculator in self.CALCULATORS:
+            reference = new_calculator()
+            reference.update(1., 1., is_PV, b, Yb)
+            expected = reference.calculate(P.copy(), Q.copy(), V.copy(),
+                                           np.zeros(8), True)
+
+            # each cache stands for another process sharing the directory
+            for i_process in range(2):
+                cache = CompiledNetworkCache(self.directory)
+                calculator = new_calculator()
+                cache.update(calculator, 1., 1., is_PV, b, Yb)
+                self.assertEqual(cache.misses, 1 - i_process)
+                self.assertEqual(cache.hits, i_process)
+                results = calculator.calculate(P.copy(), Q.copy(), V.copy(),
+                                               np.zeros(8), True)
+                for values, expected_values in zip(results, expected):
+                    np.testing.assert_array_almost_equal(values,
+                                                         expected_values)
+
+    def test_keys(self):
+        is_PV, b, Yb, P, Q, V = radial_feeder()
+        cache = CompiledNetworkCache(self.directory)
+        key = cache.key(DirectLoadFlowCalculator(), 1., 1., is_PV, b, Yb)
+        self.assertEqual(
+            key, cache.key(DirectLoadFlowCalculator(), 1., 1., is_PV, b,
+                           Yb.copy()))
+
+        changed_Yb = Yb.copy()
+        changed_Yb[3] *= 1.01
+        self.assertNotEqual(
+            key, cache.key(DirectLoadFlowCalculator(), 1., 1., is_PV, b,
+                           changed_Yb))
+        self.assertNotEqual(
+            key, cache.key(SparseNewtonRaphsonLoadFlowCalculator(), 1., 1.,
+                           is_PV, b, Yb))
+        self.assertNotEqual(
+            cache.key(FastDecoupledLoadFlowCalculator(), 1., 1., is_PV, b,
+                      Yb),
+            cache.key(FastDecoupledLoadFlowCalculator(
+                method=FastDecoupledLoadFlowCalculator.Method.BX), 1., 1.,
+                is_PV, b, Yb))
+        self.assertIsNone(cache.load(key))
+
+    def _run(self, compile_cache):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = SparseNewtonRaphsonLoadFlowCalculator()
+        esim.compile_cache = compile_cache
+
+        esim.add(ElectricalPVBus('Bus 2'))
+        esim.add(ElectricalPQBus('Bus 3'))
+        esim.connect('Branch 1-2', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line 1', 1.0*units.metre,
+                                                0.0576*units.ohm,
+                                                0.01*units.ohm))
+        esim.connect('Branch 2-3', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 2', 1.0*units.metre,
+                                                0.092*units.ohm,
+                                                0.01*units.ohm))
+        esim.connect('Branch 1-3', esim.bus('Slack Bus'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 3', 1.0*units.metre,
+                                                0.17*units.ohm,
+                                                0.01*units.ohm))
+        esim.attach('Bus 2', ConstantElectricalCPSElement('GD2',
+                                                          -.53*units.watt))
+        esim.attach('Bus 3', ConstantElectricalCPSElement('GD3',
+                                                          .9*units.watt))
+        sim.reset()
+        sim.step(1*units.second)
+        return np.concatenate([esim.bus_values(name)
+                               for name in ('P', 'Q', 'V', 'Th')])
+
+    def test_simulator(self):
+        expected = self._run(None)
+        first_cache = CompiledNetworkCache(self.directory)
+        np.testing.assert_array_almost_equal(self._run(first_cache), expected)
+        second_cache = CompiledNetworkCache(self.directory)
+        np.testing.assert_array_almost_equal(self._run(second_cache),
+                                             expected)
+        self.assertEqual(first_cache.misses, 1)
+        self.assertEqual(second_cache.hits, 1)
+        self.assertEqual(second_cache.misses, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# This program checks the N-1 contingency screening of the ContingencyAnalyzer
+# on the 3-bus example given in Hossein Seifi, Mohammad Sadegh Sepasian,
+# Electric Power System Planning: Issues, Algorithms and Solutions, pp. 247-248,
+# extended with a radial bus and with a bus joining buses 1 and 2:
+# post-contingency flows are compared with direct load flows computed without
+# the outaged branch.
+
+import unittest
+import numpy as np
+
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator, \
+    NewtonRaphsonLoadFlowCalculator
+from gridsim.electrical.contingency import ContingencyAnalyzer
+
+
+def network():
+    is_PV = np.array([False, True, False, False, False])
+    b = np.array([[0, 1], [1, 2], [0, 2], [3, 2], [1, 4], [4, 2]])
+    x = np.array([0.0576, 0.092, 0.17, 0.1, 0.12, 0.08])
+    Yb = np.tile(1. / (1j * x), (4, 1)).T.copy()
+    P = np.array([0., 0.53, -0.9, -0.1, 0.05])
+    return is_PV, b, Yb, P
+
+
+def flows(is_PV, b, Yb, P):
+    dlf = DirectLoadFlowCalculator(1., 1., is_PV, b, Yb)
+    n = len(P)
+    dlf.calculate(P.copy(), np.zeros(n), np.ones(n), np.zeros(n), True)
+    return dlf.get_branch_power_flows(True)[0]
+
+
+class TestContingency(unittest.TestCase):
+
+    def test_post_contingency_flows(self):
+        is_PV, b, Yb, P = network()
+        dlf = DirectLoadFlowCalculator(1., 1., is_PV, b, Yb.copy())
+        dlf.calculate(P.copy(), np.zeros(5), np.ones(5), np.zeros(5), True)
+        Pij = dlf.get_branch_power_flows(True)[0]
+
+        analyzer = ContingencyAnalyzer(dlf)
+        self.assertEqual(analyzer.ptdf.shape, (6, 5))
+        self.assertEqual(analyzer.lodf.shape, (6, 6))
+        # PTDF gives the flows from the injections
+        self.assertTrue(np.allclose(analyzer.ptdf.dot(P), Pij))
+        # the outage of branch 3 disconnects bus 3
+        self.assertEqual(list(analyzer.radial_branches), [3])
+
+        post_flows = analyzer.post_contingency_flows(Pij)
+        for outage in [0, 1, 2, 4, 5]:
+            in_service = np.arange(6) != outage
+            ref = flows(is_PV, b[in_service], Yb[in_service].copy(), P)
+            self.assertTrue(np.allclose(post_flows[in_service, outage], ref))
+            self.assertEqual(post_flows[outage, outage], 0.)
+        self.assertTrue(np.all(np.isnan(post_flows[:, 3])))
+
+    def test_violations(self):
+        is_PV, b, Yb, P = network()
+        dlf = DirectLoadFlowCalculator(1., 1., is_PV, b, Yb.copy())
+        dlf.calculate(P.copy(), np.zeros(5), np.ones(5), np.zeros(5), True)
+        Pij = dlf.get_branch_power_flows(True)[0]
+        analyzer = ContingencyAnalyzer(dlf)
+
+        ratings = np.array([2.5, 2.5, 1.5, 2.5, 2.5, 2.5])
+        self.assertEqual(analyzer.violations(Pij, ratings).shape, (0, 2))
+
+        post_flows = analyzer.post_contingency_flows(Pij)
+        ratings[2] = 0.9 * abs(post_flows[2, 0])
+        violations = analyzer.violations(Pij, ratings)
+        self.assertTrue([2, 0] in violations.tolist())
+        for branch, outage in violations:
+            self.assertTrue(abs(post_flows[branch, outage]) > ratings[branch])
+
+    def test_topology_change(self):
+        is_PV, b, Yb, P = network()
+        dlf = DirectLoadFlowCalculator(1., 1., is_PV, b, Yb.copy())
+        analyzer = ContingencyAnalyzer(dlf)
+        self.assertEqual(analyzer.lodf.shape, (6, 6))
+        # radial network
+        dlf.update(1., 1., is_PV[:4], b[[0, 2, 3]], Yb[[0, 2, 3]].copy())
+        self.assertEqual(analyzer.lodf.shape, (3, 3))
+        self.assertEqual(list(analyzer.radial_branches), [0, 1, 2])
+
+    def test_calculator(self):
+        self.assertRaises(TypeError, ContingencyAnalyzer,
+                          NewtonRaphsonLoadFlowCalculator())
+        self.assertRaises(RuntimeError, getattr,
+                          ContingencyAnalyzer(DirectLoadFlowCalculator()),
+                          'lodf')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# This program checks whether groups of CPS elements, computed with array
+# operations, give the same results as the corresponding individual elements.
+# It uses the 3-bus example of test_esimDLF.py, given in Hossein Seifi,
+# Mohammad Sadegh Sepasian, Electric Power System Planning: Issues,
+# Algorithms and Solutions, pp. 247-248.
+#
+# Elements
+#-------------------------------------------------------------------
+# Element       Bus            Kind        Power (p.u.)
+#-------------------------------------------------------------------
+# GD2           2              Constant    -0.53
+# GD3           3              Constant    0.9
+# C2            2              Cyclic      0.1, 0.2, 0.3, 0.4, from 0 s
+# C3            3              Cyclic      -0.2, 0.0, 0.2, 0.1, from 1 s
+#-------------------------------------------------------------------
+
+import unittest
+
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement, \
+    ConstantElectricalCPSElementGroup, CyclicElectricalCPSElement, \
+    CyclicElectricalCPSElementGroup
+
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator
+
+
+class TestCPSGroups(unittest.TestCase):
+
+    CYCLES = np.array([[0.1, 0.2, 0.3, 0.4],
+                       [-0.2, 0.0, 0.2, 0.1]])
+
+    def _network(self):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = DirectLoadFlowCalculator()
+
+        esim.add(ElectricalPVBus('Bus 2'))
+        esim.add(ElectricalPQBus('Bus 3'))
+        esim.connect('Branch 1-2', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line 1', 1.0*units.metre,
+                                                0.0576*units.ohm))
+        esim.connect('Branch 2-3', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 2', 1.0*units.metre,
+                                                0.092*units.ohm))
+        esim.connect('Branch 1-3', esim.bus('Slack Bus'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 3', 1.0*units.metre,
+                                                0.17*units.ohm))
+        return sim, esim
+
+    def _run(self, sim, esim, delta_time):
+        sim.reset()
+        P = []
+        for i_step in range(6):
+            sim.step(delta_time*units.second)
+            P.append([esim.bus(name).P for name in ('Bus 2', 'Bus 3')])
+        return np.array(P)
+
+    def test_same_results_as_single_elements(self):
+        bus_ids = np.array([1, 2])
+
+        sim, esim = self._network()
+        esim.attach_many(bus_ids, [
+            ConstantElectricalCPSElement('GD2', -.53*units.watt),
+            ConstantElectricalCPSElement('GD3', .9*units.watt)])
+
+        group_sim, group_esim = self._network()
+        group = group_esim.add_group(ConstantElectricalCPSElementGroup(
+            ['GD2', 'GD3'], np.array([-.53, .9])*units.watt))
+        group_esim.attach_many(bus_ids, group.elements)
+
+        np.testing.assert_array_almost_equal(
+            self._run(group_sim, group_esim, 1.),
+            self._run(sim, esim, 1.))
+
+        # elements of groups are found and read the group values
+        element = group_esim.cps_element('GD3')
+        self.assertEqual(element.delta_energy, group.delta_energy[1])
+        self.assertAlmostEqual(element.delta_energy, .9)
+        self.assertEqual(len(group_sim.find(
+            module='electrical', element_class=ConstantElectricalCPSElement)), 2)
+
+    def test_cyclic_group(self):
+        sim, esim = self._network()
+        group = esim.add_group(CyclicElectricalCPSElementGroup(
+            ['C2', 'C3'], 1, self.CYCLES*units.watt, np.array([0, 1])))
+        esim.attach_many(np.array([1, 2]), group.elements)
+        self.assertEqual(len(sim.find(
+            module='electrical', element_class=CyclicElectricalCPSElement)), 2)
+        np.testing.assert_array_equal(esim.cps_element('C3').power_values,
+                                      self.CYCLES[1])
+
+        # step equal to the cycle time resolution, C3 starts 1 s later
+        group.calculate(0., 1.)
+        np.testing.assert_array_almost_equal(
+            group._internal_delta_energy, [0.1, 0.1])
+        # step over 2 full and 1 half cycle intervals
+        group.calculate(0., 2.5)
+        np.testing.assert_array_almost_equal(
+            group._internal_delta_energy, [0.45, -0.1])
+        # the cycle wraps around
+        group.calculate(3., 2.)
+        np.testing.assert_array_almost_equal(
+            group._internal_delta_energy, [0.5, 0.3])
+
+        sim.reset()
+        sim.step(1*units.second)
+        self.assertAlmostEqual(esim.cps_element('C2').delta_energy, 0.1)
+
+    def test_power_setter(self):
+        sim, esim = self._network()
+        group = esim.add_group(ConstantElectricalCPSElementGroup(
+            ['GD2', 'GD3'], np.array([-.53, .9])*units.watt))
+        esim.attach_many(np.array([1, 2]), group.elements)
+
+        esim.cps_element('GD3').power = 0.5
+        self.assertEqual(group.power[1], 0.5)
+
+        sim.reset()
+        sim.step(1*units.second)
+        self.assertAlmostEqual(esim.cps_element('GD3').delta_energy, 0.5)
+
+    def test_grouped_element_added_alone(self):
+        sim, esim = self._network()
+        group = ConstantElectricalCPSElementGroup(
+            ['GD2', 'GD3'], np.array([-.53, .9])*units.watt)
+        self.assertRaises(RuntimeError, esim.add, group.elements[0])
+        self.assertRaises(RuntimeError, esim.attach_many, np.array([1]),
+                          group.elements[:1])
+
+        esim.add_group(group)
+        self.assertRaises(RuntimeError, esim.add_group, group)
+
+    def test_invalid_group(self):
+        self.assertRaises(RuntimeError, ConstantElectricalCPSElementGroup,
+                          ['GD2', 'GD3'], np.array([-.53])*units.watt)
+        self.assertRaises(RuntimeError, CyclicElectricalCPSElementGroup,
+                          ['C2'], 1, self.CYCLES*units.watt)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# This program checks that the load flow of a whole horizon computed in one
+# call by ElectricalSimulator.calculate_horizon gives the same results as a
+# step by step simulation, on the 3-bus example given in Hossein Seifi,
+# Mohammad Sadegh Sepasian, Electric Power System Planning: Issues, Algorithms
+# and Solutions, pp. 247-248.
+
+import unittest
+
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import TimeSeriesElectricalCPSElement, \
+    ConstantElectricalCPSElement
+from gridsim.timeseries import SortedConstantStepTimeSeriesObject
+from gridsim.iodata.input import CSVReader
+
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator, \
+    NewtonRaphsonLoadFlowCalculator
+
+
+class TestEsimDLFHorizon(unittest.TestCase):
+
+    def _simulator(self):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = DirectLoadFlowCalculator()
+
+        esim.add(ElectricalPVBus('Bus 2'))
+        esim.add(ElectricalPQBus('Bus 3'))
+        esim.connect('Branch 1-2', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line 1', 1.0*units.metre,
+                                                0.0576*units.ohm))
+        esim.connect('Branch 2-3', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 2', 1.0*units.metre,
+                                                0.092*units.ohm))
+        esim.connect('Branch 1-3', esim.bus('Slack Bus'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 3', 1.0*units.metre,
+                                                0.17*units.ohm))
+
+        esim.attach('Bus 2', ConstantElectricalCPSElement('GD2',
+                                                          -.53*units.watt))
+        esim.attach('Bus 3', TimeSeriesElectricalCPSElement(
+            'GD3', SortedConstantStepTimeSeriesObject(
+                CSVReader('./test/data/datatest_power.csv'))))
+        return sim
+
+    def test_horizon(self):
+        T = 4
+        sim = self._simulator()
+        esim = sim.electrical
+
+        powers = esim.element_powers(range(T), 1)
+        self.assertEqual(powers.shape, (2, T))
+        self.assertTrue(np.allclose(powers[0, :], -.53))
+        self.assertTrue(np.allclose(powers[1, :], [20.8, 21.6, 18.1, 10.]))
+
+        [P, Th, Pbr] = esim.calculate_horizon(powers)
+        self.assertEqual(P.shape, (3, T))
+        self.assertEqual(Th.shape, (3, T))
+        self.assertEqual(Pbr.shape, (3, T))
+
+        # compare with a step by step simulation
+        sim.reset()
+        for t in range(T):
+            sim.step(1*units.second)
+            self.assertAlmostEqual(esim.bus('Slack Bus').P, P[0, t])
+            for i_bus in range(1, 3):
+                self.assertAlmostEqual(esim.bus(i_bus).Th, Th[i_bus, t])
+            for i_branch in range(3):
+                self.assertAlmostEqual(esim.branch(i_branch).Pij,
+                                       Pbr[i_branch, t])
+
+        # slack balances the bus powers at each step
+        self.assertTrue(np.allclose(P[0, :], powers[1, :] - .53))
+
+    def test_calculator(self):
+        sim = self._simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = NewtonRaphsonLoadFlowCalculator()
+        self.assertRaises(TypeError, esim.calculate_horizon, np.zeros((2, 3)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# This program checks that the electrical simulator reuses the last load flow
+# solution when bus injections have not changed, on the 3-bus example given in
+# Hossein Seifi, Mohammad Sadegh Sepasian, Electric Power System Planning:
+# Issues, Algorithms and Solutions, pp. 247-248.
+
+import unittest
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement
+
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator
+
+
+class TestEsimCache(unittest.TestCase):
+
+    def test_cache(self):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = DirectLoadFlowCalculator()
+
+        esim.add(ElectricalPVBus('Bus 2'))
+        esim.add(ElectricalPQBus('Bus 3'))
+        esim.connect('Branch 1-2', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line 1', 1.0*units.metre,
+                                                0.0576*units.ohm))
+        esim.connect('Branch 2-3', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 2', 1.0*units.metre,
+                                                0.092*units.ohm))
+        esim.connect('Branch 1-3', esim.bus('Slack Bus'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 3', 1.0*units.metre,
+                                                0.17*units.ohm))
+        esim.attach('Bus 2', ConstantElectricalCPSElement('GD2',
+                                                          -.53*units.watt))
+        load = ConstantElectricalCPSElement('GD3', .9*units.watt)
+        esim.attach('Bus 3', load)
+
+        sim.reset()
+        for step in range(3):
+            sim.step(1*units.second)
+        self.assertEqual(esim.cache_misses, 1)
+        self.assertEqual(esim.cache_hits, 2)
+        self.assertAlmostEqual(esim.bus('Slack Bus').P, 0.37)
+        self.assertAlmostEqual(esim.bus('Bus 3').Th, -0.05537872)
+
+        # small change, within tolerance
+        esim.injection_atol = 1e-3
+        load.power = .9001
+        sim.step(1*units.second)
+        self.assertEqual(esim.cache_hits, 3)
+        self.assertAlmostEqual(esim.bus('Slack Bus').P, 0.37)
+
+        # change above tolerance
+        load.power = .8
+        sim.step(1*units.second)
+        self.assertEqual(esim.cache_misses, 2)
+        self.assertAlmostEqual(esim.bus('Slack Bus').P, 0.27)
+
+        # network changes are always computed
+        esim.add(ElectricalPQBus('Bus 4'))
+        esim.connect('Branch 3-4', esim.bus('Bus 3'), esim.bus('Bus 4'),
+                     ElectricalTransmissionLine('Line 4', 1.0*units.metre,
+                                                0.1*units.ohm))
+        sim.step(1*units.second)
+        self.assertEqual(esim.cache_misses, 3)
+        self.assertAlmostEqual(esim.bus('Bus 4').Th, esim.bus('Bus 3').Th)
+
+        sim.reset()
+        self.assertEqual(esim.cache_hits, 0)
+        sim.step(1*units.second)
+        self.assertEqual(esim.cache_misses, 1)
+        self.assertAlmostEqual(esim.bus('Slack Bus').P, 0.27)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+# This program checks that the electrical simulator computes the islands of a
+# network separately, on the 3-bus example given in Hossein Seifi, Mohammad
+# Sadegh Sepasian, Electric Power System Planning: Issues, Algorithms and
+# Solutions, pp. 247-248, with a second island fed by a PV bus and a third one
+# that is not energized.
+
+import unittest
+import warnings
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement
+
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator
+
+
+class TestEsimIslands(unittest.TestCase):
+
+    def _simulator(self):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = DirectLoadFlowCalculator()
+
+        esim.add(ElectricalPVBus('Bus 2'))
+        esim.add(ElectricalPQBus('Bus 3'))
+        esim.add(ElectricalPVBus('Bus 4'))
+        esim.add(ElectricalPQBus('Bus 5'))
+        esim.add(ElectricalPQBus('Bus 6'))
+        esim.connect('Branch 1-2', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line 1', 1.0*units.metre,
+                                                0.0576*units.ohm))
+        esim.connect('Branch 2-3', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 2', 1.0*units.metre,
+                                                0.092*units.ohm))
+        esim.connect('Branch 1-3', esim.bus('Slack Bus'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 3', 1.0*units.metre,
+                                                0.17*units.ohm))
+        esim.connect('Branch 4-5', esim.bus('Bus 4'), esim.bus('Bus 5'),
+                     ElectricalTransmissionLine('Line 4', 1.0*units.metre,
+                                                0.1*units.ohm))
+        esim.attach('Bus 2', ConstantElectricalCPSElement('GD2',
+                                                          -.53*units.watt))
+        esim.attach('Bus 3', ConstantElectricalCPSElement('GD3',
+                                                          .9*units.watt))
+        esim.attach('Bus 5', ConstantElectricalCPSElement('GD5',
+                                                          .2*units.watt))
+        esim.attach('Bus 6', ConstantElectricalCPSElement('GD6',
+                                                          .1*units.watt))
+        return sim
+
+    def _check(self, esim):
+        self.assertEqual(esim.island_count, 3)
+        self.assertEqual(esim.dead_buses, [esim.bus('Bus 6')])
+
+        self.assertAlmostEqual(esim.bus('Slack Bus').P, 0.37)
+        self.assertAlmostEqual(esim.bus('Bus 3').Th, -0.05537872)
+
+        self.assertAlmostEqual(esim.bus('Bus 4').P, 0.2)
+        self.assertAlmostEqual(esim.bus('Bus 4').Th, 0.)
+        self.assertAlmostEqual(esim.bus('Bus 5').Th, -0.02)
+        self.assertAlmostEqual(esim.branch('Branch 4-5').Pij, 0.2)
+
+        self.assertEqual(esim.bus('Bus 6').P, 0.)
+        self.assertEqual(esim.bus('Bus 6').V, 0.)
+
+    def test_islands(self):
+        sim = self._simulator()
+        esim = sim.electrical
+
+        sim.reset()
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            sim.step(1*units.second)
+            # only the dead bus is reported
+            self.assertEqual(len([warning for warning in w
+                                  if warning.category is UserWarning]), 1)
+        self._check(esim)
+
+        # connecting the islands makes a single network again
+        esim.connect('Branch 3-4', esim.bus('Bus 3'), esim.bus('Bus 4'),
+                     ElectricalTransmissionLine('Line 5', 1.0*units.metre,
+                                                0.1*units.ohm))
+        esim.connect('Branch 5-6', esim.bus('Bus 5'), esim.bus('Bus 6'),
+                     ElectricalTransmissionLine('Line 6', 1.0*units.metre,
+                                                0.1*units.ohm))
+        sim.step(1*units.second)
+        self.assertEqual(esim.island_count, 1)
+        self.assertEqual(esim.dead_buses, [])
+        self.assertAlmostEqual(esim.bus('Slack Bus').P, 0.67)
+
+    def test_workers(self):
+        sim = self._simulator()
+        esim = sim.electrical
+        esim.workers = 2
+
+        sim.reset()
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter('always')
+            sim.step(1*units.second)
+        self._check(esim)
+
+        # the threads are stopped when the simulator is closed, or when the
+        # number of workers changes, and started again when needed
+        pool = esim._pool
+        esim.close()
+        self.assertIsNone(esim._pool)
+        self.assertTrue(all(not worker.is_alive() for worker in pool._pool))
+        esim.close()
+
+        sim.reset()
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter('always')
+            sim.step(1*units.second)
+        self._check(esim)
+        pool = esim._pool
+        esim.workers = 3
+        self.assertIsNone(esim._pool)
+        self.assertTrue(all(not worker.is_alive() for worker in pool._pool))
+
+        self.assertRaises(RuntimeError, setattr, esim, 'workers', 0)
+
+if __name__ == '__main__':
+    unittest.main()
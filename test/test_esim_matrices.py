@@ -0,0 +1,60 @@
+# This program checks the network description built by the electrical
+# simulator from its buses, branches and elements: the aggregation of element
+# powers into bus powers, the PV buses and the admittances of transmission
+# lines and transformers.
+
+import unittest
+
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.core import AbstractElectricalTwoPort
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine, ElectricalGenTransformer
+from gridsim.electrical.element import ConstantElectricalCPSElement
+
+
+class _OtherTwoPort(AbstractElectricalTwoPort):
+    pass
+
+
+class TestEsimMatrices(unittest.TestCase):
+
+    def test_prepare_matrices(self):
+        esim = Simulator().electrical
+        esim.add(ElectricalPVBus('Bus 2'))
+        esim.add(ElectricalPQBus('Bus 3'))
+        esim.connect('Line', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line', 1.0*units.metre,
+                                                0.2*units.ohm, 0.1*units.ohm,
+                                                0.04*units.siemens))
+        esim.connect('Transformer', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     ElectricalGenTransformer('Transformer', 1.1+0.1j,
+                                              0.5*units.ohm))
+        esim.connect('Other', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     _OtherTwoPort('Other', 1.*units.ohm))
+        esim.attach('Bus 3', ConstantElectricalCPSElement('E1', 1.*units.watt))
+        esim.add(ConstantElectricalCPSElement('E2', 1.*units.watt))
+        esim.attach('Bus 2', ConstantElectricalCPSElement('E3', 1.*units.watt))
+
+        esim._prepare_matrices()
+
+        self.assertTrue(np.array_equal(esim._is_PV, [False, True, False]))
+        self.assertTrue(np.array_equal(esim._b, [[0, 1], [1, 2], [1, 2]]))
+        # element E2 is not attached
+        self.assertTrue(np.array_equal(esim._mat_A.toarray(),
+                                       [[0, 0, 0], [0, 0, 1], [1, 0, 0]]))
+
+        Y_line = 1. / (0.1 + 0.2j)
+        self.assertTrue(np.allclose(esim._Yb[0, :], [Y_line + 0.02j, Y_line,
+                                                     Y_line + 0.02j, Y_line]))
+        Y_tr = 1. / 0.5j
+        k = 1.1 + 0.1j
+        self.assertTrue(np.allclose(esim._Yb[1, :], [Y_tr, Y_tr / k,
+                                                     Y_tr / abs(k) ** 2,
+                                                     Y_tr / k.conjugate()]))
+        self.assertTrue(np.array_equal(esim._Yb[2, :], np.zeros(4)))
+
+if __name__ == '__main__':
+    unittest.main()
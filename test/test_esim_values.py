@@ -0,0 +1,72 @@
+# This program checks that buses and branches of the electrical simulator read
+# their values from the load flow result arrays, on the 3-bus example given in
+# Hossein Seifi, Mohammad Sadegh Sepasian, Electric Power System Planning:
+# Issues, Algorithms and Solutions, pp. 247-248.
+
+import unittest
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement
+
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator
+
+
+class TestEsimValues(unittest.TestCase):
+
+    def test_values(self):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = DirectLoadFlowCalculator()
+
+        esim.add(ElectricalPVBus('Bus 2'))
+        esim.add(ElectricalPQBus('Bus 3'))
+        esim.connect('Branch 1-2', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line 1', 1.0*units.metre,
+                                                0.0576*units.ohm))
+        esim.connect('Branch 2-3', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 2', 1.0*units.metre,
+                                                0.092*units.ohm))
+        esim.connect('Branch 1-3', esim.bus('Slack Bus'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 3', 1.0*units.metre,
+                                                0.17*units.ohm))
+        esim.attach('Bus 2', ConstantElectricalCPSElement('GD2',
+                                                          -.53*units.watt))
+        esim.attach('Bus 3', ConstantElectricalCPSElement('GD3',
+                                                          .9*units.watt))
+
+        sim.reset()
+        self.assertIsNone(esim.bus('Slack Bus').P)
+        self.assertIsNone(esim.bus_values('P'))
+        self.assertIsNone(esim.branch('Branch 1-2').Pij)
+
+        sim.step(1*units.second)
+        P = esim.bus_values('P')
+        Th = esim.bus_values('Th')
+        Pij = esim.branch_values('Pij')
+        for bus in [esim.bus(0), esim.bus(1), esim.bus(2)]:
+            self.assertEqual(bus.P, P[bus.id])
+            self.assertEqual(bus.Th, Th[bus.id])
+        for branch in [esim.branch(0), esim.branch(1), esim.branch(2)]:
+            self.assertEqual(branch.Pij, Pij[branch.id])
+        self.assertAlmostEqual(esim.bus('Slack Bus').P, 0.37)
+        self.assertAlmostEqual(esim.bus('Bus 3').Th, -0.05537872)
+
+        # arrays are not copied
+        self.assertIs(esim.bus_values('P'), P)
+        P[2] = 1.
+        self.assertEqual(esim.bus('Bus 3').P, 1.)
+        esim.bus('Bus 3').P = 2.
+        self.assertEqual(P[2], 2.)
+
+        self.assertRaises(KeyError, esim.bus_values, 'Pij')
+        self.assertRaises(KeyError, esim.branch_values, 'P')
+
+        sim.reset()
+        self.assertIsNone(esim.bus('Bus 3').Th)
+        self.assertIsNone(esim.branch_values('Pij'))
+
+if __name__ == '__main__':
+    unittest.main()
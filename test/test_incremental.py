@@ -0,0 +1,170 @@
+# This program checks that changes of the network during a simulation (new
+# branches, attached and detached elements) are taken into account without
+# computing the whole network again, and give the same results as a network
+# built at once, on the 3-bus example given in Hossein Seifi, Mohammad Sadegh
+# Sepasian, Electric Power System Planning: Issues, Algorithms and Solutions,
+# pp. 247-248.
+
+import unittest
+
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement
+
+from gridsim.electrical import loadflow
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator
+from gridsim.electrical.contingency import ContingencyAnalyzer
+
+
+class TestIncremental(unittest.TestCase):
+
+    def _network(self):
+        is_PV = np.array([False, True, False, False])
+        b = np.array([[0, 1], [1, 2], [0, 2], [2, 3], [1, 3], [0, 3]])
+        Yb = np.zeros((6, 4), dtype=complex)
+        Yb[:, :] = (1. / (1j * np.array([0.0576, 0.092, 0.17, 0.05, 0.08,
+                                         0.2])))[:, np.newaxis]
+        P = np.array([0., -.53, 0.9, -0.4])
+        return is_PV, b, Yb, P
+
+    def test_add_branches(self):
+        is_PV, b, Yb, P = self._network()
+        ref = DirectLoadFlowCalculator(10., 2., is_PV, b, Yb.copy())
+        [_, _, _, Th_ref] = ref.calculate(P.copy(), np.zeros(4), np.ones(4),
+                                          np.zeros(4), True)
+        Pij_ref = ref.get_branch_power_flows(True)[0]
+
+        calc = DirectLoadFlowCalculator(10., 2., is_PV, b[:4], Yb[:4].copy())
+        analyzer = ContingencyAnalyzer(calc)
+        self.assertEqual(analyzer.ptdf.shape, (4, 4))
+        lu = calc._Bvq_lu
+        calc.add_branches(b[4:5], Yb[4:5])
+        calc.add_branches(b[5:], Yb[5:])
+        # the factorization has been modified, not computed again
+        self.assertIs(calc._Bvq_lu, lu)
+
+        [_, _, _, Th] = calc.calculate(P.copy(), np.zeros(4), np.ones(4),
+                                       np.zeros(4), True)
+        self.assertTrue(np.allclose(Th, Th_ref))
+        self.assertTrue(np.allclose(calc.get_branch_power_flows(True)[0],
+                                    Pij_ref))
+        self.assertTrue(np.allclose(analyzer.ptdf,
+                                    ContingencyAnalyzer(ref).ptdf))
+
+        [_, Th, _] = calc.calculate_horizon(np.tile(P[:, np.newaxis], 2),
+                                            True)
+        self.assertTrue(np.allclose(Th[:, 1], Th_ref))
+
+        self.assertRaises(RuntimeError, calc.add_branches,
+                          np.array([[0, 4]]), Yb[:1])
+
+    def test_add_branches_refactorization(self):
+        is_PV, b, Yb, P = self._network()
+        ref = DirectLoadFlowCalculator(1., 1., is_PV, b, Yb.copy())
+        [_, _, _, Th_ref] = ref.calculate(P.copy(), np.zeros(4), np.ones(4),
+                                          np.zeros(4), True)
+
+        max_updates = loadflow._MAX_LOW_RANK_UPDATES
+        loadflow._MAX_LOW_RANK_UPDATES = 1
+        try:
+            calc = DirectLoadFlowCalculator(1., 1., is_PV, b[:4],
+                                            Yb[:4].copy())
+            lu = calc._Bvq_lu
+            calc.add_branches(b[4:5], Yb[4:5])
+            self.assertIs(calc._Bvq_lu, lu)
+            calc.add_branches(b[5:], Yb[5:])
+            self.assertIsNot(calc._Bvq_lu, lu)
+            self.assertIsNone(calc._wb_U)
+        finally:
+            loadflow._MAX_LOW_RANK_UPDATES = max_updates
+
+        [_, _, _, Th] = calc.calculate(P.copy(), np.zeros(4), np.ones(4),
+                                       np.zeros(4), True)
+        self.assertTrue(np.allclose(Th, Th_ref))
+
+    def _simulator(self, with_branch_1_3):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = DirectLoadFlowCalculator()
+
+        esim.add(ElectricalPVBus('Bus 2'))
+        esim.add(ElectricalPQBus('Bus 3'))
+        esim.connect('Branch 1-2', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line 1', 1.0*units.metre,
+                                                0.0576*units.ohm))
+        esim.connect('Branch 2-3', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 2', 1.0*units.metre,
+                                                0.092*units.ohm))
+        if with_branch_1_3:
+            self._connect_1_3(esim)
+
+        esim.attach('Bus 2', ConstantElectricalCPSElement('GD2',
+                                                          -.53*units.watt))
+        esim.attach('Bus 3', ConstantElectricalCPSElement('GD3',
+                                                          .9*units.watt))
+        sim.reset()
+        return sim
+
+    def _connect_1_3(self, esim):
+        esim.connect('Branch 1-3', esim.bus('Slack Bus'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 3', 1.0*units.metre,
+                                                0.17*units.ohm))
+
+    def _assert_same_results(self, esim, esim_ref):
+        for i_bus in range(3):
+            self.assertAlmostEqual(esim.bus(i_bus).Th, esim_ref.bus(i_bus).Th)
+            self.assertAlmostEqual(esim.bus(i_bus).P, esim_ref.bus(i_bus).P)
+        for i_branch in range(3):
+            self.assertAlmostEqual(esim.branch(i_branch).Pij,
+                                   esim_ref.branch(i_branch).Pij)
+
+    def test_connect(self):
+        sim_ref = self._simulator(True)
+        sim_ref.step(1*units.second)
+
+        sim = self._simulator(False)
+        esim = sim.electrical
+        sim.step(1*units.second)
+        self.assertAlmostEqual(esim.branch(1).Pij, .9)
+        lu = esim.load_flow_calculator._Bvq_lu
+
+        self._connect_1_3(esim)
+        sim.step(1*units.second)
+        self.assertIs(esim.load_flow_calculator._Bvq_lu, lu)
+        self._assert_same_results(esim, sim_ref.electrical)
+
+    def test_attach_detach(self):
+        sim_ref = self._simulator(True)
+        esim_ref = sim_ref.electrical
+        esim_ref.attach('Bus 3', ConstantElectricalCPSElement('GD4',
+                                                              .2*units.watt))
+        sim_ref.step(1*units.second)
+
+        sim = self._simulator(True)
+        esim = sim.electrical
+        sim.step(1*units.second)
+        lu = esim.load_flow_calculator._Bvq_lu
+
+        esim.attach('Bus 3', ConstantElectricalCPSElement('GD4',
+                                                          .2*units.watt))
+        sim.step(1*units.second)
+        self.assertIs(esim.load_flow_calculator._Bvq_lu, lu)
+        self._assert_same_results(esim, esim_ref)
+
+        esim.detach('GD4')
+        sim.step(1*units.second)
+        self.assertIs(esim.load_flow_calculator._Bvq_lu, lu)
+        self.assertAlmostEqual(esim.bus('Slack Bus').P, .37)
+        self.assertRaises(RuntimeError, esim.detach, 'GD4')
+
+        # an element can be attached again
+        esim.attach('Bus 3', 'GD4')
+        sim.step(1*units.second)
+        self._assert_same_results(esim, esim_ref)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# This program checks whether the electrical simulator gives the same results
+# with and without Kron reduction of the zero-injection buses, on a feeder
+# with two cable joints, J1 and J3, without attached element.
+#
+# Loads and generations
+#-------------------------------------------------------------------
+# Bus           Bus type       P (p.u.)
+#-------------------------------------------------------------------
+# Slack Bus     Slack          Unknown
+# J1            PQ             none
+# L2            PQ             0.3
+# J3            PQ             none
+# L4            PQ             0.2
+# G5            PV             -0.1
+#-------------------------------------------------------------------
+#
+# Lines: Slack Bus-J1, J1-L2, J1-J3, J3-L4, J3-G5 and L2-L4, with reactances
+# from 0.02 to 0.07 p.u. and resistances of 0.01 p.u. The same buses are also
+# joined by lines Slack Bus-L2, L2-J1, J1-L4, J1-J3, J3-G5 and J3-L4, where no
+# joint is a neighbour of the slack bus.
+#
+# test_many_joints builds a radial feeder of 60 loads of 0.001 p.u., each
+# behind a joint, or behind three chained joints for every fifth load, and
+# with a lateral load of 0.002 p.u. on every tenth joint.
+
+import unittest
+
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.core import ElectricalBus
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator, \
+    SparseNewtonRaphsonLoadFlowCalculator
+
+
+class TestKron(unittest.TestCase):
+
+    BRANCHES = [('Slack Bus', 'J1', 0.02), ('J1', 'L2', 0.05),
+                ('J1', 'J3', 0.03), ('J3', 'L4', 0.04), ('J3', 'G5', 0.06),
+                ('L2', 'L4', 0.07)]
+
+    REMOTE_BRANCHES = [('Slack Bus', 'L2', 0.02), ('L2', 'J1', 0.05),
+                       ('J1', 'L4', 0.03), ('J1', 'J3', 0.04),
+                       ('J3', 'G5', 0.06), ('J3', 'L4', 0.07)]
+
+    def _simulator(self, calculator, kron_reduction, branches=BRANCHES):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = calculator
+        esim.kron_reduction = kron_reduction
+
+        for name in ('J1', 'L2', 'J3', 'L4'):
+            esim.add(ElectricalPQBus(name))
+        esim.add(ElectricalPVBus('G5'))
+        for i_branch, (bus_i, bus_j, X) in enumerate(branches):
+            esim.connect('Branch %s-%s' % (bus_i, bus_j), esim.bus(bus_i),
+                         esim.bus(bus_j),
+                         ElectricalTransmissionLine('Line %d' % i_branch,
+                                                    1.0*units.metre,
+                                                    X*units.ohm,
+                                                    0.01*units.ohm))
+        esim.attach('L2', ConstantElectricalCPSElement('L2', .3*units.watt))
+        esim.attach('L4', ConstantElectricalCPSElement('L4', .2*units.watt))
+        esim.attach('G5', ConstantElectricalCPSElement('G5', -.1*units.watt))
+        return sim
+
+    def _run(self, kron_reduction, branches=BRANCHES):
+        sim = self._simulator(SparseNewtonRaphsonLoadFlowCalculator(),
+                              kron_reduction, branches)
+        esim = sim.electrical
+        sim.reset()
+        sim.step(1*units.second)
+        return esim, np.concatenate(
+            [esim.bus_values(name) for name in ('P', 'Q', 'V', 'Th')] +
+            [esim.branch_values(name) for name in ('Pij', 'Qij', 'Pji',
+                                                   'Qji')])
+
+    def test_same_results(self):
+        esim, expected = self._run(False)
+        self.assertEqual(esim.eliminated_buses, [])
+
+        esim, results = self._run(True)
+        self.assertEqual(esim.eliminated_buses,
+                         [esim.bus('J1'), esim.bus('J3')])
+        np.testing.assert_array_almost_equal(results, expected)
+        self.assertAlmostEqual(esim.bus('J1').P, 0.)
+        self.assertAlmostEqual(esim.bus('J3').Q, 0.)
+
+    def test_joints_away_from_slack(self):
+        esim, expected = self._run(False, self.REMOTE_BRANCHES)
+        esim, results = self._run(True, self.REMOTE_BRANCHES)
+        self.assertEqual(esim.eliminated_buses,
+                         [esim.bus('J1'), esim.bus('J3')])
+        # L2, L4 and G5 are joined by equivalent branches
+        self.assertEqual(esim.load_flow_calculator._b.shape[0], 4)
+        np.testing.assert_array_almost_equal(results, expected)
+
+    def _feeder(self, kron_reduction):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = SparseNewtonRaphsonLoadFlowCalculator()
+        esim.kron_reduction = kron_reduction
+
+        names = []
+        branches = []
+        loads = []
+        previous = 0
+        for i_load in range(60):
+            for i_joint in range(3 if i_load % 5 == 0 else 1):
+                names.append('J%d.%d' % (i_load, i_joint))
+                branches.append((previous, len(names)))
+                previous = len(names)
+            if i_load % 10 == 0:
+                names.append('Lateral %d' % i_load)
+                branches.append((previous, len(names)))
+                loads.append((len(names), .002))
+            names.append('L%d' % i_load)
+            branches.append((previous, len(names)))
+            loads.append((len(names), .001))
+            previous = len(names)
+        esim.add_buses(names, [ElectricalBus.Type.PQ_BUS] * len(names))
+        branches = np.array(branches)
+        esim.connect_many(['Branch %d' % i_branch
+                           for i_branch in range(len(branches))],
+                          branches[:, 0], branches[:, 1],
+                          np.full(len(branches), 0.01),
+                          np.full(len(branches), 0.005))
+        esim.attach_many(np.array([i_bus for i_bus, power in loads]),
+                         [ConstantElectricalCPSElement(
+                             'Load %d' % i_bus, power*units.watt)
+                          for i_bus, power in loads])
+        sim.reset()
+        sim.step(1*units.second)
+        return esim, np.concatenate(
+            [esim.bus_values(name) for name in ('P', 'Q', 'V', 'Th')] +
+            [esim.branch_values(name) for name in ('Pij', 'Qij', 'Pji',
+                                                   'Qji')])
+
+    def test_many_joints(self):
+        esim, expected = self._feeder(False)
+        esim, results = self._feeder(True)
+        # 48 single joints and 12 groups of three chained joints
+        self.assertEqual(len(esim.eliminated_buses), 84)
+        np.testing.assert_array_almost_equal(results, expected)
+
+    def test_direct_load_flow(self):
+        sim = self._simulator(DirectLoadFlowCalculator(), True)
+        sim.reset()
+        self.assertRaises(RuntimeError, sim.step, 1*units.second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# This program checks whether the sparse Newton-Raphson and fast-decoupled
+# calculators solving their linear systems with preconditioned Krylov methods
+# give the same results as with sparse LU factorizations, on the radial feeder
+# of test_BFSLF.py with a PV bus added at bus 4.
+
+import unittest
+
+import numpy as np
+
+from gridsim.electrical.loadflow import LinearSolver, \
+    SparseNewtonRaphsonLoadFlowCalculator, FastDecoupledLoadFlowCalculator, \
+    _KrylovSolver
+
+from test_BFSLF import radial_feeder
+
+
+class TestKrylov(unittest.TestCase):
+
+    KRYLOV_SOLVERS = [LinearSolver.GMRES, LinearSolver.BICGSTAB]
+
+    def _feeder(self):
+        is_PV, b, Yb, P, Q, V = radial_feeder()
+        is_PV[4] = True
+        V[4] = 1.01
+        return is_PV, b, Yb, P, Q, V
+
+    def _check(self, calculator_class):
+        is_PV, b, Yb, P, Q, V = self._feeder()
+        expected = calculator_class(1., 1., is_PV, b, Yb.copy()).calculate(
+            P.copy(), Q.copy(), V.copy(), np.zeros(8), True)
+        for linear_solver in self.KRYLOV_SOLVERS:
+            calculator = calculator_class(1., 1., is_PV, b, Yb.copy(),
+                                          linear_solver=linear_solver)
+            self.assertEqual(calculator.linear_solver, linear_solver)
+            results = calculator.calculate(P.copy(), Q.copy(), V.copy(),
+                                           np.zeros(8), True)
+            for values, expected_values in zip(results, expected):
+                np.testing.assert_array_almost_equal(values, expected_values)
+            self.assertLessEqual(calculator.residual, calculator.tolerance)
+
+            many_results = calculator.calculate_many(
+                np.vstack((P, 1.5 * P)), np.vstack((Q, 1.5 * Q)),
+                np.vstack((V, V)), True)
+            for values, expected_values in zip(many_results, expected):
+                np.testing.assert_array_almost_equal(values[0],
+                                                     expected_values)
+
+    def test_sparse_newton_raphson(self):
+        self._check(SparseNewtonRaphsonLoadFlowCalculator)
+
+    def test_fast_decoupled(self):
+        self._check(FastDecoupledLoadFlowCalculator)
+
+    def test_preconditioner_reuse(self):
+        is_PV, b, Yb, P, Q, V = self._feeder()
+        calculator = SparseNewtonRaphsonLoadFlowCalculator(
+            1., 1., is_PV, b, Yb, linear_solver=LinearSolver.GMRES)
+        calculator.calculate(P, Q, V, np.zeros(8), True)
+        # the preconditioner is only computed again when the Jacobian matrix
+        # has changed substantially
+        self.assertGreaterEqual(calculator.statistics.factorizations, 1)
+        self.assertLessEqual(calculator.statistics.factorizations,
+                             calculator.statistics.iterations)
+
+    def test_failed_solve(self):
+        is_PV, b, Yb, P, Q, V = self._feeder()
+        calculator = FastDecoupledLoadFlowCalculator(
+            1., 1., is_PV, b, Yb, linear_solver=LinearSolver.BICGSTAB)
+        solver = calculator._Bp_lu
+        self.assertIsInstance(solver, _KrylovSolver)
+        rhs = np.arange(1., 8.)
+        expected = np.linalg.solve(calculator._Bp.toarray(), rhs)
+
+        # the tolerance is only relative, the matrix is factorized completely
+        # when the method breaks down
+        calls = []
+
+        def broken_method(A, b, **options):
+            calls.append(options)
+            return np.zeros(b.shape), -10
+
+        solver._method = broken_method
+        factorizations = solver.factorizations
+        np.testing.assert_array_almost_equal(solver.solve(rhs), expected)
+        np.testing.assert_array_almost_equal(
+            solver.solve(np.column_stack((rhs, 2 * rhs))),
+            np.column_stack((expected, 2 * expected)))
+        self.assertEqual(solver.factorizations, factorizations + 1)
+        self.assertEqual(calls[0]['atol'], 0.)
+
+    def test_bad_linear_solver(self):
+        self.assertRaises(TypeError, SparseNewtonRaphsonLoadFlowCalculator,
+                          linear_solver='GMRES')
+        self.assertRaises(TypeError, FastDecoupledLoadFlowCalculator,
+                          linear_solver='GMRES')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# This program checks the convergence control and the statistics of iterative
+# load flow calculators, on the 5-bus reference network (see Xi-Fan Wang,
+# Yonghua Song, Malcolm Irving, Modern Power Systems Analysis), and the
+# statistics recorded by the electrical simulator when a solve diverges, on
+# two buses joined by a line too weak for their load.
+
+import unittest
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.network import ElectricalPQBus, ElectricalPVBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement
+from gridsim.electrical.loadflow import NewtonRaphsonLoadFlowCalculator, \
+    SparseNewtonRaphsonLoadFlowCalculator, FastDecoupledLoadFlowCalculator, \
+    DirectLoadFlowCalculator, LoadFlowRunStatistics
+
+from test_SNRLF import network_5bus
+
+
+class TestLoadFlowStatistics(unittest.TestCase):
+
+    def _check(self, cls, factorizes):
+        is_PV, b, Yb, P, Q, V, Th = network_5bus()
+        calculator = cls(1., 1., is_PV, b, Yb)
+        self.assertIsNone(calculator.statistics)
+        self.assertIsNone(calculator.residual)
+
+        calculator.tolerance = 1e-8
+        calculator.calculate(P.copy(), Q.copy(), V.copy(), np.zeros(5), True)
+        statistics = calculator.statistics
+        self.assertTrue(statistics.converged)
+        self.assertFalse(statistics.diverged)
+        self.assertEqual(statistics.iterations, calculator.iterations)
+        self.assertGreater(statistics.iterations, 0)
+        self.assertLessEqual(statistics.residual, 1e-8)
+        self.assertEqual(statistics.residual, calculator.residual)
+        self.assertGreaterEqual(statistics.time, 0.)
+        if factorizes:
+            self.assertEqual(statistics.factorizations,
+                             statistics.iterations)
+        else:
+            self.assertEqual(statistics.factorizations, 0)
+
+        # iteration cap
+        calculator.tolerance = 1e-10
+        calculator.max_iterations = 1
+        self.assertRaises(RuntimeError, calculator.calculate, P.copy(),
+                          Q.copy(), V.copy(), np.zeros(5), True)
+        self.assertFalse(calculator.statistics.converged)
+        self.assertFalse(calculator.statistics.diverged)
+        self.assertEqual(calculator.statistics.iterations, 1)
+
+        # divergence
+        calculator.max_iterations = 100
+        P_inf = P.copy()
+        P_inf[1] = float('inf')
+        self.assertRaises(RuntimeError, calculator.calculate, P_inf,
+                          Q.copy(), V.copy(), np.zeros(5), True)
+        self.assertFalse(calculator.statistics.converged)
+        self.assertTrue(calculator.statistics.diverged)
+        self.assertEqual(calculator.statistics.iterations, 0)
+
+        self.assertRaises(RuntimeError, setattr, calculator, 'tolerance', 0.)
+        self.assertRaises(RuntimeError, setattr, calculator,
+                          'max_iterations', 0)
+
+    def test_NR(self):
+        self._check(NewtonRaphsonLoadFlowCalculator, True)
+
+    def test_SNR(self):
+        self._check(SparseNewtonRaphsonLoadFlowCalculator, True)
+
+    def test_FDLF(self):
+        self._check(FastDecoupledLoadFlowCalculator, False)
+
+    def test_run_statistics(self):
+        is_PV, b, Yb, P, Q, V, Th = network_5bus()
+        calculator = SparseNewtonRaphsonLoadFlowCalculator(1., 1., is_PV, b,
+                                                           Yb)
+        direct = DirectLoadFlowCalculator(1., 1., is_PV, b, Yb)
+        run = LoadFlowRunStatistics()
+        iterations = []
+        for factor in [1., 1.1]:
+            calculator.calculate(P*factor, Q*factor, V.copy(), np.zeros(5),
+                                 True)
+            iterations.append(calculator.iterations)
+            run.add(calculator.statistics)
+        direct.calculate(P.copy(), Q.copy(), V.copy(), np.zeros(5), True)
+        self.assertEqual(direct.statistics.iterations, 0)
+        self.assertIsNone(direct.statistics.residual)
+        run.add(direct.statistics)
+
+        self.assertEqual(run.solves, 3)
+        self.assertEqual(run.iterations, sum(iterations))
+        self.assertEqual(run.max_iterations, max(iterations))
+        self.assertEqual(run.factorizations, sum(iterations))
+        self.assertEqual(run.failures, 0)
+        self.assertLessEqual(run.max_residual, calculator.tolerance)
+        self.assertLessEqual(run.max_time, run.time)
+
+    def _failing_simulator(self, islands):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = SparseNewtonRaphsonLoadFlowCalculator()
+        esim.add(ElectricalPQBus('Bus 2'))
+        esim.connect('Branch 1-2', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line 1', 1.0*units.metre,
+                                                0.5*units.ohm, 0.1*units.ohm))
+        esim.attach('Bus 2', ConstantElectricalCPSElement('Load 2',
+                                                          100.*units.watt))
+        if islands:
+            # a second island whose load flow converges
+            esim.add(ElectricalPVBus('Bus 3'))
+            esim.add(ElectricalPQBus('Bus 4'))
+            esim.connect('Branch 3-4', esim.bus('Bus 3'), esim.bus('Bus 4'),
+                         ElectricalTransmissionLine('Line 2', 1.0*units.metre,
+                                                    0.1*units.ohm))
+            esim.attach('Bus 4', ConstantElectricalCPSElement('Load 4',
+                                                              .1*units.watt))
+        return sim
+
+    def test_simulator_failures(self):
+        for islands in (False, True):
+            sim = self._failing_simulator(islands)
+            esim = sim.electrical
+            sim.reset()
+            self.assertRaises(RuntimeError, sim.step, 1*units.second)
+            statistics = esim.load_flow_statistics
+            self.assertEqual(statistics.solves, 2 if islands else 1)
+            self.assertEqual(statistics.failures, 1)
+
+if __name__ == '__main__':
+    unittest.main()
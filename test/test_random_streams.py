@@ -0,0 +1,135 @@
+# This program checks whether the stochastic CPS elements of an electrical
+# simulator draw reproducible and independent random numbers from the
+# streams of the simulator, whatever the order in which they are added.
+# Elements are not attached to any network.
+#
+# Elements
+#-------------------------------------------------------------------
+# Element       Kind                    Mean (W)    Std. dev. (W)
+#-------------------------------------------------------------------
+# G1            Gaussian                1.0         0.5
+# G2            Gaussian                -2.0        1.0
+#-------------------------------------------------------------------
+
+import unittest
+
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.util import RandomStreams
+from gridsim.electrical.element import GaussianRandomElectricalCPSElement, \
+    GaussianRandomElectricalCPSElementGroup
+
+
+class TestRandomStreams(unittest.TestCase):
+
+    def test_streams(self):
+        streams = RandomStreams(42)
+        self.assertEqual(streams.seed, 42)
+        np.testing.assert_array_equal(streams.stream('G1').random_sample(5),
+                                      streams.stream('G1').random_sample(5))
+        np.testing.assert_array_equal(
+            streams.stream('G1').random_sample(5),
+            RandomStreams(42).stream('G1').random_sample(5))
+        self.assertFalse(np.array_equal(
+            streams.stream('G1').random_sample(5),
+            streams.stream('G2').random_sample(5)))
+        self.assertFalse(np.array_equal(
+            streams.stream('G1').random_sample(5),
+            RandomStreams(43).stream('G1').random_sample(5)))
+
+        self.assertRaises(RuntimeError, RandomStreams, -1)
+        self.assertRaises(RuntimeError, RandomStreams, 2 ** 32)
+
+    def _run(self, names):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.random_streams = RandomStreams(42)
+        parameters = {'G1': (1.*units.watt, .5*units.watt),
+                      'G2': (-2.*units.watt, 1.*units.watt)}
+        for name in names:
+            esim.add(GaussianRandomElectricalCPSElement(name,
+                                                        *parameters[name]))
+        sim.reset()
+        energies = []
+        for i_step in range(3):
+            sim.step(1*units.second)
+            energies.append([esim.cps_element('G1').delta_energy,
+                             esim.cps_element('G2').delta_energy])
+        return np.array(energies)
+
+    def test_reproducible_elements(self):
+        energies = self._run(['G1', 'G2'])
+        np.testing.assert_array_equal(energies, self._run(['G2', 'G1']))
+        # steps draw different numbers
+        self.assertNotEqual(energies[0, 0], energies[1, 0])
+
+    def test_reset_restarts_streams(self):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.random_streams = RandomStreams(7)
+        element = esim.add(GaussianRandomElectricalCPSElement(
+            'G1', 1.*units.watt, .5*units.watt))
+
+        sim.reset()
+        sim.step(1*units.second)
+        first = element.delta_energy
+        sim.reset()
+        sim.step(1*units.second)
+        self.assertEqual(element.delta_energy, first)
+
+    def test_unseeded_runs(self):
+        sim = Simulator()
+        esim = sim.electrical
+        element = esim.add(GaussianRandomElectricalCPSElement(
+            'G1', 1.*units.watt, .5*units.watt))
+
+        def run():
+            sim.reset()
+            sim.step(1*units.second)
+            return element.delta_energy
+
+        # each run draws other numbers, the global seed reproduces the runs
+        np.random.seed(3)
+        energies = [run(), run()]
+        self.assertNotEqual(energies[0], energies[1])
+        np.random.seed(3)
+        self.assertEqual([run(), run()], energies)
+
+        # back to the default streams
+        esim.random_streams = RandomStreams(7)
+        self.assertEqual(run(), run())
+        esim.random_streams = None
+        self.assertNotEqual(run(), run())
+
+    def test_group(self):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.random_streams = RandomStreams(42)
+        group = esim.add_group(GaussianRandomElectricalCPSElementGroup(
+            ['G1', 'G2', 'G3'], np.array([1., -2., 3.])*units.watt,
+            np.array([.5, 1., 0.])*units.watt))
+        self.assertEqual(esim.cps_element('G2').mean_power, -2.)
+
+        sim.reset()
+        sim.step(1*units.second)
+        first = group.delta_energy.copy()
+        # an element without deviation consumes its mean power
+        self.assertEqual(first[2], 3.)
+
+        sim.reset()
+        sim.step(1*units.second)
+        np.testing.assert_array_equal(group.delta_energy, first)
+
+        # elements of the group computed alone draw from their own streams,
+        # which are restarted after computing them
+        self.assertIsNot(esim.cps_element('G1').random_state, np.random)
+        powers = esim.element_powers([0., 1.], 1.)
+        np.testing.assert_array_equal(esim.element_powers([0., 1.], 1.),
+                                      powers)
+        self.assertNotEqual(powers[0, 0], powers[0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# This program checks whether the load flow solution approximated with the
+# voltage sensitivities of the last Newton-Raphson solve is close to the full
+# solution for small changes of bus powers, and whether the electrical
+# simulator falls back to full solves for larger changes. It uses the example
+# of test_esimDLF.py, given in Hossein Seifi, Mohammad Sadegh Sepasian,
+# Electric Power System Planning: Issues, Algorithms and Solutions,
+# pp. 247-248, with line resistances of 0.01 p.u.
+#
+# Loads and generations
+#-------------------------------------------------------------------
+# Bus number    Bus type       P (p.u.)
+#-------------------------------------------------------------------
+# 1             Slack          Unknown
+# 2             PV             -0.53
+# 3             PQ             0.9
+#-------------------------------------------------------------------
+
+import unittest
+
+import numpy as np
+
+from gridsim.simulation import Simulator
+from gridsim.unit import units
+from gridsim.electrical.network import ElectricalPVBus, ElectricalPQBus, \
+    ElectricalTransmissionLine
+from gridsim.electrical.element import ConstantElectricalCPSElement
+from gridsim.electrical.loadflow import NewtonRaphsonLoadFlowCalculator, \
+    SparseNewtonRaphsonLoadFlowCalculator
+
+
+class TestSensitivity(unittest.TestCase):
+
+    def _network(self, calculator):
+        sim = Simulator()
+        esim = sim.electrical
+        esim.load_flow_calculator = calculator
+
+        esim.add(ElectricalPVBus('Bus 2'))
+        esim.add(ElectricalPQBus('Bus 3'))
+        esim.connect('Branch 1-2', esim.bus('Slack Bus'), esim.bus('Bus 2'),
+                     ElectricalTransmissionLine('Line 1', 1.0*units.metre,
+                                                0.0576*units.ohm,
+                                                0.01*units.ohm))
+        esim.connect('Branch 2-3', esim.bus('Bus 2'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 2', 1.0*units.metre,
+                                                0.092*units.ohm,
+                                                0.01*units.ohm))
+        esim.connect('Branch 1-3', esim.bus('Slack Bus'), esim.bus('Bus 3'),
+                     ElectricalTransmissionLine('Line 3', 1.0*units.metre,
+                                                0.17*units.ohm,
+                                                0.01*units.ohm))
+        esim.attach('Bus 2', ConstantElectricalCPSElement('GD2',
+                                                          -.53*units.watt))
+        esim.attach('Bus 3', ConstantElectricalCPSElement('GD3',
+                                                          .9*units.watt))
+        return sim, esim
+
+    def _run(self, esim_setup, powers):
+        # steps with the given powers of element GD3, returns bus values
+        sim, esim = esim_setup
+        sim.reset()
+        values = []
+        for power in powers:
+            esim.cps_element('GD3').power = power
+            sim.step(1*units.second)
+            values.append(np.concatenate([esim.bus_values('P'),
+                                          esim.bus_values('V'),
+                                          esim.bus_values('Th')]))
+        return np.array(values)
+
+    def test_calculator(self):
+        sim, esim = self._network(SparseNewtonRaphsonLoadFlowCalculator())
+        sim.reset()
+        sim.step(1*units.second)
+        calculator = esim.load_flow_calculator
+        self.assertFalse(calculator.linearized)
+        self.assertRaises(RuntimeError, calculator.calculate_linear,
+                          np.zeros(3), np.zeros(3), np.ones(3), np.zeros(3),
+                          True, 1e-6)
+        calculator.linearize()
+        self.assertTrue(calculator.linearized)
+
+        P = np.array([0., .53, -.901])
+        linear = calculator.calculate_linear(P.copy(), np.zeros(3),
+                                             np.ones(3), np.zeros(3), True,
+                                             1e-4)
+        self.assertEqual(calculator.statistics.iterations, 0)
+        full = calculator.calculate(P.copy(), np.zeros(3), np.ones(3),
+                                    np.zeros(3), True)
+        for linear_values, full_values in zip(linear, full):
+            np.testing.assert_array_almost_equal(linear_values, full_values,
+                                                 5)
+
+        # far from the linearized solution, the approximation is refused
+        self.assertIsNone(calculator.calculate_linear(
+            np.array([0., .53, -1.5]), np.zeros(3), np.ones(3), np.zeros(3),
+            True, 1e-6))
+
+    def test_simulator(self):
+        powers = [.9, .9001, .9002, .9003, 1.5, 1.5001]
+        reference = self._run(
+            self._network(NewtonRaphsonLoadFlowCalculator()), powers)
+
+        sim, esim = self._network(NewtonRaphsonLoadFlowCalculator())
+        esim.sensitivity_threshold = .01
+        values = self._run((sim, esim), powers)
+
+        # steps 2 to 4 and 6 are linear updates
+        self.assertEqual(esim.linear_steps, 4)
+        self.assertEqual(esim.load_flow_statistics.solves, 6)
+        np.testing.assert_array_almost_equal(values, reference, 5)
+
+        # second order errors exceed a tiny tolerance
+        esim.sensitivity_tolerance = 1e-12
+        self._run((sim, esim), powers)
+        self.assertEqual(esim.linear_steps, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
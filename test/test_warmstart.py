@@ -0,0 +1,67 @@
+# This program checks that iterative load flow calculators started from the
+# previous solution give the same results as from a flat start with fewer
+# iterations, on the 5-bus reference network (see Xi-Fan Wang, Yonghua Song,
+# Malcolm Irving, Modern Power Systems Analysis).
+
+import unittest
+import numpy as np
+
+from gridsim.electrical.loadflow import NewtonRaphsonLoadFlowCalculator, \
+    SparseNewtonRaphsonLoadFlowCalculator, FastDecoupledLoadFlowCalculator
+
+from test_SNRLF import network_5bus
+
+
+class TestWarmStart(unittest.TestCase):
+
+    def _check(self, cls):
+        is_PV, b, Yb, P, Q, V, Th = network_5bus()
+        cold = cls(1., 1., is_PV, b, Yb.copy())
+        warm = cls(1., 1., is_PV, b, Yb.copy(), warm_start=True)
+        self.assertFalse(cold.warm_start)
+        self.assertTrue(warm.warm_start)
+
+        for step in range(5):
+            # injections slightly change at each step
+            factor = 1. + 0.01*step
+            [P_ref, Q_ref, V_ref, Th_ref] = [x.copy() for x in cold.calculate(
+                P*factor, Q*factor, V.copy(), np.zeros(5), True)]
+            [P_w, Q_w, V_w, Th_w] = warm.calculate(
+                P*factor, Q*factor, V.copy(), np.zeros(5), True)
+
+            self.assertAlmostEqual(P_w[0], P_ref[0])
+            self.assertTrue(np.allclose(Q_w, Q_ref))
+            self.assertTrue(np.allclose(V_w, V_ref))
+            self.assertTrue(np.allclose(Th_w, Th_ref))
+            if step > 0:
+                self.assertLess(warm.iterations, cold.iterations)
+
+        self.assertLess(warm.total_iterations, cold.total_iterations)
+
+        # a bad previous solution falls back to flat start, without floating
+        # point error
+        warm._V_prev[1:4] = 1e6
+        with np.errstate(all='raise'):
+            [_, _, V_w, _] = warm.calculate(P*factor, Q*factor, V.copy(),
+                                            np.zeros(5), True)
+        self.assertTrue(np.allclose(V_w, V_ref))
+
+        # as well as a previous solution with a singular Jacobian matrix
+        warm._V_prev[1:4] = 0.
+        with np.errstate(all='raise'):
+            [_, _, V_w, _] = warm.calculate(P*factor, Q*factor, V.copy(),
+                                            np.zeros(5), True)
+        self.assertTrue(np.allclose(V_w, V_ref))
+
+    def test_newton_raphson(self):
+        self._check(NewtonRaphsonLoadFlowCalculator)
+
+    def test_sparse_newton_raphson(self):
+        self._check(SparseNewtonRaphsonLoadFlowCalculator)
+
+    def test_fast_decoupled(self):
+        self._check(FastDecoupledLoadFlowCalculator)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# This program checks whether load flow calculators filling their work arrays
+# in place give the same results at each call as new calculators, on the
+# radial feeder of test_BFSLF.py with a PV bus added at bus 4 for the
+# calculators supporting PV buses, and whether calculators reusing their
+# arrays return the same arrays at each call.
+
+import unittest
+
+import numpy as np
+
+from gridsim.electrical.loadflow import DirectLoadFlowCalculator, \
+    NewtonRaphsonLoadFlowCalculator, SparseNewtonRaphsonLoadFlowCalculator, \
+    FastDecoupledLoadFlowCalculator, BackwardForwardSweepLoadFlowCalculator
+
+from test_BFSLF import radial_feeder
+
+
+class TestWorkspace(unittest.TestCase):
+
+    def _scenarios(self, with_PV):
+        # feeder and 3 scenarios scaling its bus powers
+        is_PV, b, Yb, P, Q, V = radial_feeder()
+        if with_PV:
+            is_PV[4] = True
+            V[4] = 1.01
+        return is_PV, b, Yb, [(factor * P, factor * Q, V)
+                              for factor in (1., 1.5, .5)]
+
+    def _check(self, calculator_class, with_PV):
+        is_PV, b, Yb, scenarios = self._scenarios(with_PV)
+        calculator = calculator_class(1., 1., is_PV, b, Yb.copy())
+        reusing_calculator = calculator_class(1., 1., is_PV, b, Yb.copy())
+        reusing_calculator.reuse_arrays = True
+        previous_results = None
+        for P, Q, V in scenarios + scenarios:
+            expected = calculator_class(1., 1., is_PV, b, Yb.copy()).calculate(
+                P.copy(), Q.copy(), V.copy(), np.zeros(8), True)
+            results = calculator.calculate(P.copy(), Q.copy(), V.copy(),
+                                           np.zeros(8), True)
+            reused_results = reusing_calculator.calculate(
+                P.copy(), Q.copy(), V.copy(), np.zeros(8), True)
+            for values, reused_values, expected_values in \
+                    zip(results, reused_results, expected):
+                np.testing.assert_array_almost_equal(values, expected_values)
+                np.testing.assert_array_almost_equal(reused_values,
+                                                     expected_values)
+
+            if previous_results is not None:
+                for values, reused_values, previous_values in \
+                        zip(results, reused_results, previous_results):
+                    self.assertIsNot(values, previous_values[0])
+                    self.assertIs(reused_values, previous_values[1])
+            previous_results = zip(results, reused_results)
+
+    def test_direct(self):
+        self._check(DirectLoadFlowCalculator, True)
+
+    def test_newton_raphson(self):
+        self._check(NewtonRaphsonLoadFlowCalculator, True)
+
+    def test_sparse_newton_raphson(self):
+        self._check(SparseNewtonRaphsonLoadFlowCalculator, True)
+
+    def test_fast_decoupled(self):
+        self._check(FastDecoupledLoadFlowCalculator, True)
+
+    def test_backward_forward_sweep(self):
+        self._check(BackwardForwardSweepLoadFlowCalculator, False)
+
+    def test_newton_raphson_same_as_sparse(self):
+        is_PV, b, Yb, scenarios = self._scenarios(True)
+        [(P, Q, V)] = scenarios[:1]
+        nrlf = NewtonRaphsonLoadFlowCalculator(1., 1., is_PV, b, Yb.copy())
+        snrlf = SparseNewtonRaphsonLoadFlowCalculator(1., 1., is_PV, b,
+                                                      Yb.copy())
+        for values, expected_values in zip(
+                nrlf.calculate(P.copy(), Q.copy(), V.copy(), np.zeros(8),
+                               True),
+                snrlf.calculate(P.copy(), Q.copy(), V.copy(), np.zeros(8),
+                                True)):
+            np.testing.assert_array_almost_equal(values, expected_values)
+
+
+if __name__ == '__main__':
+    unittest.main()